@@ -10,9 +10,14 @@ from dotenv import load_dotenv
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.vector_store import RecipeVectorStore
-from src.retriever import RecipeRetriever
-from src.rag_chatbot import RAGChatbot
+from src.chatbot_factory import build_chatbot_from_env, build_answer_cache_from_env
+from src.retrieval_session import RetrievalSession
+from src.answer_cache import EXAMPLE_QUESTIONS, build_category_prompt, parse_category_prompt
+from src.ui_rendering import StreamRenderer, window_messages
+
+
+# Jumlah pesan terakhir yang ditampilkan; pesan lama dimuat per halaman
+HISTORY_PAGE_SIZE = 20
 
 
 # Page config
@@ -178,20 +183,8 @@ def initialize_chatbot():
             st.error("Error: Vector store belum disetup. Jalankan setup_database.py terlebih dahulu!")
             st.stop()
         
-        # Initialize components
-        vector_store = RecipeVectorStore(
-            persist_directory="./chroma_db",
-            collection_name="indonesian_recipes"
-        )
-        
-        retriever = RecipeRetriever(vector_store, top_k=3)
-        
-        chatbot = RAGChatbot(
-            retriever=retriever,
-            model=os.getenv("LLM_MODEL", "gemini-2.5-flash"),
-            temperature=float(os.getenv("TEMPERATURE", "0.7")),
-            use_gemini=os.getenv("USE_GEMINI", "true").lower() == "true"
-        )
+        # Initialize components (konfigurasi .env sama dengan run_batch.py dan warm_cache.py)
+        chatbot, vector_store = build_chatbot_from_env()
         
         return chatbot, vector_store
         
@@ -204,6 +197,50 @@ def initialize_chatbot():
         st.stop()
 
 
+@st.cache_resource
+def load_answer_cache(_vector_store):
+    """
+    Load answer cache untuk prompt tetap (cached); hanya prompt tetap yang disimpan
+    """
+    return build_answer_cache_from_env(_vector_store)
+
+
+@st.cache_data(ttl=60)
+def get_collection_fingerprint(_vector_store):
+    """
+    Fingerprint collection (dicek ulang paling lama tiap 60 detik)
+    """
+    return _vector_store.get_fingerprint()
+
+
+def answer_fixed_prompt(chatbot, vector_store, query, top_k, session=None, filters=None):
+    """
+    Menjawab prompt tetap (contoh pertanyaan / kategori) dari cache jika tersedia;
+    resep sumbernya dicatat di session untuk pertanyaan lanjutan. Jika filter resep
+    di sidebar aktif, cache dilewati (jawaban cache dibuat tanpa filter).
+    """
+    cache = load_answer_cache(vector_store)
+    fingerprint = get_collection_fingerprint(vector_store)
+    filtered = any(value is not None for value in (filters or {}).values())
+    
+    # Query bebas (mis. chip resep terkait) tidak disimpan di cache
+    cached, is_stale = (None, False) if filtered else cache.get(query, top_k, fingerprint)
+    if cached is not None:
+        if is_stale:
+            cache.refresh_async(chatbot, query, top_k, fingerprint)
+        response = cached
+    else:
+        # Prompt kategori memakai rekomendasi kategori yang dihitung di muka
+        response = chatbot.chat(query=query, top_k=top_k, include_sources=True,
+                                filters=filters, category=parse_category_prompt(query))
+        if response["success"] and not filtered:
+            cache.put(query, top_k, fingerprint, response)
+    
+    if session is not None:
+        session.remember_ids([source["id"] for source in response.get("sources", []) if source.get("id")])
+    return response
+
+
 def main():
     """
     Main application
@@ -216,6 +253,15 @@ def main():
     with st.spinner("Memuat chatbot..."):
         chatbot, vector_store = initialize_chatbot()
     
+    # Initialize chat history (sebelum sidebar: tombol kategori menambah pesan)
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = HISTORY_PAGE_SIZE
+    # Resep giliran sebelumnya untuk pertanyaan lanjutan
+    if "retrieval_session" not in st.session_state:
+        st.session_state.retrieval_session = RetrievalSession()
+    
     # Sidebar
     with st.sidebar:
         st.markdown("### Pengaturan Sistem")
@@ -241,9 +287,23 @@ def main():
         
         # RAG Settings (must be defined before categories use them)
         st.markdown('<div class="section-title">Konfigurasi RAG</div>', unsafe_allow_html=True)
-        top_k = st.slider("Jumlah resep yang diambil", 1, 5, 3, help="Semakin banyak, semakin lengkap konteksnya")
+        top_k = st.slider("Jumlah resep yang diambil", 1, 5, 3, help="Semakin banyak, semakin lengkap konteksnya (dengan ADAPTIVE_TOP_K, batas atas)")
         show_sources = st.checkbox("Tampilkan sumber resep", value=True, help="Lihat resep mana yang digunakan AI")
         
+        # Filter range diterapkan langsung di vector store (pre-filter)
+        with st.expander("Filter resep"):
+            max_minutes = st.selectbox("Waktu memasak maksimal", [None, 15, 30, 60, 120],
+                                       format_func=lambda m: "Semua" if m is None else f"{m} menit")
+            min_servings = st.number_input("Porsi minimal", min_value=0, max_value=10, value=0,
+                                           help="0 = tanpa batas")
+            max_difficulty = st.selectbox("Tingkat kesulitan maksimal", [None, "Mudah", "Sedang", "Sulit"],
+                                          format_func=lambda d: "Semua" if d is None else d)
+        recipe_filters = {
+            "max_minutes": max_minutes,
+            "min_servings": min_servings or None,
+            "max_difficulty": max_difficulty
+        }
+        
         st.markdown("---")
         
         # Categories
@@ -263,12 +323,14 @@ def main():
             if st.button(category, use_container_width=True, type="primary" if is_selected else "secondary"):
                 st.session_state.selected_category = category
                 # Add prompt about this category
-                category_prompt = f"Tolong rekomendasikan resep dari kategori {category}"
+                category_prompt = build_category_prompt(category)
                 st.session_state.messages.append({"role": "user", "content": category_prompt})
-                response = chatbot.chat(query=category_prompt, top_k=top_k, include_sources=show_sources)
+                response = answer_fixed_prompt(chatbot, vector_store, category_prompt, top_k,
+                                               session=st.session_state.retrieval_session,
+                                               filters=recipe_filters)
                 if response["success"]:
                     message_data = {"role": "assistant", "content": response["response"]}
-                    if "sources" in response:
+                    if show_sources and "sources" in response:
                         message_data["sources"] = response["sources"]
                     st.session_state.messages.append(message_data)
                 st.rerun()
@@ -278,7 +340,9 @@ def main():
         # Clear chat button
         if st.button("Clear Chat History", use_container_width=True):
             st.session_state.messages = []
+            st.session_state.history_window = HISTORY_PAGE_SIZE
             st.session_state.selected_category = None
+            st.session_state.retrieval_session = RetrievalSession()
             st.rerun()
         
         st.markdown("---")
@@ -294,12 +358,16 @@ def main():
         </small>
         """, unsafe_allow_html=True)
     
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    # Display chat history (hanya jendela pesan terakhir agar rerun tetap cepat)
+    hidden_count, visible_messages = window_messages(
+        st.session_state.messages, st.session_state.history_window
+    )
+    if hidden_count > 0:
+        if st.button(f"Tampilkan pesan sebelumnya ({hidden_count} tersembunyi)", use_container_width=True):
+            st.session_state.history_window += HISTORY_PAGE_SIZE
+            st.rerun()
     
-    # Display chat history
-    for message in st.session_state.messages:
+    for message in visible_messages:
         role = message["role"]
         content = message["content"]
         
@@ -325,6 +393,25 @@ def main():
                             </div>
                             """, unsafe_allow_html=True)
     
+    # Chip resep serupa untuk jawaban terakhir (lookup graph kNN, tanpa embedding query)
+    last_message = st.session_state.messages[-1] if st.session_state.messages else None
+    if last_message and last_message["role"] == "assistant" and last_message.get("sources"):
+        top_source_id = last_message["sources"][0].get("id")
+        related_docs = chatbot.retriever.retrieve_related(top_source_id, top_k=4) if top_source_id else []
+        if related_docs:
+            st.markdown("**Resep serupa:**")
+            for column, doc in zip(st.columns(len(related_docs)), related_docs):
+                with column:
+                    if st.button(doc.metadata.nama, key=f"related_{doc.id}", use_container_width=True):
+                        st.session_state.example_query = f"Bagaimana cara membuat {doc.metadata.nama}?"
+                        st.rerun()
+    
+    # Jawaban templat (tanpa LLM) bisa dijelaskan ulang oleh LLM atas permintaan user
+    if last_message and last_message["role"] == "assistant" and last_message.get("mode") == "template":
+        if st.button("Jelaskan lebih lanjut dengan AI", key=f"elaborate_{len(st.session_state.messages)}"):
+            st.session_state.elaborate_query = last_message["query"]
+            st.rerun()
+    
     # Chat input
     if prompt := st.chat_input("Ketik pertanyaan Anda di sini..."):
         # Add user message
@@ -336,31 +423,38 @@ def main():
         
         # Get bot response with streaming
         with st.chat_message("assistant", avatar="🤖"):
-            # Create placeholder for streaming
-            response_placeholder = st.empty()
-            full_response = ""
+            # Container untuk streaming (update di-throttle, paragraf selesai tidak di-render ulang)
+            renderer = StreamRenderer(st.container())
             
             # Show spinner while retrieving
             with st.spinner("Mencari resep yang relevan..."):
-                # Get retrieval results first
-                from src.retriever import RecipeRetriever
-                retriever = RecipeRetriever(vector_store, top_k=top_k)
-                retrieved_docs = retriever.retrieve(prompt, top_k=top_k)
-                retrieval_summary = retriever.get_retrieval_summary(retrieved_docs)
-                context = retriever.format_context(retrieved_docs)
+                # Routing intent lalu retrieval (pertanyaan umum tidak melakukan retrieval)
+                # Pertanyaan lanjutan memakai ulang resep giliran sebelumnya (tanpa retrieval)
+                route, retrieved_docs = chatbot.retrieve_for_query(prompt, top_k=top_k, filters=recipe_filters,
+                                                                   session=st.session_state.retrieval_session)
+                retrieval_summary = chatbot.retriever.get_retrieval_summary(retrieved_docs)
+                context = chatbot.build_context(route, retrieved_docs, query=prompt)
             
             # Stream the response
             try:
-                for chunk in chatbot.generate_response_stream(prompt, context):
-                    full_response += chunk
-                    response_placeholder.markdown(full_response + "▌")
+                # Lookup murni dijawab langsung dari field resep tanpa LLM
+                templated = chatbot.render_templated_answer(prompt, route, retrieved_docs)
+                if templated is not None:
+                    renderer.write(templated)
+                else:
+                    for chunk in chatbot.generate_response_stream(prompt, context):
+                        renderer.write(chunk)
                 
                 # Final response without cursor
-                response_placeholder.markdown(full_response)
+                full_response = renderer.close()
                 
                 # Display retrieval info
                 if retrieval_summary["total_retrieved"] > 0:
                     recipes_list = ", ".join(retrieval_summary['recipes'])
+                    # Adaptive top-k: resep yang kurang relevan tidak dikirim ke LLM
+                    dropped = route.retrieval_stats["dropped"] if route.retrieval_stats else 0
+                    if dropped:
+                        recipes_list += f" ({dropped} resep kurang relevan dilewati)"
                     st.markdown(f"""
                     <div style="background: #ecfdf5; padding: 1rem 1.25rem; border-radius: 10px; border-left: 4px solid #10b981; margin: 1.5rem 0.5rem 0.5rem 0.5rem; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
                         <small style="color: #065f46; line-height: 1.6;">
@@ -375,14 +469,9 @@ def main():
                     "content": full_response
                 }
                 if show_sources and retrieved_docs:
-                    message_data["sources"] = [
-                        {
-                            "nama": doc["metadata"]["nama"],
-                            "kategori": doc["metadata"].get("kategori", ""),
-                            "similarity": 1 / (1 + doc["distance"]) if doc.get("distance") else None
-                        }
-                        for doc in retrieved_docs
-                    ]
+                    message_data["sources"] = [doc.to_source() for doc in retrieved_docs]
+                if templated is not None:
+                    message_data.update({"mode": "template", "query": prompt})
                 
                 st.session_state.messages.append(message_data)
                 
@@ -395,31 +484,14 @@ def main():
     st.markdown('<small style="color: #6b7280;">Klik tombol atau ketik pertanyaan sendiri</small>', unsafe_allow_html=True)
     st.markdown("<br>", unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns(3)
+    columns = st.columns(3)
     
-    with col1:
-        if st.button("Resep Nasi Goreng", use_container_width=True):
-            st.session_state.example_query = "Bagaimana cara membuat nasi goreng yang enak dan pulen?"
-            st.rerun()
-        if st.button("Cara Masak Rendang", use_container_width=True):
-            st.session_state.example_query = "Bagaimana cara membuat rendang sapi yang empuk dan bumbu meresap?"
-            st.rerun()
-    
-    with col2:
-        if st.button("Resep Soto Ayam", use_container_width=True):
-            st.session_state.example_query = "Apa bahan-bahan dan cara membuat soto ayam kuning?"
-            st.rerun()
-        if st.button("Tips Tumis Sayur", use_container_width=True):
-            st.session_state.example_query = "Bagaimana tips menumis sayuran agar tetap renyah?"
-            st.rerun()
-    
-    with col3:
-        if st.button("Substitusi Bahan", use_container_width=True):
-            st.session_state.example_query = "Kalau tidak ada kecap manis, bisa diganti dengan apa?"
-            st.rerun()
-        if st.button("Rekomendasi Menu", use_container_width=True):
-            st.session_state.example_query = "Bisa rekomendasikan menu masakan Indonesia untuk makan siang keluarga?"
-            st.rerun()
+    # Dua tombol per kolom, urutan sesuai EXAMPLE_QUESTIONS
+    for idx, (label, example_query) in enumerate(EXAMPLE_QUESTIONS):
+        with columns[idx // 2]:
+            if st.button(label, use_container_width=True):
+                st.session_state.example_query = example_query
+                st.rerun()
     
     # Handle example query
     if "example_query" in st.session_state:
@@ -429,21 +501,45 @@ def main():
         # Add to messages and get response
         st.session_state.messages.append({"role": "user", "content": query})
         
-        response = chatbot.chat(
-            query=query,
-            top_k=top_k,
-            include_sources=show_sources
-        )
+        response = answer_fixed_prompt(chatbot, vector_store, query, top_k,
+                                       session=st.session_state.retrieval_session,
+                                       filters=recipe_filters)
+        
+        if response["success"]:
+            message_data = {
+                "role": "assistant",
+                "content": response["response"]
+            }
+            if show_sources and "sources" in response:
+                message_data["sources"] = response["sources"]
+            if response.get("mode") == "template":
+                message_data.update({"mode": "template", "query": query})
+            
+            st.session_state.messages.append(message_data)
+        
+        st.rerun()
+    
+    # Handle permintaan penjelasan AI untuk jawaban templat
+    if "elaborate_query" in st.session_state:
+        query = st.session_state.elaborate_query
+        del st.session_state.elaborate_query
+        
+        with st.spinner("Menyiapkan penjelasan lengkap..."):
+            response = chatbot.chat(query=query, top_k=top_k, include_sources=True,
+                                    filters=recipe_filters, elaborate=True,
+                                    session=st.session_state.retrieval_session)
         
         if response["success"]:
             message_data = {
                 "role": "assistant",
                 "content": response["response"]
             }
-            if "sources" in response:
+            if show_sources and "sources" in response:
                 message_data["sources"] = response["sources"]
             
             st.session_state.messages.append(message_data)
+        else:
+            st.error(response["response"])
         
         st.rerun()
 
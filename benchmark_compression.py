@@ -0,0 +1,64 @@
+"""
+Script untuk membandingkan setting kompresi vektor (memori, latency, recall)
+"""
+
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.chatbot_factory import build_vector_store_from_env
+from src.vector_compression import benchmark_compression, DEFAULT_SETTINGS
+from src.intent_router import TRAINING_EXAMPLES
+
+
+def parse_setting(value: str):
+    """
+    Parsing setting "metode/dimensi/kuantisasi", mis. "pca/256/int8" atau "none/-/float16"
+    """
+    method, dims, quantization = value.split("/")
+    return method, (int(dims) if dims not in ("", "-") else None), quantization
+
+
+def main():
+    # .env dimuat sebelum parser agar default argumen memakai nilainya
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Benchmark kompresi vektor embedding resep")
+    parser.add_argument("--setting", action="append", type=parse_setting,
+                        help="Setting metode/dimensi/kuantisasi (boleh berulang; default grid bawaan)")
+    parser.add_argument("--top-k", type=int, default=5, help="Jumlah hasil yang dibandingkan")
+    parser.add_argument("--rescore", type=int, default=int(os.getenv("RESCORE_CANDIDATES", "20")),
+                        help="Jumlah kandidat yang dinilai ulang full precision")
+    args = parser.parse_args()
+
+    if not os.path.exists("./chroma_db"):
+        print("Error: Vector store belum disetup. Jalankan setup_database.py terlebih dahulu!")
+        sys.exit(1)
+
+    vector_store = build_vector_store_from_env()
+    queries = [query for intent, query in TRAINING_EXAMPLES if intent != "general"]
+
+    reports = benchmark_compression(vector_store, queries, settings=args.setting or DEFAULT_SETTINGS,
+                                    top_k=args.top_k, rescore_candidates=args.rescore)
+
+    print("\n" + "=" * 106)
+    print(f"BENCHMARK KOMPRESI VEKTOR ({len(queries)} query, recall@{args.top_k}, rescore {args.rescore})")
+    print("=" * 106)
+    print(f"{'Setting':<28}{'Memori':>12}{'Rasio':>8}{'Total':>14}{'ms':>9}{'ms+rescore':>12}"
+          f"{'Recall':>9}{'Recall+rescore':>16}")
+    for report in reports:
+        rescored_ms = report['latency_rescored_ms']
+        print(f"{report['setting']:<28}{report['memory_bytes'] / 1024:>10.1f}KB{report['memory_ratio']:>8.3f}"
+              f"{report['resident_bytes'] / 1024:>12.1f}KB"
+              f"{report['latency_ms']:>9.3f}{(f'{rescored_ms:.3f}' if rescored_ms is not None else '-'):>12}"
+              f"{report['recall']:>9.3f}{report['recall_rescored']:>16.3f}")
+    print(f"\nTotal = vektor float32 yang tetap dimuat ChromaDB "
+          f"({reports[0]['chroma_bytes'] / 1024:.1f} KB, resep + chunk section) + index terkompresi")
+
+
+if __name__ == "__main__":
+    main()
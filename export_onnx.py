@@ -0,0 +1,83 @@
+"""
+Script untuk mengekspor model embedding ke ONNX dan membandingkan backend
+(kompatibilitas embedding, latency query, dan throughput batch)
+"""
+
+import os
+import sys
+import argparse
+from itertools import islice
+from dotenv import load_dotenv
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.onnx_embedding import (export_onnx, OnnxSentenceEncoder, compare_embeddings,
+                                benchmark_encoder, ONNX_AVAILABLE)
+from src.data_processor import RecipePreprocessor
+from src.intent_router import TRAINING_EXAMPLES
+
+
+def load_documents(data_path: str, limit: int):
+    """
+    Teks resep yang sudah diformat untuk embedding (seperti saat ingest)
+    """
+    preprocessor = RecipePreprocessor()
+    recipes = (recipe for batch in preprocessor.iter_processed_batches(data_path, batch_size=256)
+               for recipe in batch)
+    return [preprocessor.format_recipe_for_embedding(recipe) for recipe in islice(recipes, limit)]
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Export model embedding ke ONNX dan benchmark backend")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL",
+                                                     "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"))
+    parser.add_argument("--output", default=os.getenv("ONNX_MODEL_DIR", "./models/onnx"),
+                        help="Direktori hasil export")
+    parser.add_argument("--quantize", action="store_true", help="Buat juga model int8 (kuantisasi dinamis)")
+    parser.add_argument("--skip-export", action="store_true", help="Pakai hasil export yang sudah ada")
+    parser.add_argument("--data", default="./data/resep_indonesia.json", help="Data resep untuk benchmark")
+    parser.add_argument("--docs", type=int, default=200, help="Jumlah resep untuk benchmark throughput")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if not ONNX_AVAILABLE:
+        print("Error: onnxruntime dan tokenizers belum terinstall. Install dengan: pip install onnxruntime tokenizers")
+        sys.exit(1)
+
+    if not args.skip_export:
+        print(f"Mengekspor {args.model} ke {args.output}...")
+        config = export_onnx(args.model, args.output, quantize=args.quantize)
+        print(f"   ✓ Pooling {config['pooling']}, normalize {config['normalize']}, dimensi {config['dimension']}")
+
+    from sentence_transformers import SentenceTransformer
+
+    queries = [query for _intent, query in TRAINING_EXAMPLES]
+    documents = load_documents(args.data, args.docs)
+    encoders = {"torch": SentenceTransformer(args.model, device="cpu"),
+                "onnx": OnnxSentenceEncoder(args.output)}
+    if os.path.exists(os.path.join(args.output, "model_int8.onnx")):
+        encoders["onnx-int8"] = OnnxSentenceEncoder(args.output, quantized=True)
+
+    reference = encoders["torch"].encode(queries + documents, batch_size=args.batch_size)
+
+    print("\n" + "=" * 86)
+    print(f"BENCHMARK BACKEND EMBEDDING ({len(queries)} query, {len(documents)} resep, batch {args.batch_size})")
+    print("=" * 86)
+    print(f"{'Backend':<12}{'p50 ms':>9}{'p95 ms':>9}{'teks/detik':>12}{'max |diff|':>13}{'cos rata2':>12}{'cos min':>10}")
+    for name, encoder in encoders.items():
+        timing = benchmark_encoder(encoder, queries, documents, batch_size=args.batch_size)
+        compatibility = compare_embeddings(reference, encoder.encode(queries + documents, batch_size=args.batch_size))
+        print(f"{name:<12}{timing['latency_p50_ms']:>9.2f}{timing['latency_p95_ms']:>9.2f}"
+              f"{timing['throughput_per_sec']:>12.1f}{compatibility['max_abs_diff']:>13.2e}"
+              f"{compatibility['mean_cosine']:>12.6f}{compatibility['min_cosine']:>10.6f}")
+
+    print("\nAktifkan dengan EMBEDDING_BACKEND=onnx (ONNX_QUANTIZED=true untuk model int8).")
+    print("Embedding int8 sedikit berbeda dari float32: jalankan ulang setup_database.py jika")
+    print("backend dokumen dan query tidak sama.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Script untuk menjawab banyak pertanyaan secara batch dari file JSONL
+"""
+
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.chatbot_factory import build_chatbot_from_env
+from src.batch_runner import BatchRunner
+
+
+def main():
+    # .env dimuat sebelum parser agar default argumen memakai nilainya
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Batch question-answering dari file JSONL")
+    parser.add_argument("input", help="File JSONL berisi pertanyaan")
+    parser.add_argument("output", help="File JSONL untuk hasil (ditulis bertahap)")
+    parser.add_argument("--query-field", default="query", help="Nama field pertanyaan (default: query)")
+    parser.add_argument("--id-field", default="id", help="Nama field id (default: id)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jumlah worker paralel")
+    parser.add_argument("--top-k", type=int, default=int(os.getenv("TOP_K_RETRIEVAL", "3")))
+    parser.add_argument("--no-resume", action="store_true", help="Tulis ulang output dari awal")
+    args = parser.parse_args()
+
+    if not os.path.exists("./chroma_db"):
+        print("Error: Vector store belum disetup. Jalankan setup_database.py terlebih dahulu!")
+        sys.exit(1)
+
+    chatbot, _vector_store = build_chatbot_from_env(top_k=args.top_k)
+
+    runner = BatchRunner(
+        chatbot,
+        concurrency=args.concurrency,
+        top_k=args.top_k
+    )
+
+    stats = runner.run(
+        args.input,
+        args.output,
+        query_field=args.query_field,
+        id_field=args.id_field,
+        resume=not args.no_resume
+    )
+
+    print("\n" + "=" * 60)
+    print("BATCH SELESAI")
+    print("=" * 60)
+    print(f"Diproses     : {stats['processed']} (dilewati {stats['skipped']})")
+    print(f"Sukses/Gagal : {stats['succeeded']}/{stats['failed']}")
+    print(f"Durasi       : {stats['elapsed_seconds']} detik")
+    print(f"Throughput   : {stats['throughput_qps']} query/detik")
+    print(f"Latency p50  : {stats['latency_p50']} detik")
+    print(f"Latency p95  : {stats['latency_p95']} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,14 +10,49 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.data_processor import RecipePreprocessor
 from src.vector_store import RecipeVectorStore
+from src.category_index import CategoryPartitionIndex
+from src.ingredient_index import IngredientIndex
+from src.category_recommendations import CategoryRecommendations
+from src.context_compressor import LineVectorCache
+from src.dedup import NearDuplicateDetector, DEDUP_POLICIES
 
 
-def setup_vector_store(data_path: str = "./data/resep_indonesia.json"):
+def setup_vector_store(data_path: str = "./data/resep_indonesia.json", batch_size: int = 256,
+                       dedup_policy: str = "skip", dedup_threshold: float = 0.85,
+                       index_sections: bool = True, chunk_size: int = 1000, chunk_overlap: int = 200,
+                       category_partitions: bool = True, exact_threshold: int = 500,
+                       similar_k: int = 5, recommendations_per_category: int = 10,
+                       compress_vectors: bool = False,
+                       vector_reduction: str = "pca", vector_dims: int = 256,
+                       vector_quantization: str = "int8", embedding_backend: str = "torch",
+                       onnx_model_dir: str = "./models/onnx", onnx_quantized: bool = False):
     """
     Load data resep dan simpan ke vector store
     
+    Resep dibaca, diproses, di-embed, dan disimpan per batch sehingga
+    pemakaian memori tetap konstan walaupun file data sangat besar.
+    
     Args:
-        data_path: Path ke file JSON resep
+        data_path: Path ke file resep (.json array atau .jsonl)
+        batch_size: Jumlah resep per batch
+        dedup_policy: Penanganan resep near-duplicate: "skip" (buang),
+            "merge" (buang, nama dicatat sebagai nama_lain resep kanonik), atau "off"
+        dedup_threshold: Minimum kemiripan isi (estimasi Jaccard) untuk duplikat
+        index_sections: Index juga chunk per section resep (header/bahan/langkah/tips)
+        chunk_size: Maksimum karakter per chunk section
+        chunk_overlap: Maksimum karakter overlap antar chunk section
+        category_partitions: Bangun sub-index per kategori untuk retrieve_by_category
+        exact_threshold: Kategori dengan jumlah resep <= nilai ini dicari secara exact
+            (tanpa collection ANN sendiri)
+        similar_k: Jumlah resep serupa per resep di graph kNN
+        recommendations_per_category: Jumlah rekomendasi (MMR) yang dihitung per kategori
+        compress_vectors: Bangun index vektor terkompresi untuk COMPRESSED_SEARCH
+        vector_reduction: Reduksi dimensi index terkompresi ("none", "pca", "truncate")
+        vector_dims: Jumlah dimensi setelah reduksi
+        vector_quantization: Kuantisasi index terkompresi ("float32", "float16", "int8")
+        embedding_backend: Backend embedding ("torch" atau "onnx")
+        onnx_model_dir: Direktori model ONNX hasil export_onnx.py
+        onnx_quantized: Pakai model ONNX int8
     """
     print("=" * 60)
     print("SETUP VECTOR STORE - CHATBOT ASISTEN MEMASAK")
@@ -26,32 +61,22 @@ def setup_vector_store(data_path: str = "./data/resep_indonesia.json"):
     # 1. Initialize preprocessor
     print("\n1. Inisialisasi Data Preprocessor...")
     preprocessor = RecipePreprocessor()
+    detector = None
+    if dedup_policy in DEDUP_POLICIES:
+        detector = NearDuplicateDetector(threshold=dedup_threshold)
+        print(f"   Deteksi near-duplicate aktif (policy: {dedup_policy})")
     
-    # 2. Load dan process recipes
-    print(f"\n2. Memuat data resep dari {data_path}...")
-    try:
-        recipes = preprocessor.load_from_json(data_path)
-        print(f"   ✓ Berhasil memuat {len(recipes)} resep")
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
-        return
-    
-    # 3. Format recipes untuk embedding
-    print("\n3. Memformat resep untuk embedding...")
-    recipe_texts = []
-    for recipe in recipes:
-        text = preprocessor.format_recipe_for_embedding(recipe)
-        recipe_texts.append(text)
-    print(f"   ✓ {len(recipe_texts)} resep siap untuk embedding")
-    
-    # 4. Initialize vector store
-    print("\n4. Inisialisasi Vector Store...")
+    # 2. Initialize vector store
+    print("\n2. Inisialisasi Vector Store...")
     vector_store = RecipeVectorStore(
         persist_directory="./chroma_db",
-        collection_name="indonesian_recipes"
+        collection_name="indonesian_recipes",
+        embedding_backend=embedding_backend,
+        onnx_model_dir=onnx_model_dir,
+        onnx_quantized=onnx_quantized
     )
     
-    # 5. Check if already has data
+    # 3. Check if already has data
     current_count = vector_store.collection.count()
     if current_count > 0:
         print(f"\n   ⚠ Vector store sudah berisi {current_count} dokumen")
@@ -63,44 +88,102 @@ def setup_vector_store(data_path: str = "./data/resep_indonesia.json"):
             print("   Setup dibatalkan")
             return
     
-    # 6. Add recipes to vector store
-    print("\n5. Menambahkan resep ke Vector Store...")
+    # 4. Load, process, format, dan add recipes per batch
+    print(f"\n3. Memuat dan menambahkan resep dari {data_path} (batch {batch_size})...")
     print("   (Proses embedding membutuhkan waktu...)")
+    total_added = 0
+    ingredient_index = IngredientIndex()
+    line_vectors = LineVectorCache()
     try:
-        vector_store.add_recipes(recipes, recipe_texts)
-        print(f"   ✓ Berhasil menambahkan {len(recipes)} resep ke vector store")
+        for recipes in preprocessor.iter_processed_batches(data_path, batch_size=batch_size):
+            ids = [vector_store.recipe_id(i) for i in range(total_added, total_added + len(recipes))]
+            duplicates = {}
+            if detector is not None:
+                recipes, ids, duplicates = detector.filter_batch(recipes, ids)
+            
+            if recipes:
+                recipe_texts = [preprocessor.format_recipe_for_embedding(recipe) for recipe in recipes]
+                vector_store.add_recipes(recipes, recipe_texts, ids=ids)
+                total_added += len(recipes)
+                for recipe_id, recipe in zip(ids, recipes):
+                    ingredient_index.add(recipe_id, recipe)
+                # Vektor per baris unik untuk kompresi context saat query
+                line_vectors.add_recipes(recipes, vector_store.embedding_function)
+                
+                if index_sections:
+                    sections = [
+                        preprocessor.split_recipe_into_sections(recipe, chunk_size, chunk_overlap)
+                        for recipe in recipes
+                    ]
+                    vector_store.add_recipe_sections(recipes, ids, sections)
+            
+            if dedup_policy == "merge":
+                for canonical_id, names in duplicates.items():
+                    vector_store.add_aliases(canonical_id, names)
+        
+        print(f"   ✓ Berhasil menambahkan {total_added} resep ke vector store")
+        
+        ingredient_index.save(IngredientIndex.default_path(vector_store))
+        print(f"   ✓ Ingredient index: {len(ingredient_index.vocabulary)} bahan unik")
+        line_vectors.save(LineVectorCache.default_path(vector_store))
+        print(f"   ✓ Cache vektor baris: {len(line_vectors)} baris unik")
+        # Dibangun setelah semua batch (termasuk nama_lain hasil merge) masuk collection
+        doc_count = vector_store.build_document_store()
+        print(f"   ✓ Document store lokal: {doc_count} resep")
+        if detector is not None:
+            print(f"   ✓ Near-duplicate dilewati: {detector.stats['duplicates']} "
+                  f"dari {detector.stats['checked']} resep")
     except Exception as e:
         print(f"   ✗ Error: {e}")
         return
     
-    # 7. Verify
-    print("\n6. Verifikasi...")
+    # 5. Verify
+    print("\n4. Verifikasi...")
     stats = vector_store.get_stats()
     print(f"   Total resep dalam database: {stats['total_recipes']}")
     print(f"   Jumlah kategori: {stats['num_categories']}")
     print(f"   Kategori tersedia: {', '.join(stats['categories'])}")
     
-    # 8. Test search
-    print("\n7. Test Pencarian...")
+    graph_stats = vector_store.update_similarity_graph(k=similar_k)
+    print(f"   Graph resep serupa (k={similar_k}): {graph_stats['added']} ditambah, "
+          f"{graph_stats['removed']} dihapus, {graph_stats['recomputed']} dihitung ulang")
+    
+    recommendations = CategoryRecommendations.build(vector_store, top_n=recommendations_per_category)
+    recommendations.save(CategoryRecommendations.default_path(vector_store))
+    print(f"   Rekomendasi kategori: {recommendations_per_category} resep per kategori")
+    
+    if compress_vectors:
+        compressed = vector_store.build_compressed_index(vector_reduction, vector_dims, vector_quantization)
+        print(f"   Index terkompresi: {compressed.method}/{compressed.dims}/{compressed.quantization}, "
+              f"{compressed.memory_bytes() / 1024:.1f} KB")
+    
+    if category_partitions:
+        layout = CategoryPartitionIndex(vector_store, exact_threshold=exact_threshold).build()
+        for category, kind in layout.items():
+            print(f"   - Partisi {category}: {kind}")
+    
+    # 6. Test search
+    print("\n5. Test Pencarian...")
     test_query = "cara membuat nasi goreng"
     print(f"   Query test: '{test_query}'")
     
     results = vector_store.search(test_query, top_k=3)
     print(f"   Hasil pencarian:")
     for i, result in enumerate(results['results'], 1):
-        print(f"   {i}. {result['metadata']['nama']} (distance: {result['distance']:.4f})")
+        print(f"   {i}. {result.metadata.nama} (distance: {result.distance:.4f})")
     
     print("\n" + "=" * 60)
     print("SETUP SELESAI!")
     print("=" * 60)
     print("\nVector store siap digunakan.")
+    print("Isi ulang cache jawaban (collection berubah): python warm_cache.py")
     print("Anda dapat menjalankan chatbot dengan: streamlit run app.py")
     print("=" * 60)
 
 
 if __name__ == "__main__":
-    # Check if data file exists
-    data_file = "./data/resep_indonesia.json"
+    # Check if data file exists (bisa diganti lewat argumen, mis. dump .jsonl besar)
+    data_file = sys.argv[1] if len(sys.argv) > 1 else "./data/resep_indonesia.json"
     
     if not os.path.exists(data_file):
         print(f"Error: File {data_file} tidak ditemukan!")
@@ -108,4 +191,22 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Run setup
-    setup_vector_store(data_file)
+    setup_vector_store(
+        data_file,
+        batch_size=int(os.getenv("INGEST_BATCH_SIZE", "256")),
+        dedup_policy=os.getenv("DEDUP_POLICY", "skip"),
+        dedup_threshold=float(os.getenv("DEDUP_THRESHOLD", "0.85")),
+        index_sections=os.getenv("USE_SECTION_CHUNKS", "true").lower() == "true",
+        chunk_size=int(os.getenv("CHUNK_SIZE", "1000")),
+        chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "200")),
+        category_partitions=os.getenv("USE_CATEGORY_PARTITIONS", "true").lower() == "true",
+        exact_threshold=int(os.getenv("CATEGORY_EXACT_THRESHOLD", "500")),
+        similar_k=int(os.getenv("SIMILAR_RECIPES_K", "5")),
+        compress_vectors=os.getenv("COMPRESSED_SEARCH", "false").lower() == "true",
+        vector_reduction=os.getenv("VECTOR_REDUCTION", "pca"),
+        vector_dims=int(os.getenv("VECTOR_DIMS", "256")),
+        vector_quantization=os.getenv("VECTOR_QUANTIZATION", "int8"),
+        embedding_backend=os.getenv("EMBEDDING_BACKEND", "torch"),
+        onnx_model_dir=os.getenv("ONNX_MODEL_DIR", "./models/onnx"),
+        onnx_quantized=os.getenv("ONNX_QUANTIZED", "false").lower() == "true"
+    )
@@ -0,0 +1,85 @@
+"""
+Modul adaptive top-k
+Jumlah resep yang masuk context ditentukan dari distribusi skor kandidat (gap skor dan
+threshold z-score terhadap background pool), bukan top_k tetap.
+"""
+
+from typing import List, Dict, Tuple
+import numpy as np
+
+
+# Threshold z-score default: kandidat harus minimal 2 standar deviasi di atas median
+# separuh bawah pool. Nilai tetap (heuristik), bukan hasil kalibrasi; ubah lewat
+# ADAPTIVE_MIN_ZSCORE jika korpus atau ukuran pool berbeda.
+DEFAULT_MIN_ZSCORE = 2.0
+
+
+def distance_to_similarity(distances) -> np.ndarray:
+    """
+    Mengubah distance ChromaDB menjadi similarity 0-1 (sama dengan retrieve_with_scores)
+    """
+    return 1.0 / (1.0 + np.asarray(distances, dtype=np.float64))
+
+
+def background_stats(similarities) -> Tuple[float, float]:
+    """
+    Skor background sebuah pool kandidat: median dan standar deviasi separuh bawah pool
+    (kandidat yang hampir pasti tidak relevan)
+    """
+    scores = np.asarray(similarities, dtype=np.float64)
+    tail = scores[scores.size // 2:]
+    if tail.size == 0:
+        return 0.0, 0.0
+    return float(np.median(tail)), float(tail.std())
+
+
+def select_adaptive(similarities: List[float], max_k: int, min_zscore: float = DEFAULT_MIN_ZSCORE,
+                    min_relative: float = 0.5, gap_fraction: float = 0.35) -> Dict:
+    """
+    Menentukan berapa kandidat teratas yang jelas relevan
+
+    Kandidat dipertahankan selama z-score-nya terhadap background pool minimal
+    min_zscore (tidak bergantung skala skor query), relevansi
+    relatifnya ((skor - background) / (skor terbaik - background)) minimal
+    min_relative, dan belum ada lompatan skor sebesar gap_fraction dari rentang
+    tersebut. Kandidat terbaik selalu dipertahankan.
+
+    Pool yang lebih kecil dari 2 * max_k tidak punya separuh bawah yang bisa dianggap
+    background (isinya kandidat itu sendiri): threshold z-score dilewati, relevansi
+    relatif dan gap diukur terhadap similarity 0.
+
+    Args:
+        similarities: Similarity kandidat, terurut dari yang tertinggi
+        max_k: Batas atas jumlah dokumen
+        min_zscore: Threshold z-score terhadap background (0 menonaktifkan)
+        min_relative: Minimum relevansi relatif terhadap kandidat terbaik
+        gap_fraction: Lompatan skor (relatif terhadap rentang) yang memotong daftar
+
+    Returns:
+        Dictionary {keep, reason}
+    """
+    scores = np.asarray(similarities, dtype=np.float64)
+    if scores.size == 0:
+        return {"keep": 0, "reason": "empty"}
+
+    limit = min(max_k, scores.size)
+    small_pool = scores.size < 2 * max_k
+    background, deviation = (0.0, 0.0) if small_pool else background_stats(scores)
+    spread = scores[0] - background
+    if spread <= 1e-9:
+        # Tidak ada kandidat yang menonjol dari pool
+        return {"keep": 1, "reason": "flat"}
+
+    keep, reason = 1, "max_k"
+    for i in range(1, limit):
+        if not small_pool and (scores[i] - background) / max(deviation, 1e-9) < min_zscore:
+            reason = "threshold"
+            break
+        if (scores[i] - background) / spread < min_relative:
+            reason = "relative"
+            break
+        if scores[i - 1] - scores[i] >= gap_fraction * spread:
+            reason = "gap"
+            break
+        keep += 1
+    return {"keep": keep, "reason": reason}
@@ -0,0 +1,273 @@
+"""
+Modul cache jawaban untuk prompt tetap di UI
+Menyimpan hasil retrieval + jawaban untuk contoh pertanyaan dan prompt kategori
+secara persisten, sehingga klik tombol di app.py bisa dijawab seketika
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from typing import List, Dict, Optional, Tuple
+
+
+# Contoh pertanyaan yang tampil sebagai tombol di app.py (label, query)
+EXAMPLE_QUESTIONS = [
+    ("Resep Nasi Goreng", "Bagaimana cara membuat nasi goreng yang enak dan pulen?"),
+    ("Cara Masak Rendang", "Bagaimana cara membuat rendang sapi yang empuk dan bumbu meresap?"),
+    ("Resep Soto Ayam", "Apa bahan-bahan dan cara membuat soto ayam kuning?"),
+    ("Tips Tumis Sayur", "Bagaimana tips menumis sayuran agar tetap renyah?"),
+    ("Substitusi Bahan", "Kalau tidak ada kecap manis, bisa diganti dengan apa?"),
+    ("Rekomendasi Menu", "Bisa rekomendasikan menu masakan Indonesia untuk makan siang keluarga?"),
+]
+
+
+CATEGORY_PROMPT_PREFIX = "Tolong rekomendasikan resep dari kategori "
+
+
+def build_category_prompt(category: str) -> str:
+    """
+    Membuat prompt rekomendasi untuk satu kategori
+
+    Args:
+        category: Nama kategori
+
+    Returns:
+        Prompt yang dikirim saat tombol kategori diklik
+    """
+    return f"{CATEGORY_PROMPT_PREFIX}{category}"
+
+
+def parse_category_prompt(prompt: str) -> Optional[str]:
+    """
+    Mengambil nama kategori dari prompt tombol kategori
+
+    Args:
+        prompt: Prompt tetap
+
+    Returns:
+        Nama kategori, atau None jika bukan prompt kategori
+    """
+    if prompt.startswith(CATEGORY_PROMPT_PREFIX):
+        return prompt[len(CATEGORY_PROMPT_PREFIX):] or None
+    return None
+
+
+def get_fixed_prompts(categories: List[str]) -> List[str]:
+    """
+    Mendapatkan semua prompt tetap di UI (contoh pertanyaan + prompt kategori)
+
+    Args:
+        categories: List kategori di vector store
+
+    Returns:
+        List prompt
+    """
+    prompts = [query for _label, query in EXAMPLE_QUESTIONS]
+    prompts.extend(build_category_prompt(category) for category in categories)
+    return prompts
+
+
+class AnswerCache:
+    """
+    Cache jawaban persisten (file JSON) dengan refresh di background
+
+    Hanya prompt tetap yang di-cache, sehingga ukuran cache terbatas pada jumlah
+    tombol di UI; query bebas (mis. dari chip resep terkait) tidak pernah disimpan.
+    """
+
+    def __init__(self, cache_path: str = "./cache/answer_cache.json",
+                 ttl_seconds: float = 24 * 3600,
+                 allowed_prompts: Optional[List[str]] = None):
+        """
+        Inisialisasi answer cache
+
+        Args:
+            cache_path: Path file cache
+            ttl_seconds: Umur entry (detik) sebelum dianggap stale
+            allowed_prompts: Prompt yang boleh di-cache (biasanya get_fixed_prompts);
+                None berarti semua prompt
+        """
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.allowed_prompts = None
+        if allowed_prompts is not None:
+            self.allowed_prompts = {self.normalize_prompt(prompt) for prompt in allowed_prompts}
+        self._lock = threading.Lock()
+        # Menyerialkan penulisan file agar snapshot lama tidak menimpa yang baru
+        self._save_lock = threading.Lock()
+        self._refreshing = set()
+        self._entries: Dict[str, Dict] = {}
+        self._load()
+
+    @staticmethod
+    def normalize_prompt(query: str) -> str:
+        return ' '.join(query.lower().split())
+
+    @classmethod
+    def make_key(cls, query: str, top_k: int) -> str:
+        return f"{top_k}|{cls.normalize_prompt(query)}"
+
+    def is_cacheable(self, query: str) -> bool:
+        """
+        Mengecek apakah query termasuk prompt tetap yang boleh di-cache
+        """
+        return self.allowed_prompts is None or self.normalize_prompt(query) in self.allowed_prompts
+
+    def _load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Answer cache tidak bisa dibaca, mulai dari kosong: {e}")
+            self._entries = {}
+            return
+
+        # Entry untuk query bebas dari versi lama dibuang
+        self._entries = {key: entry for key, entry in self._entries.items()
+                         if self.is_cacheable(entry.get("query", ""))}
+
+    def _save(self):
+        """
+        Menyimpan cache ke disk secara atomik (tulis ke file sementara unik lalu rename)
+        """
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._save_lock:
+            with self._lock:
+                snapshot = dict(self._entries)
+            fd, tmp_path = tempfile.mkstemp(dir=directory or ".", suffix=".tmp",
+                                            prefix=f"{os.path.basename(self.cache_path)}.")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def get(self, query: str, top_k: int, fingerprint: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Mengambil jawaban dari cache
+
+        Args:
+            query: Prompt
+            top_k: Jumlah dokumen yang diambil
+            fingerprint: Fingerprint collection saat ini
+
+        Returns:
+            Tuple (response atau None, apakah entry sudah stale)
+        """
+        if not self.is_cacheable(query):
+            return None, False
+
+        with self._lock:
+            entry = self._entries.get(self.make_key(query, top_k))
+
+        # Entry dari collection lama dianggap tidak ada
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None, False
+
+        is_stale = time.time() - entry["created_at"] > self.ttl_seconds
+        return entry["response"], is_stale
+
+    def put(self, query: str, top_k: int, fingerprint: str, response: Dict, save: bool = True):
+        """
+        Menyimpan jawaban ke cache
+
+        Args:
+            query: Prompt
+            top_k: Jumlah dokumen yang diambil
+            fingerprint: Fingerprint collection saat jawaban dibuat
+            response: Hasil RAGChatbot.chat
+            save: Langsung tulis ke disk
+
+        Returns:
+            True jika disimpan, False jika query bukan prompt tetap
+        """
+        if not self.is_cacheable(query):
+            return False
+
+        with self._lock:
+            self._entries[self.make_key(query, top_k)] = {
+                "query": query,
+                "top_k": top_k,
+                "fingerprint": fingerprint,
+                "created_at": time.time(),
+                "response": response
+            }
+        if save:
+            self._save()
+        return True
+
+    def refresh_async(self, chatbot, query: str, top_k: int, fingerprint: str):
+        """
+        Memperbarui satu entry di background thread (sekali per key)
+
+        Args:
+            chatbot: Instance RAGChatbot
+            query: Prompt
+            top_k: Jumlah dokumen yang diambil
+            fingerprint: Fingerprint collection saat ini
+        """
+        if not self.is_cacheable(query):
+            return
+
+        key = self.make_key(query, top_k)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def worker():
+            try:
+                response = chatbot.chat(query=query, top_k=top_k, include_sources=True,
+                                        category=parse_category_prompt(query))
+                if response["success"]:
+                    self.put(query, top_k, fingerprint, response)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def warm_up(self, chatbot, prompts: List[str], top_k: int, fingerprint: str,
+                force: bool = False) -> Dict:
+        """
+        Menghitung ulang jawaban untuk semua prompt tetap
+
+        Args:
+            chatbot: Instance RAGChatbot
+            prompts: List prompt yang akan di-cache
+            top_k: Jumlah dokumen yang diambil
+            fingerprint: Fingerprint collection saat ini
+            force: Hitung ulang walaupun entry masih segar
+
+        Returns:
+            Dictionary statistik warm-up
+        """
+        stats = {"warmed": 0, "fresh": 0, "failed": 0}
+
+        for query in prompts:
+            cached, is_stale = self.get(query, top_k, fingerprint)
+            if cached is not None and not is_stale and not force:
+                stats["fresh"] += 1
+                continue
+
+            response = chatbot.chat(query=query, top_k=top_k, include_sources=True,
+                                    category=parse_category_prompt(query))
+            if response["success"]:
+                self.put(query, top_k, fingerprint, response, save=False)
+                stats["warmed"] += 1
+            else:
+                print(f"  ✗ Gagal warm-up '{query}': {response.get('error')}")
+                stats["failed"] += 1
+
+        self._save()
+        return stats
@@ -0,0 +1,299 @@
+"""
+Modul Batch Runner untuk menjawab banyak pertanyaan secara offline
+Membaca query dari file JSONL, menjalankan RAGChatbot.chat dengan
+konkurensi terbatas, lalu menulis hasil ke JSONL. Retry dan rate limiting
+panggilan LLM ditangani ResilientLLMClient milik chatbot (tidak diulang di sini).
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Iterator, Set
+
+
+class BatchRunner:
+    """
+    Kelas untuk menjalankan banyak query melalui RAGChatbot secara batch
+    """
+
+    def __init__(self,
+                 chatbot,
+                 concurrency: int = 4,
+                 top_k: int = 3,
+                 include_sources: bool = True):
+        """
+        Inisialisasi batch runner
+
+        Args:
+            chatbot: Instance RAGChatbot (atau objek dengan method chat)
+            concurrency: Jumlah worker yang berjalan bersamaan
+            top_k: Jumlah dokumen yang diambil per query
+            include_sources: Include sumber resep dalam hasil
+        """
+        self.chatbot = chatbot
+        self.concurrency = max(1, concurrency)
+        self.top_k = top_k
+        self.include_sources = include_sources
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def read_queries(input_path: str,
+                     query_field: str = "query",
+                     id_field: str = "id") -> Iterator[Dict]:
+        """
+        Membaca query dari file JSONL
+
+        Args:
+            input_path: Path file JSONL input
+            query_field: Nama field yang berisi pertanyaan
+            id_field: Nama field yang berisi id unik
+
+        Returns:
+            Iterator dictionary {"id", "query"}; baris JSON yang rusak menjadi item
+            dengan "error" (dicatat gagal, batch tetap berjalan). Baris tanpa id memakai
+            id "line:<nomor baris>" agar tidak bentrok dengan id asli seperti "2".
+        """
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {
+                        "id": line_id(line_number),
+                        "query": None,
+                        "line": line_number,
+                        "error": f"JSON tidak valid di baris {line_number}: {e}"
+                    }
+                    continue
+                if not isinstance(record, dict):
+                    yield {
+                        "id": line_id(line_number),
+                        "query": None,
+                        "line": line_number,
+                        "error": f"Baris {line_number} bukan objek JSON"
+                    }
+                    continue
+                query = record.get(query_field)
+                if not query:
+                    print(f"Baris {line_number} dilewati: field '{query_field}' kosong")
+                    continue
+
+                record_id = record.get(id_field)
+                yield {
+                    "id": str(record_id) if record_id is not None else line_id(line_number),
+                    "query": query
+                }
+
+    @staticmethod
+    def load_completed_ids(output_path: str) -> Set[str]:
+        """
+        Membaca id yang sudah berhasil diproses (untuk resume)
+
+        Args:
+            output_path: Path file JSONL output
+
+        Returns:
+            Set id yang sudah selesai dengan sukses
+        """
+        completed = set()
+        if not os.path.exists(output_path):
+            return completed
+
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika proses berhenti mendadak
+                    continue
+                if record.get("success"):
+                    completed.add(str(record.get("id")))
+
+        return completed
+
+    @staticmethod
+    def repair_partial_line(output_path: str):
+        """
+        Membuang baris terakhir yang terpotong (proses berhenti saat menulis) sebelum
+        file output ditambah, agar hasil baru tidak tersambung ke baris rusak itu
+
+        Args:
+            output_path: Path file JSONL output
+        """
+        if not os.path.exists(output_path):
+            return
+
+        with open(output_path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            # Mundur per blok sampai menemukan newline terakhir
+            position = size
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                block = f.read(position - start)
+                newline = block.rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                position = start
+            f.truncate(0)
+
+    def _run_one(self, item: Dict) -> Dict:
+        """
+        Menjalankan satu query (retry sudah dilakukan client LLM chatbot)
+
+        Args:
+            item: Dictionary {"id", "query"}
+
+        Returns:
+            Dictionary hasil untuk ditulis ke output
+        """
+        if item.get("error"):
+            # Baris input rusak: tidak dikirim ke chatbot
+            return {
+                "id": item["id"],
+                "query": item["query"],
+                "line": item["line"],
+                "success": False,
+                "latency": 0.0,
+                "error": item["error"]
+            }
+
+        start_time = time.monotonic()
+        response = None
+        error = None
+
+        try:
+            response = self.chatbot.chat(
+                query=item["query"],
+                top_k=self.top_k,
+                include_sources=self.include_sources
+            )
+            if not response.get("success"):
+                error = response.get("error", "Unknown error")
+        except Exception as e:
+            error = str(e)
+
+        result = {
+            "id": item["id"],
+            "query": item["query"],
+            "success": error is None,
+            "latency": round(time.monotonic() - start_time, 3)
+        }
+
+        if response:
+            result["response"] = response.get("response")
+            result["retrieval"] = response.get("retrieval")
+            if "sources" in response:
+                result["sources"] = response["sources"]
+
+        if error is not None:
+            result["error"] = error
+
+        return result
+
+    def _write_result(self, output_file, result: Dict):
+        """
+        Menulis satu hasil ke file output secara thread-safe
+        """
+        with self._write_lock:
+            output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output_file.flush()
+
+    def run(self, input_path: str, output_path: str,
+            query_field: str = "query", id_field: str = "id",
+            resume: bool = True) -> Dict:
+        """
+        Menjalankan seluruh query dari file input
+
+        Args:
+            input_path: Path file JSONL input
+            output_path: Path file JSONL output (ditulis bertahap)
+            query_field: Nama field pertanyaan di input
+            id_field: Nama field id di input
+            resume: Lewati id yang sudah sukses di file output
+
+        Returns:
+            Dictionary berisi statistik throughput
+        """
+        if resume:
+            self.repair_partial_line(output_path)
+        completed = self.load_completed_ids(output_path) if resume else set()
+        items = [
+            item for item in self.read_queries(input_path, query_field, id_field)
+            if item["id"] not in completed
+        ]
+
+        print(f"Total query: {len(items) + len(completed)} "
+              f"(dilewati {len(completed)}, diproses {len(items)})")
+
+        succeeded = 0
+        failed = 0
+        latencies: List[float] = []
+        start_time = time.monotonic()
+
+        mode = 'a' if resume else 'w'
+        with open(output_path, mode, encoding='utf-8') as output_file:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [executor.submit(self._run_one, item) for item in items]
+
+                for done, future in enumerate(as_completed(futures), 1):
+                    result = future.result()
+                    self._write_result(output_file, result)
+                    latencies.append(result["latency"])
+
+                    if result["success"]:
+                        succeeded += 1
+                    else:
+                        failed += 1
+
+                    if done % 10 == 0 or done == len(items):
+                        elapsed = time.monotonic() - start_time
+                        print(f"  {done}/{len(items)} selesai "
+                              f"({done / elapsed:.2f} query/detik)")
+
+        elapsed = time.monotonic() - start_time
+        latencies.sort()
+
+        return {
+            "processed": len(items),
+            "skipped": len(completed),
+            "succeeded": succeeded,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_qps": round(len(items) / elapsed, 3) if elapsed > 0 else 0.0,
+            "latency_p50": _percentile(latencies, 0.50),
+            "latency_p95": _percentile(latencies, 0.95)
+        }
+
+
+def line_id(line_number: int) -> str:
+    """
+    Id untuk baris input tanpa id (atau rusak), dibedakan dari id asli
+    """
+    return f"line:{line_number}"
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """
+    Menghitung persentil dari list yang sudah terurut
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,235 @@
+"""
+Modul sub-index per kategori
+Setiap kategori punya partisi sendiri: kategori kecil dicari secara exact (brute-force
+numpy di memori), kategori besar memakai collection ChromaDB (HNSW) tersendiri,
+sehingga pencarian per kategori tidak perlu filtered ANN di index global.
+"""
+
+import re
+from typing import List, Dict, Optional
+import numpy as np
+from src.records import RecipeMetadata, SearchHit
+
+
+# Batas jumlah dokumen per collection.add (ChromaDB membatasi ukuran batch)
+_ADD_BATCH_SIZE = 1000
+
+
+def _matches_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """
+    Mengevaluasi filter where gaya ChromaDB terhadap satu metadata (untuk partisi exact)
+    """
+    if not where:
+        return True
+    if "$and" in where:
+        return all(_matches_where(metadata, condition) for condition in where["$and"])
+    if "$or" in where:
+        return any(_matches_where(metadata, condition) for condition in where["$or"])
+
+    for field, condition in where.items():
+        value = metadata.get(field)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, expected in condition.items():
+            if operator == "$eq" and value != expected:
+                return False
+            if operator == "$ne" and value == expected:
+                return False
+            if operator == "$in" and value not in expected:
+                return False
+            if operator == "$nin" and value in expected:
+                return False
+            if operator in ("$gt", "$gte", "$lt", "$lte"):
+                # Field yang tidak ada tidak lolos filter range (sama seperti ChromaDB)
+                if value is None:
+                    return False
+                if operator == "$gt" and not value > expected:
+                    return False
+                if operator == "$gte" and not value >= expected:
+                    return False
+                if operator == "$lt" and not value < expected:
+                    return False
+                if operator == "$lte" and not value <= expected:
+                    return False
+    return True
+
+
+class _ExactPartition:
+    """
+    Partisi kecil yang disimpan di memori dan dicari secara exact
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+                 embeddings: np.ndarray):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.embeddings = embeddings.astype(np.float32)
+        self.squared_norms = np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+
+    def search(self, query_embedding: np.ndarray, top_k: int,
+               where: Optional[Dict] = None) -> List[SearchHit]:
+        if not self.ids:
+            return []
+
+        # Squared L2 (metrik default collection ChromaDB), jadi distance sebanding dengan ANN
+        query_embedding = query_embedding.astype(np.float32)
+        distances = (self.squared_norms - 2 * self.embeddings @ query_embedding
+                     + float(query_embedding @ query_embedding))
+
+        hits = []
+        for idx in np.argsort(distances):
+            if not _matches_where(self.metadatas[idx], where):
+                continue
+            hits.append(SearchHit(
+                id=self.ids[idx],
+                document=self.documents[idx],
+                metadata=RecipeMetadata.from_dict(self.metadatas[idx]),
+                distance=max(float(distances[idx]), 0.0)
+            ))
+            if len(hits) >= top_k:
+                break
+        return hits
+
+
+class CategoryPartitionIndex:
+    """
+    Sub-index per kategori di atas RecipeVectorStore
+    """
+
+    def __init__(self, vector_store, exact_threshold: int = 500):
+        """
+        Inisialisasi sub-index per kategori
+
+        Args:
+            vector_store: Instance RecipeVectorStore (sumber data dan embedding function)
+            exact_threshold: Kategori dengan jumlah resep <= nilai ini dicari secara exact,
+                yang lebih besar memakai collection ANN sendiri
+        """
+        self.vector_store = vector_store
+        self.exact_threshold = exact_threshold
+        self.prefix = f"{vector_store.collection_name}_cat_"
+        self._partitions: Dict[str, object] = {}
+
+    def collection_name(self, category: str) -> str:
+        """
+        Nama collection ChromaDB untuk partisi ANN sebuah kategori
+        """
+        slug = re.sub(r'[^a-z0-9]+', '_', category.lower()).strip('_') or "lainnya"
+        return f"{self.prefix}{slug}"[:63]
+
+    def _fetch_category(self, category: str) -> Dict:
+        return self.vector_store.collection.get(
+            where={"kategori": category},
+            include=["embeddings", "documents", "metadatas"]
+        )
+
+    def build(self) -> Dict[str, str]:
+        """
+        Membangun ulang semua partisi dari collection utama
+        (dipanggil setelah setup_database selesai menambahkan resep)
+
+        Returns:
+            Dictionary {kategori: "exact" atau "ann"}
+        """
+        self.drop_partitions()
+        layout = {}
+
+        for category in self.vector_store.get_all_categories():
+            rows = self._fetch_category(category)
+            if len(rows['ids']) <= self.exact_threshold:
+                layout[category] = "exact"
+                continue
+
+            # Embedding disalin dari collection utama, tidak dihitung ulang
+            collection = self.vector_store.client.get_or_create_collection(
+                name=self.collection_name(category),
+                embedding_function=self.vector_store.embedding_function,
+                metadata={"description": f"Partisi kategori {category}"}
+            )
+            for start in range(0, len(rows['ids']), _ADD_BATCH_SIZE):
+                end = start + _ADD_BATCH_SIZE
+                collection.add(
+                    ids=rows['ids'][start:end],
+                    embeddings=[list(map(float, e)) for e in rows['embeddings'][start:end]],
+                    documents=rows['documents'][start:end],
+                    metadatas=rows['metadatas'][start:end]
+                )
+            layout[category] = "ann"
+
+        print(f"Category partitions built: {sum(1 for v in layout.values() if v == 'ann')} ANN, "
+              f"{sum(1 for v in layout.values() if v == 'exact')} exact")
+        return layout
+
+    def drop_partitions(self):
+        """
+        Menghapus semua collection partisi ANN dan cache partisi exact
+        """
+        for collection in self.vector_store.client.list_collections():
+            name = getattr(collection, "name", collection)
+            if name.startswith(self.prefix):
+                self.vector_store.client.delete_collection(name=name)
+        self._partitions = {}
+
+    def _load_partition(self, category: str):
+        partition = self._partitions.get(category)
+        if partition is not None:
+            return partition
+
+        try:
+            collection = self.vector_store.client.get_collection(
+                name=self.collection_name(category),
+                embedding_function=self.vector_store.embedding_function
+            )
+        except Exception:
+            collection = None
+
+        if collection is not None and collection.count() > 0:
+            partition = collection
+        else:
+            rows = self._fetch_category(category)
+            embeddings = rows.get('embeddings')
+            partition = _ExactPartition(
+                ids=list(rows['ids']),
+                documents=list(rows['documents']),
+                metadatas=list(rows['metadatas']),
+                embeddings=np.asarray(embeddings if embeddings is not None and len(embeddings) else
+                                      np.zeros((0, 1)), dtype=np.float32)
+            )
+
+        self._partitions[category] = partition
+        return partition
+
+    def partition_type(self, category: str) -> str:
+        """
+        Jenis partisi sebuah kategori ("exact" atau "ann")
+        """
+        return "exact" if isinstance(self._load_partition(category), _ExactPartition) else "ann"
+
+    def search(self, query: str, category: str, top_k: int = 3,
+               where: Optional[Dict] = None) -> Dict:
+        """
+        Mencari resep di partisi kategori
+
+        Args:
+            query: Pertanyaan atau query pencarian
+            category: Kategori resep
+            top_k: Jumlah hasil teratas
+            where: Filter metadata tambahan (opsional)
+
+        Returns:
+            Dictionary berisi hasil pencarian (format sama dengan search_by_category)
+        """
+        formatted_results = {"query": query, "category": category, "results": []}
+        partition = self._load_partition(category)
+
+        if isinstance(partition, _ExactPartition):
+            query_embedding = np.asarray(self.vector_store.embedding_function([query])[0])
+            formatted_results["results"] = partition.search(query_embedding, top_k, where)
+            return formatted_results
+
+        query_kwargs = {"query_texts": [query], "n_results": min(top_k, partition.count())}
+        if where:
+            query_kwargs["where"] = where
+        formatted_results["results"] = self.vector_store._query_hits(partition, query_kwargs)
+        return formatted_results
@@ -0,0 +1,123 @@
+"""
+Modul rekomendasi per kategori yang dihitung di muka
+Daftar resep rekomendasi setiap kategori dipilih saat ingest (dekat centroid kategori,
+dibuat beragam dengan MMR) dan disimpan di memori, sehingga tombol kategori di UI
+tidak memerlukan embedding query maupun vector search.
+"""
+
+import os
+import json
+from typing import List, Dict, Optional
+import numpy as np
+
+
+def mmr_select(embeddings: np.ndarray, top_n: int, diversity: float = 0.3) -> List[int]:
+    """
+    Memilih resep yang mewakili kategori dengan Maximal Marginal Relevance
+
+    Args:
+        embeddings: Matriks embedding resep dalam satu kategori
+        top_n: Jumlah resep yang dipilih
+        diversity: Bobot keberagaman (0 = paling dekat centroid saja, 1 = paling beragam)
+
+    Returns:
+        List index baris terpilih, terurut sesuai urutan pemilihan
+    """
+    if len(embeddings) == 0:
+        return []
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.maximum(norms, 1e-12)
+    centroid = normalized.mean(axis=0)
+    centroid /= max(np.linalg.norm(centroid), 1e-12)
+
+    relevance = normalized @ centroid
+    selected = [int(np.argmax(relevance))]
+    # Kemiripan maksimum setiap kandidat ke resep yang sudah terpilih
+    max_similarity = normalized @ normalized[selected[0]]
+
+    while len(selected) < min(top_n, len(embeddings)):
+        scores = (1 - diversity) * relevance - diversity * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, normalized @ normalized[best])
+
+    return selected
+
+
+class CategoryRecommendations:
+    """
+    Daftar rekomendasi per kategori: {kategori: [id resep, ...]}
+    """
+
+    def __init__(self, recommendations: Optional[Dict[str, List[str]]] = None):
+        self.recommendations = recommendations or {}
+
+    def __contains__(self, category: str) -> bool:
+        return category in self.recommendations
+
+    @classmethod
+    def build(cls, vector_store, top_n: int = 10, diversity: float = 0.3) -> "CategoryRecommendations":
+        """
+        Menghitung daftar rekomendasi untuk semua kategori dari embedding di collection
+
+        Args:
+            vector_store: Instance RecipeVectorStore
+            top_n: Jumlah rekomendasi per kategori
+            diversity: Bobot keberagaman MMR
+
+        Returns:
+            Instance CategoryRecommendations
+        """
+        recommendations = {}
+        for category in vector_store.get_all_categories():
+            rows = vector_store.collection.get(where={"kategori": category}, include=["embeddings"])
+            embeddings = rows.get('embeddings')
+            if embeddings is None or len(embeddings) == 0:
+                continue
+            picks = mmr_select(np.asarray(embeddings, dtype=np.float32), top_n, diversity)
+            recommendations[category] = [rows['ids'][idx] for idx in picks]
+        return cls(recommendations)
+
+    def get(self, category: str, top_k: int = 3) -> List[str]:
+        """
+        Mengambil id resep rekomendasi sebuah kategori
+
+        Args:
+            category: Nama kategori
+            top_k: Jumlah resep
+
+        Returns:
+            List id resep (kosong jika kategori tidak dikenal)
+        """
+        return self.recommendations.get(category, [])[:top_k]
+
+    def save(self, path: str):
+        """
+        Menyimpan daftar rekomendasi ke file JSON (atomik)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.recommendations, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CategoryRecommendations":
+        """
+        Memuat daftar rekomendasi dari file JSON
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def default_path(vector_store) -> str:
+        """
+        Lokasi default file rekomendasi di samping database vector store
+        """
+        return os.path.join(vector_store.persist_directory,
+                            f"{vector_store.collection_name}_category_recs.json")
@@ -0,0 +1,133 @@
+"""
+Modul pembuat komponen chatbot dari environment variable
+Satu sumber konfigurasi untuk app.py, run_batch.py, dan warm_cache.py sehingga
+jawaban yang di-warm-up dan jawaban batch sama dengan jawaban aplikasi.
+"""
+
+import os
+from typing import Optional, Tuple
+from src.vector_store import RecipeVectorStore
+from src.retriever import RecipeRetriever
+from src.rag_chatbot import RAGChatbot
+from src.answer_cache import AnswerCache, get_fixed_prompts
+
+
+DEFAULT_PERSIST_DIRECTORY = "./chroma_db"
+DEFAULT_COLLECTION_NAME = "indonesian_recipes"
+
+
+def env_flag(name: str, default: bool) -> bool:
+    """
+    Membaca environment variable boolean ("true"/"false")
+    """
+    return os.getenv(name, "true" if default else "false").lower() == "true"
+
+
+def build_vector_store_from_env(persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                                collection_name: str = DEFAULT_COLLECTION_NAME) -> RecipeVectorStore:
+    """
+    Membuat RecipeVectorStore sesuai konfigurasi .env
+
+    Args:
+        persist_directory: Direktori database ChromaDB
+        collection_name: Nama collection resep
+
+    Returns:
+        Instance RecipeVectorStore
+    """
+    return RecipeVectorStore(
+        persist_directory=persist_directory,
+        collection_name=collection_name,
+        lazy_documents=env_flag("LAZY_DOCUMENTS", True),
+        compressed_search=env_flag("COMPRESSED_SEARCH", False),
+        rescore_candidates=int(os.getenv("RESCORE_CANDIDATES", "20")),
+        embedding_backend=os.getenv("EMBEDDING_BACKEND", "torch"),
+        onnx_model_dir=os.getenv("ONNX_MODEL_DIR", "./models/onnx"),
+        onnx_quantized=env_flag("ONNX_QUANTIZED", False)
+    )
+
+
+def build_retriever_from_env(vector_store: RecipeVectorStore, top_k: Optional[int] = None) -> RecipeRetriever:
+    """
+    Membuat RecipeRetriever sesuai konfigurasi .env
+
+    Args:
+        vector_store: Instance RecipeVectorStore
+        top_k: Jumlah dokumen default (default TOP_K_RETRIEVAL)
+
+    Returns:
+        Instance RecipeRetriever
+    """
+    # Index terkompresi hanya berisi vektor resep utuh: pencarian section dan partisi
+    # kategori dimatikan agar semua query semantic dan kategori melewatinya
+    compressed = env_flag("COMPRESSED_SEARCH", False)
+    use_sections = env_flag("USE_SECTION_CHUNKS", True)
+    if use_sections and compressed:
+        print("Warning: COMPRESSED_SEARCH=true menonaktifkan USE_SECTION_CHUNKS "
+              "(chunk section tidak ada di index terkompresi)")
+        use_sections = False
+    return RecipeRetriever(
+        vector_store,
+        top_k=top_k if top_k is not None else int(os.getenv("TOP_K_RETRIEVAL", "3")),
+        use_sections=use_sections,
+        use_category_partitions=env_flag("USE_CATEGORY_PARTITIONS", True) and not compressed,
+        exact_threshold=int(os.getenv("CATEGORY_EXACT_THRESHOLD", "500")),
+        compress_context=env_flag("COMPRESS_CONTEXT", True),
+        context_token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "600")),
+        factor_shared_lines=env_flag("FACTOR_SHARED_LINES", True),
+        adaptive_top_k=env_flag("ADAPTIVE_TOP_K", True),
+        candidate_pool_size=int(os.getenv("CANDIDATE_POOL_SIZE", "10")),
+        min_zscore=float(os.getenv("ADAPTIVE_MIN_ZSCORE", "2.0")),
+        rerank=env_flag("RERANK", False),
+        rerank_model=os.getenv("RERANK_MODEL") or None,
+        rerank_budget_ms=float(os.getenv("RERANK_BUDGET_MS", "150"))
+    )
+
+
+def build_chatbot_from_env(top_k: Optional[int] = None,
+                           persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                           collection_name: str = DEFAULT_COLLECTION_NAME) -> Tuple[RAGChatbot, RecipeVectorStore]:
+    """
+    Membuat vector store, retriever, dan RAGChatbot sesuai konfigurasi .env
+    (load_dotenv dipanggil oleh pemanggil)
+
+    Args:
+        top_k: Jumlah dokumen default retriever (default TOP_K_RETRIEVAL)
+        persist_directory: Direktori database ChromaDB
+        collection_name: Nama collection resep
+
+    Returns:
+        Tuple (chatbot, vector_store)
+    """
+    vector_store = build_vector_store_from_env(persist_directory, collection_name)
+    chatbot = RAGChatbot(
+        retriever=build_retriever_from_env(vector_store, top_k),
+        model=os.getenv("LLM_MODEL", "gemini-2.5-flash"),
+        temperature=float(os.getenv("TEMPERATURE", "0.7")),
+        use_gemini=env_flag("USE_GEMINI", True),
+        requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+        request_timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+        enable_hedging=env_flag("LLM_HEDGING", False),
+        secondary_model=os.getenv("SECONDARY_LLM_MODEL") or None,
+        enable_intent_routing=env_flag("INTENT_ROUTING", True),
+        enable_templated_answers=env_flag("TEMPLATED_ANSWERS", True)
+    )
+    return chatbot, vector_store
+
+
+def build_answer_cache_from_env(vector_store: RecipeVectorStore) -> AnswerCache:
+    """
+    Membuat AnswerCache untuk prompt tetap (contoh pertanyaan dan kategori) sesuai .env
+
+    Args:
+        vector_store: Instance RecipeVectorStore (daftar kategori)
+
+    Returns:
+        Instance AnswerCache
+    """
+    return AnswerCache(
+        cache_path=os.getenv("ANSWER_CACHE_PATH", "./cache/answer_cache.json"),
+        ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "86400")),
+        allowed_prompts=get_fixed_prompts(vector_store.get_all_categories())
+    )
@@ -0,0 +1,426 @@
+"""
+Modul kompresi context berbasis relevansi baris
+Setiap baris bahan, langkah, dan tips dinilai terhadap embedding query memakai vektor
+baris yang di-cache saat ingest; hanya baris paling relevan (plus header resep) yang
+dikirim ke LLM sesuai budget token. Baris bahan dan tips yang sama di beberapa resep
+(boilerplate seperti "Garam dan gula secukupnya") ditulis sekali di bagian bersama;
+langkah selalu tetap di resepnya agar nomor dan urutannya utuh.
+"""
+
+import os
+import re
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from src.records import SearchHit
+from src.data_processor import parse_recipe_document
+
+
+# Section baris yang dikompresi (urutan tampil di context)
+LINE_SECTIONS = ("bahan", "langkah", "tips")
+SECTION_TITLES = {"bahan": "Bahan-bahan:", "langkah": "Cara Membuat:", "tips": "Tips:"}
+# Section yang boleh dipindah ke bagian bersama (langkah bergantung pada urutan resepnya)
+SHARED_SECTIONS = ("bahan", "tips")
+CONTEXT_INTRO = "Berikut adalah resep-resep yang relevan:"
+SHARED_TITLE = "=== Bagian yang sama di beberapa resep ==="
+OMITTED_NOTE = "({} baris lain tidak relevan, tidak ditampilkan)"
+
+_LINE_PREFIX_PATTERN = re.compile(r'^(?:-\s*|\d+\.\s*|tips:\s*)', re.IGNORECASE)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_line(text: str) -> str:
+    """
+    Menormalisasi baris resep (tanpa bullet/nomor langkah, huruf kecil, spasi tunggal)
+    """
+    return _WHITESPACE_PATTERN.sub(' ', _LINE_PREFIX_PATTERN.sub('', text.strip())).strip().lower()
+
+
+@lru_cache(maxsize=65536)
+def line_key(text: str) -> str:
+    """
+    Hash baris resep yang sudah dinormalisasi ("2. Siapkan bahan" == "Siapkan bahan");
+    baris korpus yang berulang cukup di-hash sekali per proses
+
+    Args:
+        text: Baris bahan, langkah, atau tips
+
+    Returns:
+        Hash hex 16 karakter
+    """
+    return hashlib.blake2b(normalize_line(text).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimasi kasar jumlah token (sekitar 4 karakter per token)
+    """
+    return len(text) // 4 + 1
+
+
+def recipe_lines(recipe: Dict) -> List[str]:
+    """
+    Semua baris bahan, langkah, dan tips dari resep yang sudah diproses
+    """
+    lines = list(recipe.get('bahan', [])) + list(recipe.get('langkah', []))
+    if recipe.get('tips'):
+        lines.append(recipe['tips'])
+    return lines
+
+
+class LineVectorCache:
+    """
+    Cache embedding per baris unik resep: {hash baris: vektor ternormalisasi}
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, int] = {}
+        self._blocks: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        Matriks vektor baris (urutan sama dengan nilai keys)
+        """
+        if not self._blocks:
+            return np.empty((0, 0), dtype=np.float32)
+        if len(self._blocks) > 1:
+            self._blocks = [np.concatenate(self._blocks)]
+        return self._blocks[0]
+
+    def add_lines(self, lines: List[str], embedding_function, batch_size: int = 256) -> int:
+        """
+        Meng-embed baris yang belum ada di cache
+
+        Args:
+            lines: Baris resep
+            embedding_function: Embedding function vector store
+            batch_size: Jumlah baris per panggilan embedding
+
+        Returns:
+            Jumlah baris baru yang di-embed
+        """
+        pending = OrderedDict()
+        for line in lines:
+            key = line_key(line)
+            if key not in self.keys and key not in pending:
+                pending[key] = normalize_line(line)
+
+        keys = list(pending)
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            embeddings = np.asarray(embedding_function([pending[key] for key in batch]), dtype=np.float32)
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            for key in batch:
+                self.keys[key] = len(self.keys)
+            self._blocks.append(embeddings)
+        return len(keys)
+
+    def add_recipes(self, recipes: List[Dict], embedding_function, batch_size: int = 256) -> int:
+        """
+        Meng-embed semua baris baru dari sekumpulan resep (dipanggil per batch saat ingest)
+        """
+        lines = [line for recipe in recipes for line in recipe_lines(recipe)]
+        return self.add_lines(lines, embedding_function, batch_size)
+
+    def lookup(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mengambil vektor untuk hash baris
+
+        Returns:
+            Tuple (mask baris yang ada di cache, matriks vektornya)
+        """
+        rows = np.array([self.keys.get(key, -1) for key in keys], dtype=np.int64)
+        found = rows >= 0
+        return found, self.vectors[rows[found]]
+
+    def save(self, path: str):
+        """
+        Menyimpan cache ke file .npz (atomik)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, keys=np.array(list(self.keys), dtype=str), vectors=self.vectors)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LineVectorCache":
+        """
+        Memuat cache dari file .npz
+        """
+        data = np.load(path)
+        cache = cls()
+        cache.keys = {str(key): row for row, key in enumerate(data["keys"])}
+        cache._blocks = [data["vectors"].astype(np.float32)] if len(cache.keys) else []
+        return cache
+
+    @staticmethod
+    def default_path(vector_store) -> str:
+        """
+        Lokasi default file cache di samping database vector store
+        """
+        return os.path.join(vector_store.persist_directory,
+                            f"{vector_store.collection_name}_line_vectors.npz")
+
+
+class ContextCompressor:
+    """
+    Memilih baris resep yang paling relevan dengan query di bawah budget token
+    """
+
+    def __init__(self, vector_store, line_vectors: LineVectorCache,
+                 token_budget: int = 600, query_cache_size: int = 256,
+                 factor_shared_lines: bool = True):
+        """
+        Inisialisasi compressor
+
+        Args:
+            vector_store: Instance RecipeVectorStore (embedding function query)
+            line_vectors: Cache vektor baris dari ingest
+            token_budget: Budget token context (header resep + baris terpilih)
+            query_cache_size: Jumlah embedding query yang di-cache (LRU)
+            factor_shared_lines: Baris bahan/tips yang sama di beberapa resep ("Garam
+                dan gula secukupnya") ditulis sekali di bagian bersama
+        """
+        self.vector_store = vector_store
+        self.line_vectors = line_vectors
+        self.token_budget = token_budget
+        self.query_cache_size = query_cache_size
+        self.factor_shared_lines = factor_shared_lines
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.stats = {"lines_total": 0, "lines_kept": 0, "lines_shared": 0, "tokens": 0}
+
+    def embed_query(self, query: str) -> np.ndarray:
+        key = normalize_line(query)
+        embedding = self._query_cache.get(key)
+        if embedding is not None:
+            self._query_cache.move_to_end(key)
+            return embedding
+
+        embedding = np.asarray(self.vector_store.embedding_function([query])[0], dtype=np.float32)
+        embedding /= max(float(np.linalg.norm(embedding)), 1e-12)
+        self._query_cache[key] = embedding
+        if len(self._query_cache) > self.query_cache_size:
+            self._query_cache.popitem(last=False)
+        return embedding
+
+    @staticmethod
+    def _doc_lines(doc: SearchHit) -> List[Tuple[str, str, str]]:
+        # (section, baris, hash); baris duplikat (overlap chunk section) dibuang
+        parsed = parse_recipe_document(doc.document)
+        lines, seen = [], set()
+        for section in LINE_SECTIONS:
+            section_lines = parsed[section] if section != "tips" else ([parsed["tips"]] if parsed["tips"] else [])
+            for line in section_lines:
+                key = line_key(line)
+                if key not in seen:
+                    seen.add(key)
+                    lines.append((section, line, key))
+        return lines
+
+    def compress(self, query: str, docs: List[SearchHit],
+                 token_budget: Optional[int] = None) -> Dict:
+        """
+        Memilih baris paling relevan dari setiap resep
+
+        Header resep selalu dibawa. Setiap resep mendapat minimal satu baris terbaik,
+        sisa budget diisi baris dengan skor tertinggi di seluruh resep. Baris yang
+        vektornya tidak ada di cache diberi skor 0 (tidak di-embed saat query).
+        Jika factor_shared_lines aktif, baris bahan/tips yang sama di beberapa resep
+        hanya dihitung (dan nantinya ditulis) sekali; langkah tidak pernah digabung.
+
+        Args:
+            query: Pertanyaan pengguna
+            docs: Dokumen hasil retrieval (urutan = ranking)
+            token_budget: Budget token (default self.token_budget)
+
+        Returns:
+            Dictionary {recipes: [{doc, sections: {section: [baris]}, omitted}],
+            shared: [(section, baris, [nomor resep])], truncated: bool}
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        query_vector = self.embed_query(query)
+
+        recipes = []
+        used = estimate_tokens(CONTEXT_INTRO)
+        for rank, doc in enumerate(docs):
+            header_cost = estimate_tokens(self.format_header(rank + 1, doc)) + estimate_tokens(OMITTED_NOTE)
+            if recipes and used + header_cost > budget:
+                break
+            used += header_cost
+            recipes.append({"doc": doc, "lines": self._doc_lines(doc)})
+
+        # Kemunculan setiap baris (hash) di resep-resep yang muat
+        occurrences: Dict[str, List[Tuple[int, int]]] = OrderedDict()
+        for rank, recipe in enumerate(recipes):
+            for index, (_section, _line, key) in enumerate(recipe["lines"]):
+                occurrences.setdefault(key, []).append((rank, index))
+        shared_keys = {
+            key for key, places in occurrences.items()
+            if self.factor_shared_lines and len(places) > 1
+            and all(recipes[rank]["lines"][index][0] in SHARED_SECTIONS for rank, index in places)
+        }
+
+        # Unit seleksi: baris bersama dipilih sekali untuk semua resepnya, baris lain per resep
+        units: List[Tuple[str, List[Tuple[int, int]]]] = []
+        for key, places in occurrences.items():
+            if key in shared_keys:
+                units.append((key, places))
+            else:
+                units.extend((key, [place]) for place in places)
+
+        scores = np.zeros(len(units), dtype=np.float32)
+        if units:
+            found, vectors = self.line_vectors.lookup([key for key, _places in units])
+            if len(vectors):
+                scores[found] = vectors @ query_vector
+
+        selected = set()
+        titles = set()
+
+        def take(unit: int) -> bool:
+            nonlocal used
+            key, places = units[unit]
+            rank, index = places[0]
+            section, line, _key = recipes[rank]["lines"][index]
+            owner = "shared" if key in shared_keys else rank
+            cost = estimate_tokens(line)
+            if (owner, section) not in titles:
+                cost += estimate_tokens(SECTION_TITLES[section])
+            if owner == "shared" and not any(title[0] == "shared" for title in titles):
+                cost += estimate_tokens(SHARED_TITLE)
+            if owner == "shared":
+                cost += estimate_tokens(self._shared_suffix([r + 1 for r, _i in places], len(recipes)))
+            if used + cost > budget:
+                return False
+            used += cost
+            selected.add(unit)
+            titles.add((owner, section))
+            return True
+
+        # Skor tertinggi dulu; ranking resep sebagai tie-breaker
+        order = sorted(range(len(units)), key=lambda unit: (-scores[unit], units[unit][1][0][0]))
+        best_per_recipe = {}
+        for unit in order:
+            for rank, _index in units[unit][1]:
+                best_per_recipe.setdefault(rank, unit)
+        for rank in sorted(best_per_recipe):
+            if best_per_recipe[rank] not in selected:
+                take(best_per_recipe[rank])
+        for unit in order:
+            if unit not in selected:
+                take(unit)
+
+        kept = {place for unit in selected for place in units[unit][1]}
+        compressed = []
+        for rank, recipe in enumerate(recipes):
+            sections = {section: [] for section in LINE_SECTIONS}
+            for index, (section, line, key) in enumerate(recipe["lines"]):
+                if (rank, index) in kept and key not in shared_keys:
+                    sections[section].append(line)
+            compressed.append({
+                "doc": recipe["doc"],
+                "sections": sections,
+                "omitted": sum(1 for index in range(len(recipe["lines"])) if (rank, index) not in kept)
+            })
+
+        shared = []
+        for unit in sorted(selected):
+            key, places = units[unit]
+            if key in shared_keys:
+                rank, index = places[0]
+                section, line, _key = recipes[rank]["lines"][index]
+                shared.append((section, line, [r + 1 for r, _i in places]))
+
+        self.stats = {
+            "lines_total": sum(len(recipe["lines"]) for recipe in recipes),
+            "lines_kept": len(kept),
+            "lines_shared": sum(len(units[unit][1]) for unit in selected if units[unit][0] in shared_keys),
+            "tokens": used
+        }
+        return {"recipes": compressed, "shared": shared, "truncated": len(recipes) < len(docs)}
+
+    @staticmethod
+    def _shared_suffix(numbers: List[int], total: int) -> str:
+        if len(numbers) == total:
+            return ""
+        return f" (Resep {', '.join(str(number) for number in numbers)})"
+
+    @staticmethod
+    def format_header(number: int, doc: SearchHit) -> str:
+        """
+        Header resep di context (nama dan metadata)
+        """
+        metadata = doc.metadata
+        parts = [f"=== Resep {number}: {metadata.nama} ==="]
+        if metadata.kategori:
+            parts.append(f"Kategori: {metadata.kategori}")
+        if metadata.porsi:
+            parts.append(f"Porsi: {metadata.porsi}")
+        if metadata.waktu_masak:
+            parts.append(f"Waktu Memasak: {metadata.waktu_masak}")
+        if metadata.tingkat_kesulitan:
+            parts.append(f"Tingkat Kesulitan: {metadata.tingkat_kesulitan}")
+        return "\n".join(parts)
+
+    def format_context(self, query: str, docs: List[SearchHit],
+                       token_budget: Optional[int] = None) -> str:
+        """
+        Context LLM berisi header resep dan baris yang paling relevan dengan query;
+        baris bahan/tips yang sama di beberapa resep ditulis sekali di bagian bersama
+
+        Args:
+            query: Pertanyaan pengguna
+            docs: Dokumen hasil retrieval
+            token_budget: Budget token (default self.token_budget)
+
+        Returns:
+            String context
+        """
+        compressed = self.compress(query, docs, token_budget)
+        recipes = compressed["recipes"]
+        context_parts = [CONTEXT_INTRO]
+
+        if compressed["shared"]:
+            shared_parts = [SHARED_TITLE]
+            for section in LINE_SECTIONS:
+                lines = [(line, numbers) for line_section, line, numbers in compressed["shared"]
+                         if line_section == section]
+                if not lines:
+                    continue
+                shared_parts.append(SECTION_TITLES[section])
+                for line, numbers in lines:
+                    shared_parts.append(f"- {line}{self._shared_suffix(numbers, len(recipes))}")
+            context_parts.append("\n".join(shared_parts))
+
+        for number, recipe in enumerate(recipes, 1):
+            recipe_parts = [self.format_header(number, recipe["doc"])]
+            sections = recipe["sections"]
+            if sections["bahan"]:
+                recipe_parts.append(SECTION_TITLES["bahan"])
+                recipe_parts.extend(f"- {line}" for line in sections["bahan"])
+            if sections["langkah"]:
+                recipe_parts.append(SECTION_TITLES["langkah"])
+                recipe_parts.extend(sections["langkah"])
+            if sections["tips"]:
+                recipe_parts.append(f"{SECTION_TITLES['tips']} {sections['tips'][0]}")
+            if recipe["omitted"]:
+                recipe_parts.append(OMITTED_NOTE.format(recipe['omitted']))
+            context_parts.append("\n".join(recipe_parts))
+
+        if compressed["truncated"]:
+            context_parts.append("(Resep lainnya tidak ditampilkan untuk efisiensi)")
+
+        return "\n\n".join(context_parts)
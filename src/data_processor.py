@@ -5,8 +5,105 @@ Melakukan preprocessing, cleaning, dan normalisasi data resep
 
 import re
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, TextIO
+import numpy as np
 import pandas as pd
+from src.records import Recipe
+
+
+# Field teks tunggal pada resep (urutan sama dengan output process_recipe)
+SCALAR_FIELDS = ['nama', 'kategori', 'porsi', 'waktu_masak', 'tingkat_kesulitan']
+
+# Section resep untuk chunking (urutan tampil di context)
+RECIPE_SECTIONS = ['header', 'bahan', 'langkah', 'tips']
+
+# Field numerik hasil parsing field teks (untuk filter range di vector store)
+NUMERIC_FIELDS = ['waktu_menit', 'jumlah_porsi', 'level_kesulitan']
+
+# Urutan tingkat kesulitan (untuk filter range)
+DIFFICULTY_LEVELS = {'mudah': 1, 'sedang': 2, 'sulit': 3}
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+STEP_NUMBER_PATTERN = re.compile(r'^\d+\.')
+DURATION_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*(jam|menit|mnt|hours?|minutes?|mins?)\b', re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# Judul section di dokumen resep -> nama section
+DOCUMENT_SECTION_TITLES = {"Bahan-bahan:": "bahan", "Cara Membuat:": "langkah"}
+
+
+def parse_minutes(text: str) -> Optional[int]:
+    """
+    Mengubah teks waktu memasak menjadi jumlah menit
+    
+    Args:
+        text: Teks waktu, mis. "20 menit", "1 jam 30 menit", "1,5 jam"
+        
+    Returns:
+        Jumlah menit, atau None jika tidak bisa diparsing
+    """
+    if not text:
+        return None
+    
+    matches = DURATION_PATTERN.findall(text)
+    if not matches:
+        return None
+    
+    total = 0.0
+    for value, unit in matches:
+        amount = float(value.replace(',', '.'))
+        total += amount * 60 if unit.lower() in ('jam', 'hour', 'hours') else amount
+    return int(round(total))
+
+
+def parse_servings(text: str) -> Optional[int]:
+    """
+    Mengubah teks porsi menjadi jumlah porsi
+    
+    Args:
+        text: Teks porsi, mis. "4 porsi" atau "4-6 porsi" (diambil batas bawah)
+        
+    Returns:
+        Jumlah porsi, atau None jika tidak bisa diparsing
+    """
+    match = NUMBER_PATTERN.search(text or '')
+    return int(match.group()) if match else None
+
+
+def parse_difficulty(text: str) -> Optional[int]:
+    """
+    Mengubah tingkat kesulitan menjadi level numerik (Mudah=1, Sedang=2, Sulit=3)
+    """
+    return DIFFICULTY_LEVELS.get((text or '').strip().lower())
+
+
+def parse_recipe_document(document: str) -> Dict:
+    """
+    Memecah dokumen resep (format format_recipe_for_embedding atau gabungan chunk
+    section) kembali menjadi baris bahan, langkah, dan tips
+    
+    Args:
+        document: Teks dokumen resep
+        
+    Returns:
+        Dictionary {bahan: [...], langkah: [...], tips: str}
+    """
+    parsed = {"bahan": [], "langkah": [], "tips": ""}
+    section = None
+    for line in document.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line in DOCUMENT_SECTION_TITLES:
+            section = DOCUMENT_SECTION_TITLES[line]
+        elif line.startswith("Tips:"):
+            parsed["tips"] = line[len("Tips:"):].strip()
+            section = None
+        elif section == "bahan":
+            parsed["bahan"].append(line.lstrip("- ").strip())
+        elif section == "langkah":
+            parsed["langkah"].append(line)
+    return parsed
 
 
 class RecipePreprocessor:
@@ -20,6 +117,7 @@ class RecipePreprocessor:
             r'http[s]?://\S+',  # URLs
             r'\[.*?\]',  # Brackets dengan konten
         ]
+        self._compiled_patterns = [re.compile(pattern) for pattern in self.unwanted_patterns]
     
     def clean_text(self, text: str) -> str:
         """
@@ -35,11 +133,11 @@ class RecipePreprocessor:
             return ""
         
         # Hapus HTML tags dan URLs
-        for pattern in self.unwanted_patterns:
-            text = re.sub(pattern, '', text)
+        for pattern in self._compiled_patterns:
+            text = pattern.sub('', text)
         
         # Hapus multiple spaces
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_PATTERN.sub(' ', text)
         
         # Hapus whitespace di awal dan akhir
         text = text.strip()
@@ -80,13 +178,13 @@ class RecipePreprocessor:
             cleaned = self.clean_text(step)
             if cleaned:
                 # Tambahkan nomor jika belum ada
-                if not re.match(r'^\d+\.', cleaned):
+                if not STEP_NUMBER_PATTERN.match(cleaned):
                     cleaned = f"{i}. {cleaned}"
                 normalized.append(cleaned)
         
         return normalized
     
-    def process_recipe(self, recipe: Dict) -> Dict:
+    def process_recipe(self, recipe: Dict) -> Recipe:
         """
         Memproses satu resep lengkap
         
@@ -94,7 +192,7 @@ class RecipePreprocessor:
             recipe: Dictionary berisi data resep
             
         Returns:
-            Dictionary resep yang sudah diproses
+            Recipe yang sudah diproses
         """
         processed = {
             'nama': self.clean_text(recipe.get('nama', '')),
@@ -106,8 +204,150 @@ class RecipePreprocessor:
             'langkah': self.normalize_steps(recipe.get('langkah', [])),
             'tips': self.clean_text(recipe.get('tips', ''))
         }
+        processed.update(self.parse_numeric_fields(processed))
+        
+        return Recipe(**processed)
+    
+    @staticmethod
+    def parse_numeric_fields(recipe: Dict) -> Dict:
+        """
+        Mem-parsing waktu, porsi, dan tingkat kesulitan menjadi angka
+        
+        Args:
+            recipe: Dictionary resep yang sudah dibersihkan
+            
+        Returns:
+            Dictionary {waktu_menit, jumlah_porsi, level_kesulitan} (None jika tidak dikenali)
+        """
+        return {
+            'waktu_menit': parse_minutes(recipe.get('waktu_masak', '')),
+            'jumlah_porsi': parse_servings(recipe.get('porsi', '')),
+            'level_kesulitan': parse_difficulty(recipe.get('tingkat_kesulitan', ''))
+        }
+    
+    def _clean_series(self, series: pd.Series) -> pd.Series:
+        """
+        Versi vectorized dari clean_text untuk satu kolom
+        
+        Regex hanya dijalankan pada nilai unik, karena data resep sangat
+        berulang (baris bahan/langkah template yang sama di banyak resep).
+        
+        Args:
+            series: Kolom teks
+            
+        Returns:
+            Kolom teks yang sudah dibersihkan
+        """
+        codes, uniques = pd.factorize(series.fillna('').astype(str))
+        cleaned = pd.Series(uniques, dtype=object)
+        for pattern in self._compiled_patterns:
+            cleaned = cleaned.str.replace(pattern, '', regex=True)
+        cleaned = cleaned.str.replace(WHITESPACE_PATTERN, ' ', regex=True).str.strip()
+        
+        return pd.Series(cleaned.to_numpy()[codes], index=series.index, dtype=object)
+    
+    @staticmethod
+    def _group_lists(items: pd.DataFrame) -> Dict[int, List[str]]:
+        """
+        Mengelompokkan baris item kembali menjadi list per resep
+        
+        Args:
+            items: DataFrame hasil _explode_list_field (index terurut per resep)
+            
+        Returns:
+            Dictionary {posisi resep: list teks}
+        """
+        if items.empty:
+            return {}
+        
+        owners = items.index.to_numpy()
+        texts = items['text'].tolist()
+        boundaries = (np.flatnonzero(np.diff(owners)) + 1).tolist()
+        starts = [0] + boundaries
+        ends = boundaries + [len(texts)]
+        owner_ids = owners[starts].tolist()
+        
+        return {
+            owner: texts[start:end]
+            for owner, start, end in zip(owner_ids, starts, ends)
+        }
+    
+    def _explode_list_field(self, recipes: List[Dict], field: str) -> pd.DataFrame:
+        """
+        Mengubah field list (bahan/langkah) semua resep menjadi satu baris per item
+        
+        Args:
+            recipes: List resep mentah
+            field: Nama field list
+            
+        Returns:
+            DataFrame dengan index posisi resep, kolom 'position' (mulai 1) dan 'text'
+        """
+        lists = pd.Series([recipe.get(field) or [] for recipe in recipes], dtype=object)
+        exploded = lists[lists.str.len() > 0].explode()
         
-        return processed
+        items = pd.DataFrame({'text': self._clean_series(exploded)})
+        items['position'] = items.groupby(level=0).cumcount() + 1
+        return items[items['text'] != '']
+    
+    def process_recipes_batch(self, recipes: List[Dict]) -> List[Recipe]:
+        """
+        Memproses banyak resep sekaligus dengan operasi string vectorized pandas
+        
+        Hasilnya identik dengan memanggil process_recipe untuk setiap resep.
+        
+        Args:
+            recipes: List dictionary resep mentah
+            
+        Returns:
+            List Recipe yang sudah diproses
+        """
+        if not recipes:
+            return []
+        
+        frame = pd.DataFrame({
+            field: [recipe.get(field, '') for recipe in recipes]
+            for field in SCALAR_FIELDS + ['tips']
+        })
+        for column in frame.columns:
+            frame[column] = self._clean_series(frame[column])
+        
+        bahan = self._explode_list_field(recipes, 'bahan')
+        
+        langkah = self._explode_list_field(recipes, 'langkah')
+        codes, unique_steps = pd.factorize(langkah['text'])
+        already_numbered = pd.Series(unique_steps, dtype=object).str.match(STEP_NUMBER_PATTERN)
+        needs_number = ~already_numbered.to_numpy(dtype=bool)[codes]
+        langkah.loc[needs_number, 'text'] = (
+            langkah.loc[needs_number, 'position'].astype(str) + '. ' + langkah.loc[needs_number, 'text']
+        )
+        
+        bahan_lists = self._group_lists(bahan)
+        langkah_lists = self._group_lists(langkah)
+        
+        columns = [frame[field].tolist() for field in SCALAR_FIELDS]
+        tips = frame['tips'].tolist()
+        
+        # Nilai unik waktu/porsi/kesulitan sedikit, jadi parsing cukup sekali per nilai
+        numeric_columns = []
+        for source, parser in (('waktu_masak', parse_minutes),
+                               ('porsi', parse_servings),
+                               ('tingkat_kesulitan', parse_difficulty)):
+            values = frame[source].tolist()
+            parsed = {value: parser(value) for value in set(values)}
+            numeric_columns.append([parsed[value] for value in values])
+        
+        processed_recipes = []
+        for idx, values in enumerate(zip(*columns)):
+            processed = dict(zip(SCALAR_FIELDS, values))
+            processed['bahan'] = bahan_lists.get(idx, [])
+            processed['langkah'] = langkah_lists.get(idx, [])
+            processed['tips'] = tips[idx]
+            for field, column in zip(NUMERIC_FIELDS, numeric_columns):
+                processed[field] = column[idx]
+            processed_recipes.append(Recipe(**processed))
+        
+        return processed_recipes
     
     def format_recipe_for_embedding(self, recipe: Dict) -> str:
         """
@@ -154,7 +394,91 @@ class RecipePreprocessor:
         
         return "\n".join(text_parts)
     
-    def load_from_json(self, filepath: str) -> List[Dict]:
+    @staticmethod
+    def _chunk_lines(lines: List[str], chunk_size: int, chunk_overlap: int) -> List[List[str]]:
+        """
+        Memecah list baris menjadi potongan maksimal chunk_size karakter,
+        dengan overlap beberapa baris terakhir sepanjang maksimal chunk_overlap
+        """
+        chunks = []
+        current: List[str] = []
+        current_length = 0
+        
+        for line in lines:
+            if current and current_length + len(line) + 1 > chunk_size:
+                chunks.append(current)
+                # Bawa baris terakhir sebagai overlap
+                overlap: List[str] = []
+                overlap_length = 0
+                for previous in reversed(current):
+                    if overlap_length + len(previous) + 1 > chunk_overlap:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_length += len(previous) + 1
+                current, current_length = overlap, overlap_length
+            current.append(line)
+            current_length += len(line) + 1
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def split_recipe_into_sections(self, recipe: Dict, chunk_size: int = 1000,
+                                   chunk_overlap: int = 200) -> List[Dict]:
+        """
+        Memecah resep menjadi chunk per section (header, bahan, langkah, tips)
+        
+        Setiap chunk diawali baris "Nama Masakan: ..." agar embedding-nya tetap
+        terkait dengan masakan induknya.
+        
+        Args:
+            recipe: Dictionary resep yang sudah diproses
+            chunk_size: Maksimum karakter per chunk (CHUNK_SIZE)
+            chunk_overlap: Maksimum karakter overlap antar chunk (CHUNK_OVERLAP)
+            
+        Returns:
+            List dictionary {"section", "chunk_index", "text"}
+        """
+        title = f"Nama Masakan: {recipe['nama']}"
+        
+        header = []
+        if recipe.get('kategori'):
+            header.append(f"Kategori: {recipe['kategori']}")
+        if recipe.get('porsi'):
+            header.append(f"Porsi: {recipe['porsi']}")
+        if recipe.get('waktu_masak'):
+            header.append(f"Waktu Memasak: {recipe['waktu_masak']}")
+        if recipe.get('tingkat_kesulitan'):
+            header.append(f"Tingkat Kesulitan: {recipe['tingkat_kesulitan']}")
+        
+        section_lines = {
+            'header': header,
+            'bahan': [f"- {bahan}" for bahan in recipe.get('bahan', [])],
+            'langkah': list(recipe.get('langkah', [])),
+            'tips': [f"Tips: {recipe['tips']}"] if recipe.get('tips') else []
+        }
+        section_titles = {'bahan': "Bahan-bahan:", 'langkah': "Cara Membuat:"}
+        
+        sections = []
+        for section in RECIPE_SECTIONS:
+            lines = section_lines[section]
+            if not lines and section != 'header':
+                continue
+            
+            for chunk_index, chunk in enumerate(self._chunk_lines(lines, chunk_size, chunk_overlap) or [[]]):
+                parts = [title]
+                if section in section_titles:
+                    parts.append(section_titles[section])
+                parts.extend(chunk)
+                sections.append({
+                    "section": section,
+                    "chunk_index": chunk_index,
+                    "text": "\n".join(parts)
+                })
+        
+        return sections
+    
+    def load_from_json(self, filepath: str) -> List[Recipe]:
         """
         Memuat data resep dari file JSON
         
@@ -162,28 +486,129 @@ class RecipePreprocessor:
             filepath: Path ke file JSON
             
         Returns:
-            List resep yang sudah diproses
+            List Recipe yang sudah diproses
         """
         with open(filepath, 'r', encoding='utf-8') as f:
             recipes = json.load(f)
         
-        processed_recipes = []
-        for recipe in recipes:
-            processed = self.process_recipe(recipe)
-            processed_recipes.append(processed)
+        return self.process_recipes_batch(recipes)
+    
+    @staticmethod
+    def _iter_json_array(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+        """
+        Membaca elemen JSON array satu per satu tanpa memuat seluruh file
         
-        return processed_recipes
+        Args:
+            f: File handle yang posisinya di awal array
+            chunk_size: Jumlah karakter yang dibaca per iterasi
+            
+        Returns:
+            Iterator elemen array
+        """
+        decoder = json.JSONDecoder()
+        buffer = ""
+        pos = 0
+        eof = False
+        started = False
+        
+        while True:
+            # Lewati whitespace dan pemisah antar elemen
+            while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ',')):
+                pos += 1
+            
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError("JSON array tidak lengkap (tidak ditemukan ']')")
+                buffer = buffer[pos:] + f.read(chunk_size)
+                pos = 0
+                eof = len(buffer) == 0
+                continue
+            
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("File JSON harus berisi array resep")
+                started = True
+                pos += 1
+                continue
+            
+            if buffer[pos] == ']':
+                return
+            
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Elemen belum lengkap di buffer: baca lagi
+                more = f.read(chunk_size)
+                eof = len(more) == 0
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            
+            yield item
+            # Buang bagian yang sudah diproses agar memori tetap kecil
+            buffer = buffer[end:]
+            pos = 0
     
-    def save_to_json(self, recipes: List[Dict], filepath: str):
+    def iter_raw_recipes(self, filepath: str) -> Iterator[Dict]:
+        """
+        Membaca resep mentah satu per satu dari file JSON array atau JSONL
+        
+        Args:
+            filepath: Path ke file .json (array) atau .jsonl (satu resep per baris)
+            
+        Returns:
+            Iterator dictionary resep mentah
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            first_char = ''
+            while True:
+                first_char = f.read(1)
+                if not first_char or not first_char.isspace():
+                    break
+            f.seek(0)
+            
+            if first_char == '[':
+                yield from self._iter_json_array(f)
+            else:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+    
+    def iter_processed_batches(self, filepath: str, batch_size: int = 256) -> Iterator[List[Recipe]]:
+        """
+        Memuat dan memproses resep dalam batch berukuran tetap (memori konstan)
+        
+        Args:
+            filepath: Path ke file .json (array) atau .jsonl
+            batch_size: Jumlah resep per batch
+            
+        Returns:
+            Iterator list Recipe yang sudah diproses
+        """
+        batch = []
+        for recipe in self.iter_raw_recipes(filepath):
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                yield self.process_recipes_batch(batch)
+                batch = []
+        
+        if batch:
+            yield self.process_recipes_batch(batch)
+    
+    def save_to_json(self, recipes: List[Recipe], filepath: str):
         """
         Menyimpan resep yang sudah diproses ke file JSON
         
         Args:
-            recipes: List resep
+            recipes: List Recipe (atau dictionary resep)
             filepath: Path file output
         """
+        rows = [recipe.to_dict() if isinstance(recipe, Recipe) else recipe for recipe in recipes]
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(recipes, f, ensure_ascii=False, indent=2)
+            json.dump(rows, f, ensure_ascii=False, indent=2)
 
 
 if __name__ == "__main__":
@@ -217,3 +642,21 @@ if __name__ == "__main__":
     
     print("Resep yang sudah diformat:")
     print(formatted_text)
+    
+    # Bandingkan mode per-resep dengan mode batch (vectorized)
+    import time
+    with open("./data/resep_indonesia.json", 'r', encoding='utf-8') as f:
+        raw_recipes = json.load(f) * 100
+    
+    start = time.perf_counter()
+    single = [preprocessor.process_recipe(recipe) for recipe in raw_recipes]
+    single_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch = preprocessor.process_recipes_batch(raw_recipes)
+    batch_time = time.perf_counter() - start
+    
+    print(f"\nProcess {len(raw_recipes)} resep:")
+    print(f"  process_recipe       : {len(raw_recipes) / single_time:,.0f} resep/detik")
+    print(f"  process_recipes_batch: {len(raw_recipes) / batch_time:,.0f} resep/detik")
+    print(f"  Output identik: {single == batch}")
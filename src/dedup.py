@@ -0,0 +1,192 @@
+"""
+Modul deteksi resep near-duplicate saat ingest
+Menggunakan MinHash + LSH banding pada shingle kata, dikonfirmasi dengan kemiripan nama
+"""
+
+import re
+import zlib
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+
+# Bilangan prima Mersenne untuk hashing universal (a * x + b) mod p;
+# a < 2^31 dan x < 2^32 sehingga a * x + b tidak overflow di uint64
+_MERSENNE_PRIME = (1 << 31) - 1
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+DEDUP_POLICIES = ("skip", "merge")
+
+
+class NearDuplicateDetector:
+    """
+    Detektor near-duplicate berbasis MinHash dengan Locality Sensitive Hashing
+
+    Dataset resep sangat ter-template (baris bahan dan langkah yang sama di hampir
+    semua resep), sehingga kemiripan isi saja tidak cukup: dua resep baru dianggap
+    duplikat jika isinya mirip DAN nama masakannya mirip.
+    """
+
+    def __init__(self,
+                 num_perm: int = 64,
+                 bands: int = 16,
+                 threshold: float = 0.85,
+                 name_threshold: float = 0.6,
+                 shingle_size: int = 3,
+                 seed: int = 42):
+        """
+        Inisialisasi detektor
+
+        Args:
+            num_perm: Jumlah fungsi hash MinHash
+            bands: Jumlah band LSH (num_perm harus habis dibagi bands)
+            threshold: Minimum estimasi Jaccard isi resep untuk dianggap duplikat
+            name_threshold: Minimum Jaccard token nama masakan
+            shingle_size: Jumlah kata per shingle
+            seed: Seed untuk parameter hash
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm harus habis dibagi bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.name_threshold = name_threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._names: Dict[str, frozenset] = {}
+
+        self.stats = {"checked": 0, "duplicates": 0}
+
+    @staticmethod
+    def _recipe_text(recipe: Dict) -> str:
+        parts = [recipe.get('nama', '')]
+        parts.extend(recipe.get('bahan', []))
+        parts.extend(recipe.get('langkah', []))
+        parts.append(recipe.get('tips', ''))
+        return "\n".join(parts)
+
+    @staticmethod
+    def _name_tokens(name: str) -> frozenset:
+        return frozenset(TOKEN_PATTERN.findall(name.lower()))
+
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) < self.shingle_size:
+            grams = {" ".join(tokens)}
+        else:
+            grams = {
+                " ".join(tokens[i:i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)
+            }
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    def signature(self, recipe: Dict) -> np.ndarray:
+        """
+        Menghitung MinHash signature sebuah resep
+
+        Args:
+            recipe: Dictionary resep yang sudah diproses
+
+        Returns:
+            Array uint32 berukuran num_perm
+        """
+        shingles = self._shingles(self._recipe_text(recipe))
+        # (a * x + b) mod p; nilai minimum per permutasi
+        hashed = (np.outer(shingles, self._a) + self._b) % _MERSENNE_PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            yield band, rows.tobytes()
+
+    def find_duplicate(self, recipe: Dict,
+                       signature: Optional[np.ndarray] = None) -> Optional[str]:
+        """
+        Mencari resep yang sudah terdaftar yang merupakan near-duplicate
+
+        Args:
+            recipe: Dictionary resep yang sudah diproses
+            signature: MinHash signature (dihitung jika tidak diberikan)
+
+        Returns:
+            Key resep kanonik, atau None jika tidak ada duplikat
+        """
+        if signature is None:
+            signature = self.signature(recipe)
+        name_tokens = self._name_tokens(recipe.get('nama', ''))
+
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            other_name = self._names[key]
+            union = name_tokens | other_name
+            name_similarity = len(name_tokens & other_name) / len(union) if union else 1.0
+            if name_similarity < self.name_threshold:
+                continue
+
+            content_similarity = float(np.mean(self._signatures[key] == signature))
+            if content_similarity >= self.threshold and content_similarity > best_score:
+                best_key, best_score = key, content_similarity
+
+        return best_key
+
+    def add(self, key: str, recipe: Dict, signature: Optional[np.ndarray] = None):
+        """
+        Mendaftarkan resep ke indeks LSH
+
+        Args:
+            key: Id resep (mis. id dokumen di vector store)
+            recipe: Dictionary resep yang sudah diproses
+            signature: MinHash signature (dihitung jika tidak diberikan)
+        """
+        if signature is None:
+            signature = self.signature(recipe)
+
+        self._signatures[key] = signature
+        self._names[key] = self._name_tokens(recipe.get('nama', ''))
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def filter_batch(self, recipes: List[Dict], keys: List[str]) -> Tuple[List[Dict], List[str], Dict[str, List[str]]]:
+        """
+        Menyaring satu batch resep terhadap semua resep yang sudah diterima
+
+        Args:
+            recipes: List resep yang sudah diproses
+            keys: Calon id untuk resep yang diterima (dipakai berurutan)
+
+        Returns:
+            Tuple (resep unik, id resep unik, {id kanonik: [nama duplikat]})
+        """
+        kept, kept_keys = [], []
+        duplicates: Dict[str, List[str]] = {}
+
+        for recipe in recipes:
+            self.stats["checked"] += 1
+            signature = self.signature(recipe)
+            canonical = self.find_duplicate(recipe, signature)
+
+            if canonical is not None:
+                self.stats["duplicates"] += 1
+                duplicates.setdefault(canonical, []).append(recipe.get('nama', ''))
+                continue
+
+            key = keys[len(kept)]
+            self.add(key, recipe, signature)
+            kept.append(recipe)
+            kept_keys.append(key)
+
+        return kept, kept_keys, duplicates
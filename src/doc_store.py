@@ -0,0 +1,136 @@
+"""
+Modul document store lokal berbasis memory-mapped file
+Teks dan metadata resep disimpan di satu file di samping database sehingga pencarian
+cukup meminta id dan distance ke ChromaDB; isi resep hanya dibaca untuk hasil yang
+benar-benar dipakai (context LLM atau daftar sumber).
+"""
+
+import os
+import json
+import mmap
+import struct
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# Trailer file: offset index JSON (uint64 little-endian) + magic
+TRAILER = struct.Struct("<Q8s")
+MAGIC = b"RECDOCS1"
+
+
+class DocumentStore:
+    """
+    Penyimpanan dokumen resep read-only yang dibaca lewat mmap
+
+    Layout file: record JSON [dokumen, metadata] berurutan, index JSON
+    {id: [offset, panjang]}, lalu trailer berisi offset index.
+    """
+
+    def __init__(self, path: str):
+        """
+        Membuka document store (hanya index yang dibaca ke memori)
+
+        Args:
+            path: Path file document store
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index_offset, magic = TRAILER.unpack(self._mmap[-TRAILER.size:])
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"File document store tidak valid: {path}")
+        self._index: Dict[str, Tuple[int, int]] = {
+            doc_id: (offset, length)
+            for doc_id, (offset, length) in json.loads(self._mmap[index_offset:-TRAILER.size]).items()
+        }
+        self.stats = {"reads": 0}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._index
+
+    def get(self, doc_id: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Membaca dokumen dan metadata satu resep
+
+        Args:
+            doc_id: Id dokumen
+
+        Returns:
+            Tuple (dokumen, metadata), atau None jika id tidak ada
+        """
+        location = self._index.get(doc_id)
+        if location is None:
+            return None
+        offset, length = location
+        self.stats["reads"] += 1
+        document, metadata = json.loads(self._mmap[offset:offset + length])
+        return document, metadata
+
+    def close(self):
+        """
+        Menutup mmap dan file
+        """
+        self._mmap.close()
+        self._file.close()
+
+    @staticmethod
+    def write(path: str, rows: Iterable[Tuple[str, str, Dict]]) -> int:
+        """
+        Menulis document store baru (atomik)
+
+        Args:
+            path: Path file document store
+            rows: Iterable (id, dokumen, metadata)
+
+        Returns:
+            Jumlah dokumen yang ditulis
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        index = {}
+        offset = 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for doc_id, document, metadata in rows:
+                record = json.dumps([document, metadata], ensure_ascii=False).encode('utf-8')
+                f.write(record)
+                index[doc_id] = [offset, len(record)]
+                offset += len(record)
+            f.write(json.dumps(index, ensure_ascii=False).encode('utf-8'))
+            f.write(TRAILER.pack(offset, MAGIC))
+        os.replace(tmp_path, path)
+        return len(index)
+
+    @classmethod
+    def build(cls, vector_store, page_size: int = 1000) -> int:
+        """
+        Membangun document store dari collection resep (per halaman, memori konstan)
+
+        Args:
+            vector_store: Instance RecipeVectorStore
+            page_size: Jumlah resep yang dibaca dari ChromaDB per halaman
+
+        Returns:
+            Jumlah dokumen yang ditulis
+        """
+        def rows():
+            total = vector_store.collection.count()
+            for offset in range(0, total, page_size):
+                page = vector_store.collection.get(include=["documents", "metadatas"],
+                                                   limit=page_size, offset=offset)
+                yield from zip(page['ids'], page['documents'], page['metadatas'])
+
+        return cls.write(cls.default_path(vector_store), rows())
+
+    @staticmethod
+    def default_path(vector_store) -> str:
+        """
+        Lokasi default document store di samping database vector store
+        """
+        return os.path.join(vector_store.persist_directory, f"{vector_store.collection_name}_docs.bin")
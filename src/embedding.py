@@ -3,8 +3,7 @@ Modul untuk text embedding menggunakan model sentence-transformers
 Mengubah teks resep menjadi representasi vektor numerik
 """
 
-from typing import List
-from sentence_transformers import SentenceTransformer
+from typing import List, Optional
 import numpy as np
 
 
@@ -13,15 +12,26 @@ class RecipeEmbedding:
     Kelas untuk menghasilkan embedding dari teks resep
     """
     
-    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 backend: str = "torch", onnx_model_dir: Optional[str] = None,
+                 onnx_quantized: bool = False):
         """
         Inisialisasi model embedding
         
         Args:
             model_name: Nama model sentence-transformers yang digunakan
+            backend: "torch" (SentenceTransformer) atau "onnx" (ONNX Runtime, hasil export_onnx.py)
+            onnx_model_dir: Direktori model ONNX (backend "onnx")
+            onnx_quantized: Pakai model ONNX int8
         """
-        print(f"Memuat model embedding: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        print(f"Memuat model embedding: {model_name} (backend: {backend})")
+        if backend == "onnx":
+            from src.onnx_embedding import OnnxSentenceEncoder
+            self.model = OnnxSentenceEncoder(onnx_model_dir, quantized=onnx_quantized)
+        else:
+            # Import PyTorch hanya untuk backend torch
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name)
         self.embedding_dimension = self.model.get_sentence_embedding_dimension()
         print(f"Model dimuat. Dimensi embedding: {self.embedding_dimension}")
     
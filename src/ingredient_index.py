@@ -0,0 +1,312 @@
+"""
+Modul inverted index bahan
+Memetakan bahan yang sudah dinormalisasi ke posting list (array id resep terurut),
+untuk pertanyaan "bisa masak apa dengan bahan ini" tanpa semantic search.
+"""
+
+import os
+import re
+import json
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+
+# Kata kuantitas/satuan dan cara pengolahan yang bukan bagian nama bahan
+UNIT_WORDS = {
+    'gr', 'gram', 'g', 'kg', 'ml', 'liter', 'l', 'sdm', 'sdt', 'sendok', 'makan', 'teh',
+    'buah', 'butir', 'siung', 'batang', 'lembar', 'ruas', 'ikat', 'genggam', 'gelas',
+    'cangkir', 'bungkus', 'potong', 'ekor', 'ons', 'secukupnya', 'sejumput', 'kebutuhan',
+    'sesuai', 'selera', 'sedikit', 'besar', 'kecil', 'sedang'
+}
+PREPARATION_WORDS = {
+    'cincang', 'iris', 'irisan', 'tipis', 'halus', 'haluskan', 'memarkan', 'geprek',
+    'potong-potong', 'parut', 'sangrai', 'rebus', 'kupas', 'secukupnya'
+}
+
+# Bahan dapur yang dianggap selalu tersedia (tidak dihitung sebagai bahan kurang)
+PANTRY_STAPLES = {'garam', 'gula', 'air', 'minyak', 'minyak goreng', 'merica', 'lada', 'rempah-rempah'}
+
+# Baris placeholder "Bahan utama untuk <Nama Masakan>" hanya berisi nama masakan,
+# bukan bahan; jika diindex, nama masakan ("ayam" dari "Soto Ayam") ikut jadi bahan
+_PLACEHOLDER_PATTERN = re.compile(r'^(?:[-•*]\s*)?bahan utama untuk\b', re.IGNORECASE)
+_PREFIX_PATTERN = re.compile(r'^(?:[-•*]\s*)?(?:bahan|bumbu dasar|bumbu halus|bumbu)\s*:?\s*',
+                             re.IGNORECASE)
+_SUFFIX_PATTERN = re.compile(r'\s+untuk\s+.*$', re.IGNORECASE)
+_SPLIT_PATTERN = re.compile(r'\s*(?:,|;|/|\bdan\b|\batau\b|:)\s*', re.IGNORECASE)
+_TOKEN_PATTERN = re.compile(r'[a-z][a-z\-]*')
+
+
+def normalize_ingredient_line(line: str) -> List[str]:
+    """
+    Mengubah satu baris bahan menjadi daftar nama bahan yang dinormalisasi
+
+    Args:
+        line: Baris bahan, mis. "Bumbu dasar: bawang merah, bawang putih, cabai"
+
+    Returns:
+        List nama bahan, mis. ["bawang merah", "bawang putih", "cabai"]; list kosong
+        untuk baris placeholder "Bahan utama untuk <Nama Masakan>"
+    """
+    line = line.strip().lower()
+    if _PLACEHOLDER_PATTERN.match(line):
+        return []
+    line = _PREFIX_PATTERN.sub('', line)
+    # "Bumbu dasar: ..." setelah prefix lain
+    if ':' in line:
+        line = line.split(':', 1)[1]
+
+    ingredients = []
+    for part in _SPLIT_PATTERN.split(line):
+        part = _SUFFIX_PATTERN.sub('', part)
+        tokens = [token for token in _TOKEN_PATTERN.findall(part)
+                  if token not in UNIT_WORDS and token not in PREPARATION_WORDS]
+        if tokens:
+            ingredients.append(' '.join(tokens))
+    return ingredients
+
+
+def split_ingredients(text: str) -> List[str]:
+    """
+    Memecah input bahan dari user ("ayam, tempe dan bawang putih") menjadi list bahan
+
+    Args:
+        text: Daftar bahan dalam satu string
+
+    Returns:
+        List nama bahan yang dinormalisasi
+    """
+    return normalize_ingredient_line(text)
+
+
+def _contains(sorted_docs: np.ndarray, doc: int) -> bool:
+    position = np.searchsorted(sorted_docs, doc)
+    return position < sorted_docs.size and sorted_docs[position] == doc
+
+
+class IngredientIndex:
+    """
+    Inverted index bahan -> resep dengan posting list berbasis array numpy terurut
+    """
+
+    def __init__(self):
+        self.recipe_ids: List[str] = []
+        self.recipe_names: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self._postings_build: List[List[int]] = []
+        self._postings: Optional[List[np.ndarray]] = None
+        self._token_to_terms: Dict[str, List[int]] = {}
+        self._terms: List[str] = []
+        self._recipe_sizes: Optional[np.ndarray] = None
+        self._staple_terms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def add(self, recipe_id: str, recipe: Dict):
+        """
+        Menambahkan satu resep ke index
+
+        Args:
+            recipe_id: Id dokumen resep di vector store
+            recipe: Resep yang sudah diproses (Recipe atau dict dengan 'bahan')
+        """
+        doc = len(self.recipe_ids)
+        self.recipe_ids.append(recipe_id)
+        self.recipe_names.append(recipe.get('nama', ''))
+
+        terms = set()
+        for line in recipe.get('bahan', []):
+            terms.update(normalize_ingredient_line(line))
+
+        for term in terms:
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                term_id = self.vocabulary[term] = len(self._postings_build)
+                self._postings_build.append([])
+            self._postings_build[term_id].append(doc)
+
+        self._postings = None
+
+    def _freeze(self):
+        """
+        Mengubah posting list menjadi array terurut dan menyiapkan lookup per kata
+        """
+        if self._postings is not None:
+            return
+
+        self._postings = [np.asarray(docs, dtype=np.int32) for docs in self._postings_build]
+        self._terms = list(self.vocabulary)
+        self._token_to_terms = {}
+        for term, term_id in self.vocabulary.items():
+            for token in term.split():
+                self._token_to_terms.setdefault(token, []).append(term_id)
+
+        num_docs = len(self.recipe_ids)
+        sizes = np.zeros(num_docs, dtype=np.int32)
+        staples = np.zeros(num_docs, dtype=np.int32)
+        for term, term_id in self.vocabulary.items():
+            postings = self._postings[term_id]
+            sizes[postings] += 1
+            if term in PANTRY_STAPLES:
+                staples[postings] += 1
+        self._recipe_sizes = sizes
+        self._staple_terms = staples
+
+    def match_terms(self, ingredient: str) -> List[int]:
+        """
+        Mencari term index yang cocok dengan satu bahan dari user
+        ("ayam" cocok dengan "ayam kampung" dan "dada ayam")
+
+        Args:
+            ingredient: Nama bahan yang sudah dinormalisasi
+
+        Returns:
+            List term id
+        """
+        self._freeze()
+        tokens = ingredient.split()
+        if not tokens:
+            return []
+
+        candidates = set(self._token_to_terms.get(tokens[0], ()))
+        for token in tokens[1:]:
+            candidates &= set(self._token_to_terms.get(token, ()))
+        return sorted(candidates)
+
+    def _postings_for(self, ingredient: str) -> Tuple[List[int], np.ndarray]:
+        term_ids = self.match_terms(ingredient)
+        if not term_ids:
+            return term_ids, np.empty(0, dtype=np.int32)
+        if len(term_ids) == 1:
+            return term_ids, self._postings[term_ids[0]]
+        return term_ids, np.unique(np.concatenate([self._postings[t] for t in term_ids]))
+
+    def recipes_with_all(self, ingredients: List[str]) -> List[str]:
+        """
+        Set containment: resep yang memakai SEMUA bahan yang diberikan
+
+        Args:
+            ingredients: List bahan yang dinormalisasi
+
+        Returns:
+            List id resep
+        """
+        result = None
+        # Posting list terpendek dulu supaya irisan cepat mengecil
+        postings = sorted((self._postings_for(i)[1] for i in ingredients), key=len)
+        for docs in postings:
+            result = docs if result is None else np.intersect1d(result, docs, assume_unique=True)
+            if result.size == 0:
+                break
+        return [] if result is None else [self.recipe_ids[doc] for doc in result]
+
+    def rank_by_coverage(self, ingredients: List[str], top_k: int = 5,
+                         max_missing: Optional[int] = None,
+                         require_all: bool = False,
+                         ignore_staples: bool = True) -> List[Dict]:
+        """
+        Meranking resep berdasarkan jumlah bahan user yang terpakai dan bahan yang kurang
+
+        Args:
+            ingredients: List bahan user yang dinormalisasi
+            top_k: Jumlah resep teratas
+            max_missing: Maksimum bahan yang kurang (None = tanpa batas)
+            require_all: Hanya resep yang memakai semua bahan user (set containment)
+            ignore_staples: Bahan dapur umum (garam, gula, minyak, ...) tidak dihitung kurang
+
+        Returns:
+            List dictionary {id, nama, matched, missing_count, coverage}, terurut
+            dari bahan user terpakai terbanyak lalu bahan kurang tersedikit
+        """
+        self._freeze()
+        if not ingredients or not self.recipe_ids:
+            return []
+
+        num_docs = len(self.recipe_ids)
+        covered = np.zeros(num_docs, dtype=np.int32)
+        matched_term_ids = set()
+        per_ingredient = []
+        for ingredient in ingredients:
+            term_ids, docs = self._postings_for(ingredient)
+            covered[docs] += 1
+            matched_term_ids.update(term_ids)
+            per_ingredient.append((ingredient, docs))
+
+        # Jumlah bahan resep yang sudah dimiliki user (per term, bukan per input user)
+        owned = np.zeros(num_docs, dtype=np.int32)
+        owned_staples = np.zeros(num_docs, dtype=np.int32)
+        for term_id in matched_term_ids:
+            owned[self._postings[term_id]] += 1
+            if self._terms[term_id] in PANTRY_STAPLES:
+                owned_staples[self._postings[term_id]] += 1
+
+        missing = self._recipe_sizes - owned
+        if ignore_staples:
+            missing = missing - (self._staple_terms - owned_staples)
+
+        candidates = np.flatnonzero(covered >= (len(ingredients) if require_all else 1))
+        if max_missing is not None:
+            candidates = candidates[missing[candidates] <= max_missing]
+        order = np.lexsort((missing[candidates], -covered[candidates]))
+        ranked = candidates[order][:top_k]
+
+        results = []
+        for doc in ranked:
+            results.append({
+                "id": self.recipe_ids[doc],
+                "nama": self.recipe_names[doc],
+                "matched": [ingredient for ingredient, docs in per_ingredient if _contains(docs, doc)],
+                "missing_count": int(missing[doc]),
+                "coverage": float(covered[doc]) / len(ingredients)
+            })
+        return results
+
+    def save(self, path: str):
+        """
+        Menyimpan index ke file JSON
+
+        Args:
+            path: Path file index
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "recipe_ids": self.recipe_ids,
+            "recipe_names": self.recipe_names,
+            "terms": list(self.vocabulary),
+            "postings": self._postings_build
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IngredientIndex":
+        """
+        Memuat index dari file JSON
+
+        Args:
+            path: Path file index
+
+        Returns:
+            Instance IngredientIndex
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        index = cls()
+        index.recipe_ids = data["recipe_ids"]
+        index.recipe_names = data["recipe_names"]
+        index.vocabulary = {term: term_id for term_id, term in enumerate(data["terms"])}
+        index._postings_build = data["postings"]
+        return index
+
+    @staticmethod
+    def default_path(vector_store) -> str:
+        """
+        Lokasi default file index di samping database vector store
+        """
+        return os.path.join(vector_store.persist_directory, f"{vector_store.collection_name}_ingredients.json")
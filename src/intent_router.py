@@ -0,0 +1,328 @@
+"""
+Modul intent router
+Mengklasifikasikan query secara lokal (aturan kata kunci + model linear kecil di atas
+embedding yang di-cache) ke salah satu jalur: tanpa retrieval, lookup nama resep,
+lookup bahan, atau semantic retrieval penuh.
+"""
+
+import re
+import math
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from src.ingredient_index import split_ingredients
+
+
+INTENTS = ("general", "name_lookup", "ingredient_lookup", "semantic")
+
+# Pertanyaan umum memasak yang cukup dijawab dari pengetahuan umum LLM
+GENERAL_PATTERN = re.compile(
+    r'\b(tips?|trik|teknik|kenapa|mengapa|apa beda(?:nya)?|perbedaan|pengganti|substitusi|'
+    r'diganti|istilah|arti(?:nya)?|alat|peralatan|menyimpan|simpan|agar tetap|supaya tetap|'
+    r'agar tidak|supaya tidak|cara (?:menumis|merebus|menggoreng|mengukus|memanggang|memotong))\b',
+    re.IGNORECASE
+)
+# "Bisa masak apa ..." / "bikin apa ..." (pertanyaan berbasis bahan)
+COOK_WHAT_PATTERN = re.compile(r'\b(masak|bikin|buat|membuat|olah|resep|menu)\s+apa\b', re.IGNORECASE)
+INGREDIENT_CUE_PATTERN = re.compile(
+    r'\b(?:punya|ada|tersisa|sisa|pakai|memakai|menggunakan|dengan bahan|dari bahan|bahan)\s+(.+?)'
+    r'(?:[?.!]|\s+(?:bisa|enaknya|sebaiknya|kira-kira)\b|$)',
+    re.IGNORECASE
+)
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Contoh query berlabel untuk melatih model linear (dipakai jika aturan tidak yakin)
+TRAINING_EXAMPLES = [
+    ("general", "Bagaimana tips menumis sayuran agar tetap renyah?"),
+    ("general", "Kalau tidak ada kecap manis, bisa diganti dengan apa?"),
+    ("general", "Apa bedanya santan kental dan santan encer?"),
+    ("general", "Kenapa nasi goreng saya lembek?"),
+    ("general", "Bagaimana cara menyimpan bumbu halus supaya awet?"),
+    ("general", "Apa arti istilah menumis?"),
+    ("general", "Wajan apa yang bagus untuk menggoreng?"),
+    ("general", "Berapa suhu minyak yang pas untuk menggoreng?"),
+    ("general", "Bagaimana cara memotong bawang tanpa menangis?"),
+    ("general", "Apakah boleh memakai minyak zaitun untuk masakan Indonesia?"),
+    ("name_lookup", "Apa bahan-bahan soto ayam?"),
+    ("name_lookup", "Berapa lama masak rendang?"),
+    ("name_lookup", "Bagaimana langkah membuat gado-gado?"),
+    ("name_lookup", "Resep rawon daging sapi dong"),
+    ("name_lookup", "Untuk berapa porsi resep opor ayam?"),
+    ("name_lookup", "Apa tips membuat klepon?"),
+    ("ingredient_lookup", "Saya punya ayam dan tempe, bisa masak apa?"),
+    ("ingredient_lookup", "Di kulkas ada telur, tahu, dan kangkung, enaknya bikin apa?"),
+    ("ingredient_lookup", "Masak apa ya dengan bahan ikan dan cabai?"),
+    ("ingredient_lookup", "Sisa daging sapi bisa diolah jadi apa?"),
+    ("ingredient_lookup", "Resep apa yang pakai santan dan ayam?"),
+    ("semantic", "Rekomendasikan menu makan siang keluarga"),
+    ("semantic", "Masakan berkuah yang cocok untuk cuaca dingin"),
+    ("semantic", "Resep makanan pedas khas Sumatera"),
+    ("semantic", "Menu sehat untuk diet yang tetap enak"),
+    ("semantic", "Camilan tradisional yang manis"),
+    ("semantic", "Masakan yang cepat dibuat untuk sarapan"),
+    ("semantic", "Hidangan spesial untuk lebaran"),
+]
+
+
+class IntentResult:
+    """
+    Hasil klasifikasi intent sebuah query
+    """
+
+    __slots__ = ('intent', 'confidence', 'recipe_ids', 'ingredients', 'source', 'retrieval_stats')
+
+    def __init__(self, intent: str, confidence: float = 1.0, recipe_ids: Optional[List[str]] = None,
+                 ingredients: Optional[List[str]] = None, source: str = "rule"):
+        self.intent = intent
+        self.confidence = confidence
+        self.recipe_ids = recipe_ids or []
+        self.ingredients = ingredients or []
+        self.source = source
+        # Statistik adaptive top-k milik request ini (diisi RAGChatbot.retrieve_for_query)
+        self.retrieval_stats: Optional[Dict] = None
+
+    def __repr__(self) -> str:
+        return (f"IntentResult(intent={self.intent!r}, confidence={self.confidence:.2f}, "
+                f"recipe_ids={self.recipe_ids!r}, ingredients={self.ingredients!r}, source={self.source!r})")
+
+    def to_dict(self) -> Dict:
+        return {
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "recipe_ids": self.recipe_ids,
+            "ingredients": self.ingredients,
+            "source": self.source
+        }
+
+
+class IntentRouter:
+    """
+    Router intent lokal: aturan kata kunci dulu, model linear sebagai cadangan
+    """
+
+    def __init__(self, vector_store, ingredient_index=None,
+                 name_threshold: float = 0.5, model_threshold: float = 0.55,
+                 embedding_cache_size: int = 1024):
+        """
+        Inisialisasi router
+
+        Args:
+            vector_store: Instance RecipeVectorStore (nama resep dan embedding function)
+            ingredient_index: IngredientIndex (opsional, untuk validasi bahan)
+            name_threshold: Minimum coverage nama resep (berbobot IDF) untuk lookup nama
+            model_threshold: Minimum probabilitas model linear; di bawahnya dipakai semantic
+            embedding_cache_size: Jumlah embedding query yang di-cache
+        """
+        self.vector_store = vector_store
+        self.ingredient_index = ingredient_index
+        self.name_threshold = name_threshold
+        self.model_threshold = model_threshold
+        self.embedding_cache_size = embedding_cache_size
+
+        self._names: Optional[List[Dict]] = None
+        self._token_to_names: Dict[str, List[int]] = {}
+        self._idf: Dict[str, float] = {}
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._weights: Optional[np.ndarray] = None
+        self._bias: Optional[np.ndarray] = None
+
+        self.stats = {intent: 0 for intent in INTENTS}
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def _load_names(self):
+        """
+        Membangun index token -> nama resep (termasuk nama_lain) dari metadata collection
+        """
+        if self._names is not None:
+            return
+
+        rows = self.vector_store.collection.get(include=["metadatas"])
+        self._names = []
+        for recipe_id, metadata in zip(rows['ids'], rows['metadatas']):
+            names = [metadata.get('nama', '')]
+            names.extend(alias for alias in (metadata.get('nama_lain') or '').split('; ') if alias)
+            for name in names:
+                tokens = self._tokens(name)
+                if tokens:
+                    self._names.append({"id": recipe_id, "name": " ".join(tokens), "tokens": set(tokens)})
+
+        document_frequency: Dict[str, int] = {}
+        for idx, entry in enumerate(self._names):
+            for token in entry["tokens"]:
+                self._token_to_names.setdefault(token, []).append(idx)
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        total = max(len(self._names), 1)
+        self._idf = {token: math.log(1 + total / df) for token, df in document_frequency.items()}
+
+    def _is_distinctive_head(self, token: str, entry: Dict) -> bool:
+        # Kata pertama nama (jenis masakan) yang lebih jarang dari semua token lain
+        # di nama itu: "rendang" di "Rendang Ayam", bukan "sup" di "Sup Kimlo" (seri)
+        if entry["name"].split(" ", 1)[0] != token:
+            return False
+        others = [self._idf[other] for other in entry["tokens"] if other != token]
+        return not others or self._idf[token] > max(others)
+
+    def match_recipe_names(self, query: str) -> List[Tuple[str, float]]:
+        """
+        Mencari resep yang namanya disebut di query (coverage token nama berbobot IDF)
+
+        Args:
+            query: Pertanyaan user
+
+        Returns:
+            List (id resep, coverage) yang cocok, terbaik dulu; coverage 1.0 berarti
+            nama lengkap disebut (kosong jika tidak ada yang yakin). Nama yang disebut
+            sebagian harus cocok minimal dua token atau kata pertama yang paling khas.
+        """
+        self._load_names()
+        query_tokens = self._tokens(query)
+        normalized_query = " ".join(query_tokens)
+        query_token_set = set(query_tokens)
+
+        scores: Dict[int, float] = {}
+        for token in query_token_set:
+            for idx in self._token_to_names.get(token, ()):
+                scores[idx] = scores.get(idx, 0.0) + self._idf[token]
+
+        matches = []
+        for idx, matched_weight in scores.items():
+            entry = self._names[idx]
+            if entry["name"] in normalized_query:
+                coverage = 1.0
+            else:
+                # Satu kata umum ("manis", "sup", "spesial") tidak cukup untuk memilih satu
+                # resep: nama yang disebut sebagian harus cocok minimal dua token, atau satu
+                # token yang merupakan kata pertama nama sekaligus token paling khasnya
+                matched_tokens = entry["tokens"] & query_token_set
+                if len(matched_tokens) < 2 and not self._is_distinctive_head(next(iter(matched_tokens)), entry):
+                    continue
+                coverage = matched_weight / sum(self._idf[token] for token in entry["tokens"])
+            if coverage >= self.name_threshold:
+                matches.append((coverage, matched_weight, entry["id"]))
+
+        matches.sort(key=lambda item: (-item[0], -item[1]))
+        best: Dict[str, float] = {}
+        for coverage, _weight, recipe_id in matches:
+            best.setdefault(recipe_id, coverage)
+        return list(best.items())
+
+    def extract_ingredients(self, query: str) -> List[str]:
+        """
+        Mengambil daftar bahan dari pertanyaan "punya X dan Y, bisa masak apa?"
+
+        Args:
+            query: Pertanyaan user
+
+        Returns:
+            List bahan yang dinormalisasi (kosong jika tidak ada)
+        """
+        match = INGREDIENT_CUE_PATTERN.search(query)
+        if not match:
+            return []
+
+        ingredients = split_ingredients(match.group(1))
+        if self.ingredient_index is not None:
+            ingredients = [item for item in ingredients if self.ingredient_index.match_terms(item)]
+        return ingredients
+
+    def _embed(self, text: str) -> np.ndarray:
+        key = " ".join(self._tokens(text))
+        embedding = self._embedding_cache.get(key)
+        if embedding is not None:
+            self._embedding_cache.move_to_end(key)
+            return embedding
+
+        embedding = np.asarray(self.vector_store.embedding_function([text])[0], dtype=np.float32)
+        embedding /= max(float(np.linalg.norm(embedding)), 1e-12)
+        self._embedding_cache[key] = embedding
+        if len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+        return embedding
+
+    def _train(self, epochs: int = 300, learning_rate: float = 0.5, l2: float = 1e-3):
+        """
+        Melatih softmax regression kecil di atas embedding contoh query
+        """
+        features = np.stack([self._embed(text) for _label, text in TRAINING_EXAMPLES])
+        labels = np.array([INTENTS.index(label) for label, _text in TRAINING_EXAMPLES])
+        targets = np.eye(len(INTENTS))[labels]
+
+        weights = np.zeros((features.shape[1], len(INTENTS)), dtype=np.float32)
+        bias = np.zeros(len(INTENTS), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = self._softmax(features @ weights + bias)
+            gradient = (probabilities - targets) / len(features)
+            weights -= learning_rate * (features.T @ gradient + l2 * weights)
+            bias -= learning_rate * gradient.sum(axis=0)
+
+        self._weights, self._bias = weights, bias
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, query: str) -> Dict[str, float]:
+        """
+        Probabilitas setiap intent menurut model linear
+
+        Args:
+            query: Pertanyaan user
+
+        Returns:
+            Dictionary {intent: probabilitas}
+        """
+        if self._weights is None:
+            self._train()
+        probabilities = self._softmax(self._embed(query) @ self._weights + self._bias)
+        return {intent: float(p) for intent, p in zip(INTENTS, probabilities)}
+
+    def classify(self, query: str) -> IntentResult:
+        """
+        Menentukan jalur retrieval untuk sebuah query
+
+        Args:
+            query: Pertanyaan user
+
+        Returns:
+            IntentResult
+        """
+        result = self._classify(query)
+        self.stats[result.intent] += 1
+        return result
+
+    def _classify(self, query: str) -> IntentResult:
+        # 1. "Punya X dan Y, bisa masak apa?" -> lookup bahan
+        is_ingredient_question = (COOK_WHAT_PATTERN.search(query) is not None
+                                  or re.search(r'\bjadi apa\b', query, re.IGNORECASE) is not None)
+        if is_ingredient_question:
+            ingredients = self.extract_ingredients(query)
+            if ingredients:
+                return IntentResult("ingredient_lookup", ingredients=ingredients)
+
+        # 2. Nama resep disebut -> lookup nama; pertanyaan umum (tips, substitusi, teknik)
+        #    hanya kalah dari nama resep yang disebut lengkap
+        name_matches = self.match_recipe_names(query)
+        if is_ingredient_question:
+            # "Sisa daging sapi bisa diolah jadi apa?" menyebut bahan, bukan nama resep
+            name_matches = [match for match in name_matches if match[1] >= 1.0]
+        is_general = GENERAL_PATTERN.search(query) is not None
+        if name_matches and not (is_general and name_matches[0][1] < 1.0):
+            return IntentResult("name_lookup", confidence=name_matches[0][1],
+                                recipe_ids=[recipe_id for recipe_id, _coverage in name_matches])
+
+        # 3. Pertanyaan umum tanpa nama resep -> tanpa retrieval
+        if is_general:
+            return IntentResult("general")
+
+        # 4. Aturan tidak yakin -> model linear; intent lookup tanpa nama/bahan tidak bisa dipakai
+        probabilities = self.predict_proba(query)
+        intent = max(probabilities, key=probabilities.get)
+        confidence = probabilities[intent]
+        if intent == "general" and confidence >= self.model_threshold:
+            return IntentResult("general", confidence=confidence, source="model")
+        return IntentResult("semantic", confidence=probabilities["semantic"], source="model")
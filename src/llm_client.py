@@ -0,0 +1,510 @@
+"""
+Modul client LLM yang tahan gangguan (resilient)
+Menyediakan retry dengan exponential backoff + jitter, token-bucket rate limiter,
+timeout per panggilan, dan circuit breaker untuk panggilan ke provider LLM
+"""
+
+import time
+import random
+import threading
+from typing import Callable, Dict, Iterator, Optional, Any
+
+
+class LLMTimeoutError(Exception):
+    """Panggilan ke provider melebihi batas waktu"""
+
+
+class CircuitOpenError(Exception):
+    """Circuit breaker sedang terbuka, panggilan ditolak tanpa menghubungi provider"""
+
+
+class ProviderError(Exception):
+    """Error provider dengan status HTTP (dipakai FakeLLMProvider dan stand-in provider)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Status HTTP yang layak dicoba ulang (rate limit, overload, timeout)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Nama kelas exception SDK provider yang bersifat sementara; dicek lewat nama agar
+# modul ini tidak perlu mengimpor openai/google-api-core
+RETRYABLE_ERROR_TYPES = {
+    # openai
+    "APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError",
+    # google.api_core.exceptions
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "BadGateway", "GatewayTimeout",
+}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    # openai: status_code; google-api-core: code; httpx/requests: response.status_code
+    for status in (getattr(error, "status_code", None), getattr(error, "code", None),
+                   getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(status, int) and not isinstance(status, bool):
+            return status
+    return None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Menentukan apakah error dari provider layak dicoba ulang
+
+    Keputusan diambil dari tipe exception dan status HTTP, bukan isi pesan error.
+
+    Args:
+        error: Exception dari provider
+
+    Returns:
+        True jika error bersifat sementara
+    """
+    if isinstance(error, (LLMTimeoutError, TimeoutError, ConnectionError)):
+        return True
+
+    if any(cls.__name__ in RETRYABLE_ERROR_TYPES for cls in type(error).__mro__):
+        return True
+
+    status = _status_code(error)
+    return status is not None and status in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 20.0) -> float:
+    """
+    Menghitung waktu tunggu exponential backoff dengan full jitter
+
+    Args:
+        attempt: Nomor percobaan ulang (mulai dari 1)
+        base_delay: Waktu tunggu dasar (detik)
+        max_delay: Batas atas waktu tunggu (detik)
+
+    Returns:
+        Waktu tunggu acak dalam rentang [0, min(max_delay, base_delay * 2^(attempt-1))]
+    """
+    cap = min(max_delay, base_delay * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter yang thread-safe
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Inisialisasi token bucket
+
+        Args:
+            rate: Jumlah token yang diisi ulang per detik (0 = tanpa batas)
+            capacity: Kapasitas maksimum bucket (default: sama dengan rate, minimal 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.total_wait_seconds = 0.0
+        self.throttled_count = 0
+
+    @classmethod
+    def from_quota(cls, requests_per_minute: float, burst: Optional[float] = None) -> "TokenBucket":
+        """
+        Membuat token bucket dari kuota per menit provider
+
+        Args:
+            requests_per_minute: Kuota request per menit
+            burst: Jumlah request yang boleh dikirim sekaligus
+
+        Returns:
+            Instance TokenBucket
+        """
+        return cls(rate=requests_per_minute / 60.0, capacity=burst)
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Mengambil token, menunggu jika bucket kosong
+
+        Args:
+            tokens: Jumlah token yang dibutuhkan
+            timeout: Batas waktu menunggu (None = tunggu sampai tersedia)
+
+        Returns:
+            True jika token berhasil diambil, False jika timeout
+        """
+        if self.rate <= 0:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    if waited > 0:
+                        self.total_wait_seconds += waited
+                        self.throttled_count += 1
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+
+            time.sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker dengan state closed -> open -> half_open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Inisialisasi circuit breaker
+
+        Args:
+            failure_threshold: Jumlah kegagalan berturut-turut sebelum circuit terbuka
+            reset_timeout: Waktu (detik) sebelum mencoba satu panggilan percobaan
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.open_count = 0
+        self.rejected_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Mengecek apakah panggilan boleh diteruskan ke provider
+
+        Returns:
+            True jika boleh, False jika circuit terbuka
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected_count += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            # Half-open: hanya satu panggilan percobaan
+            if self._probe_in_flight:
+                self.rejected_count += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self):
+        """
+        Melepas slot panggilan percobaan half-open tanpa mengubah state circuit
+        (dipakai untuk error yang bukan tanda provider bermasalah)
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.open_count += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class ResilientLLMClient:
+    """
+    Pembungkus panggilan provider LLM dengan retry, rate limit, timeout, dan circuit breaker
+    """
+
+    def __init__(self,
+                 requests_per_minute: float = 60.0,
+                 burst: Optional[float] = None,
+                 timeout: Optional[float] = 60.0,
+                 max_retries: int = 3,
+                 base_delay: float = 0.5,
+                 max_delay: float = 20.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 max_workers: int = 8):
+        """
+        Inisialisasi resilient client
+
+        Args:
+            requests_per_minute: Kuota request per menit (0 = tanpa batas)
+            burst: Jumlah request yang boleh dikirim sekaligus
+            timeout: Batas waktu per panggilan dalam detik (None = tanpa batas)
+            max_retries: Jumlah percobaan ulang untuk error sementara
+            base_delay: Waktu tunggu dasar backoff (detik)
+            max_delay: Batas atas waktu tunggu backoff (detik)
+            failure_threshold: Kegagalan berturut-turut sebelum circuit terbuka
+            reset_timeout: Waktu (detik) circuit terbuka sebelum half-open
+            max_workers: Jumlah maksimum panggilan provider yang berjalan bersamaan,
+                termasuk panggilan yang sudah melewati timeout tapi belum selesai
+        """
+        self.rate_limiter = TokenBucket.from_quota(requests_per_minute, burst)
+        self.circuit_breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "calls": 0,
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "abandoned_in_flight": 0,
+            "non_retryable_errors": 0,
+            "backoff_seconds": 0.0,
+            "total_latency_seconds": 0.0
+        }
+
+    def _inc(self, key: str, value: float = 1):
+        with self._metrics_lock:
+            self._metrics[key] += value
+
+    def _invoke(self, fn: Callable[[], Any]) -> Any:
+        """
+        Menjalankan satu percobaan dengan timeout
+
+        Setiap percobaan berjalan di thread sendiri dan memegang satu slot sampai fn
+        benar-benar selesai. Thread provider tidak bisa dihentikan paksa, jadi panggilan
+        yang melewati timeout tetap memegang slotnya (dicatat di abandoned_in_flight);
+        jika semua slot dipegang panggilan macet, percobaan baru gagal dengan timeout
+        tanpa menambah thread.
+        """
+        if not self.timeout:
+            return fn()
+
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            raise LLMTimeoutError(f"Semua {self.max_workers} slot panggilan LLM masih terpakai "
+                                  f"setelah {self.timeout} detik")
+
+        outcome = {}
+        done = threading.Event()
+
+        def run():
+            try:
+                outcome["result"] = fn()
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                with self._metrics_lock:
+                    outcome["finished"] = True
+                    if outcome.get("abandoned"):
+                        self._metrics["abandoned_in_flight"] -= 1
+                self._slots.release()
+                done.set()
+
+        threading.Thread(target=run, daemon=True, name="llm-call").start()
+
+        if not done.wait(max(0.0, deadline - time.monotonic())):
+            with self._metrics_lock:
+                if not outcome.get("finished"):
+                    outcome["abandoned"] = True
+                    self._metrics["abandoned_in_flight"] += 1
+            if outcome.get("abandoned"):
+                raise LLMTimeoutError(f"Panggilan LLM melebihi batas waktu {self.timeout} detik")
+            done.wait()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Memanggil provider dengan seluruh proteksi
+
+        Args:
+            fn: Fungsi tanpa argumen yang melakukan panggilan ke provider
+
+        Returns:
+            Hasil dari fn
+
+        Raises:
+            CircuitOpenError: Jika circuit breaker sedang terbuka
+            Exception: Error terakhir dari provider jika semua percobaan gagal
+        """
+        self._inc("calls")
+        start_time = time.monotonic()
+        attempt = 0
+
+        try:
+            while True:
+                if not self.circuit_breaker.allow_request():
+                    raise CircuitOpenError("Provider LLM sedang tidak tersedia (circuit breaker terbuka)")
+
+                self.rate_limiter.acquire()
+                attempt += 1
+                self._inc("attempts")
+
+                try:
+                    result = self._invoke(fn)
+                except Exception as e:
+                    if isinstance(e, LLMTimeoutError):
+                        self._inc("timeouts")
+
+                    retryable = is_retryable_error(e)
+                    if retryable:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        # Error dari request itu sendiri bukan tanda provider sehat maupun
+                        # bermasalah: state circuit tidak diubah, slot percobaan dilepas
+                        self.circuit_breaker.release_probe()
+                        self._inc("non_retryable_errors")
+
+                    if not retryable or attempt > self.max_retries:
+                        self._inc("failures")
+                        raise
+
+                    delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                    self._inc("retries")
+                    self._inc("backoff_seconds", delay)
+                    time.sleep(delay)
+                    continue
+
+                self.circuit_breaker.record_success()
+                self._inc("successes")
+                return result
+        finally:
+            self._inc("total_latency_seconds", time.monotonic() - start_time)
+
+    def stream(self, fn: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Memanggil provider streaming; retry hanya dilakukan sebelum chunk pertama diterima
+
+        Args:
+            fn: Fungsi tanpa argumen yang mengembalikan iterator chunk teks
+
+        Returns:
+            Iterator chunk teks
+        """
+        def open_stream():
+            iterator = iter(fn())
+            first = next(iterator, None)
+            return first, iterator
+
+        first, iterator = self.call(open_stream)
+        if first is not None:
+            yield first
+        for chunk in iterator:
+            yield chunk
+
+    def get_metrics(self) -> Dict:
+        """
+        Mendapatkan metrik retry, rate limit, timeout, dan circuit breaker
+
+        Returns:
+            Dictionary berisi metrik
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+
+        metrics["avg_latency_seconds"] = (
+            metrics["total_latency_seconds"] / metrics["calls"] if metrics["calls"] else 0.0
+        )
+        metrics["rate_limiter"] = {
+            "throttled": self.rate_limiter.throttled_count,
+            "wait_seconds": round(self.rate_limiter.total_wait_seconds, 3)
+        }
+        metrics["circuit_breaker"] = {
+            "state": self.circuit_breaker.state,
+            "opened": self.circuit_breaker.open_count,
+            "rejected": self.circuit_breaker.rejected_count
+        }
+        return metrics
+
+
+class FakeLLMProvider:
+    """
+    Provider LLM palsu untuk pengujian lokal tanpa API key
+    """
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0,
+                 error_message: str = "429 Resource exhausted", status_code: Optional[int] = 429,
+                 seed: Optional[int] = None):
+        """
+        Inisialisasi fake provider
+
+        Args:
+            latency: Waktu respons simulasi (detik)
+            failure_rate: Probabilitas panggilan gagal (0-1)
+            error_message: Pesan error yang dilempar saat gagal
+            status_code: Status HTTP ProviderError yang dilempar saat gagal
+            seed: Seed random agar hasil bisa diulang
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.error_message = error_message
+        self.status_code = status_code
+        self._random = random.Random(seed)
+        self.call_count = 0
+
+    def generate(self, prompt: str) -> str:
+        self.call_count += 1
+        time.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise ProviderError(self.error_message, self.status_code)
+        return f"Jawaban untuk: {prompt[:50]}"
+
+
+if __name__ == "__main__":
+    # Test resilient client dengan fake provider
+    provider = FakeLLMProvider(latency=0.01, failure_rate=0.3, seed=42)
+    client = ResilientLLMClient(requests_per_minute=600, burst=5, timeout=1.0,
+                                max_retries=3, base_delay=0.05)
+
+    succeeded = 0
+    for i in range(20):
+        try:
+            client.call(lambda: provider.generate(f"pertanyaan {i}"))
+            succeeded += 1
+        except Exception as e:
+            print(f"Gagal: {e}")
+
+    print(f"Sukses: {succeeded}/20, panggilan provider: {provider.call_count}")
+    print(f"Metrik: {client.get_metrics()}")
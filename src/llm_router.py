@@ -0,0 +1,537 @@
+"""
+Modul provider LLM dan router multi-provider
+Membungkus client Gemini dan OpenAI dalam antarmuka yang sama, serta menyediakan
+hedged request: jika provider utama belum mengirim token pertama sebelum deadline
+berbasis p95, request cadangan dikirim ke provider kedua dan yang tercepat menang
+"""
+
+import os
+import time
+import queue
+import random
+import threading
+from collections import deque
+from typing import List, Dict, Iterator, Optional, Tuple, Callable
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+from src.llm_client import ResilientLLMClient
+
+
+class GeminiProvider:
+    """
+    Provider LLM Google Gemini
+    """
+
+    name = "gemini"
+
+    def __init__(self, model: str, temperature: float, max_tokens: int,
+                 llm_client: Optional[ResilientLLMClient] = None):
+        """
+        Inisialisasi provider Gemini
+
+        Args:
+            model: Nama model Gemini
+            temperature: Temperature untuk generation
+            max_tokens: Maksimum token output
+            llm_client: ResilientLLMClient untuk retry/rate limit/timeout
+        """
+        if not GEMINI_AVAILABLE:
+            raise ValueError("Google Generative AI tidak terinstall. Jalankan: pip install google-generativeai")
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY atau GOOGLE_API_KEY tidak ditemukan di environment variables")
+        genai.configure(api_key=api_key)
+
+        self.model = model or 'gemini-2.5-flash'
+        self.client = genai.GenerativeModel(self.model)
+        self.llm_client = llm_client or ResilientLLMClient()
+        self.generation_config = genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+        )
+
+    def _request_options(self) -> Dict:
+        # Timeout di level HTTP agar thread panggilan yang macet ikut selesai
+        return {"timeout": self.llm_client.timeout} if self.llm_client.timeout else {}
+
+    @staticmethod
+    def _to_prompt(messages: List[Dict]) -> str:
+        # Gemini menerima satu prompt; gabungkan system dan user messages
+        full_prompt = ""
+        for msg in messages:
+            if msg["role"] == "system":
+                full_prompt += f"{msg['content']}\n\n"
+            elif msg["role"] == "user":
+                full_prompt += f"{msg['content']}\n"
+        return full_prompt
+
+    def generate(self, messages: List[Dict]) -> Tuple[str, Dict]:
+        """
+        Menghasilkan jawaban lengkap
+
+        Args:
+            messages: List pesan format chat (role, content)
+
+        Returns:
+            Tuple (teks jawaban, usage)
+        """
+        full_prompt = self._to_prompt(messages)
+        response = self.llm_client.call(lambda: self.client.generate_content(
+            full_prompt,
+            generation_config=self.generation_config,
+            stream=False,
+            request_options=self._request_options()
+        ))
+        return response.text, {}
+
+    def stream(self, messages: List[Dict], usage: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Menghasilkan jawaban secara streaming
+
+        Args:
+            messages: List pesan format chat (role, content)
+            usage: Tidak diisi (usage Gemini tidak dilaporkan, sama seperti generate)
+
+        Returns:
+            Iterator chunk teks
+        """
+        full_prompt = self._to_prompt(messages)
+        response = self.llm_client.stream(lambda: self.client.generate_content(
+            full_prompt,
+            generation_config=self.generation_config,
+            stream=True,
+            request_options=self._request_options()
+        ))
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAIProvider:
+    """
+    Provider LLM OpenAI
+    """
+
+    name = "openai"
+
+    def __init__(self, model: str, temperature: float, max_tokens: int,
+                 llm_client: Optional[ResilientLLMClient] = None):
+        """
+        Inisialisasi provider OpenAI
+
+        Args:
+            model: Nama model OpenAI
+            temperature: Temperature untuk generation
+            max_tokens: Maksimum token output
+            llm_client: ResilientLLMClient untuk retry/rate limit/timeout
+        """
+        if not OPENAI_AVAILABLE:
+            raise ValueError("OpenAI tidak terinstall. Jalankan: pip install openai")
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY tidak ditemukan di environment variables")
+
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.client = OpenAI(api_key=api_key)
+        self.llm_client = llm_client or ResilientLLMClient()
+
+    def generate(self, messages: List[Dict]) -> Tuple[str, Dict]:
+        """
+        Menghasilkan jawaban lengkap
+
+        Args:
+            messages: List pesan format chat (role, content)
+
+        Returns:
+            Tuple (teks jawaban, usage)
+        """
+        response = self.llm_client.call(lambda: self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            timeout=self.llm_client.timeout
+        ))
+        usage = {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens
+        }
+        return response.choices[0].message.content, usage
+
+    def stream(self, messages: List[Dict], usage: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Menghasilkan jawaban secara streaming
+
+        Args:
+            messages: List pesan format chat (role, content)
+            usage: Dictionary yang diisi usage token setelah stream selesai (opsional)
+
+        Returns:
+            Iterator chunk teks
+        """
+        extra = {"stream_options": {"include_usage": True}} if usage is not None else {}
+        response = self.llm_client.stream(lambda: self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+            timeout=self.llm_client.timeout,
+            **extra
+        ))
+        for chunk in response:
+            if usage is not None and getattr(chunk, "usage", None):
+                # Chunk terakhir (tanpa choices) membawa usage seluruh jawaban
+                usage.update({
+                    "prompt_tokens": chunk.usage.prompt_tokens,
+                    "completion_tokens": chunk.usage.completion_tokens,
+                    "total_tokens": chunk.usage.total_tokens
+                })
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class StandInProvider:
+    """
+    Provider lokal pengganti untuk mengukur efek hedging tanpa API key
+    """
+
+    def __init__(self, name: str, first_token_latency: Callable[[], float],
+                 chunks: int = 5, chunk_interval: float = 0.005):
+        """
+        Inisialisasi stand-in provider
+
+        Args:
+            name: Nama provider
+            first_token_latency: Fungsi yang menghasilkan latency token pertama (detik)
+            chunks: Jumlah chunk per jawaban
+            chunk_interval: Jeda antar chunk (detik)
+        """
+        self.name = name
+        self.model = f"stand-in-{name}"
+        self.first_token_latency = first_token_latency
+        self.chunks = chunks
+        self.chunk_interval = chunk_interval
+
+    def generate(self, messages: List[Dict]) -> Tuple[str, Dict]:
+        return "".join(self.stream(messages)), {}
+
+    def stream(self, messages: List[Dict], usage: Optional[Dict] = None) -> Iterator[str]:
+        time.sleep(self.first_token_latency())
+        for i in range(self.chunks):
+            if i > 0:
+                time.sleep(self.chunk_interval)
+            yield f"[{self.name}:{i}]"
+
+
+class HedgedRouter:
+    """
+    Router dua provider dengan hedged request dan failover otomatis
+    """
+
+    def __init__(self, primary, secondary,
+                 hedge_quantile: float = 0.95,
+                 initial_deadline: float = 2.0,
+                 min_deadline: float = 0.2,
+                 min_samples: int = 20,
+                 window_size: int = 200):
+        """
+        Inisialisasi router
+
+        Args:
+            primary: Provider utama (punya atribut name, model, dan method stream(messages, usage))
+            secondary: Provider cadangan
+            hedge_quantile: Kuantil latency token pertama primary sebagai deadline hedge
+            initial_deadline: Deadline (detik) sebelum ada cukup sampel latency
+            min_deadline: Deadline minimum (detik) agar tidak terlalu sering hedge
+            min_samples: Jumlah sampel minimum sebelum memakai kuantil
+            window_size: Jumlah sampel latency terakhir yang disimpan per provider
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_quantile = hedge_quantile
+        self.initial_deadline = initial_deadline
+        self.min_deadline = min_deadline
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._latencies = {
+            primary.name: deque(maxlen=window_size),
+            secondary.name: deque(maxlen=window_size)
+        }
+        self.last_provider = None
+        self.metrics = {
+            "requests": 0,
+            "hedged": 0,
+            "secondary_wins": 0,
+            "failovers": 0,
+            "cancelled": 0,
+            "failures": 0
+        }
+
+    def _record_latency(self, provider_name: str, latency: float):
+        with self._lock:
+            self._latencies[provider_name].append(latency)
+
+    def _inc(self, key: str):
+        with self._lock:
+            self.metrics[key] += 1
+
+    def hedge_deadline(self) -> float:
+        """
+        Menghitung deadline hedge dari kuantil latency token pertama primary
+
+        Returns:
+            Deadline dalam detik
+        """
+        with self._lock:
+            samples = sorted(self._latencies[self.primary.name])
+
+        if len(samples) < self.min_samples:
+            return self.initial_deadline
+
+        index = min(len(samples) - 1, int(self.hedge_quantile * len(samples)))
+        return max(self.min_deadline, samples[index])
+
+    def _start(self, provider, messages: List[Dict], events: queue.Queue,
+               usage: Dict) -> threading.Event:
+        """
+        Menjalankan satu attempt streaming di thread terpisah; usage provider diisi ke usage
+
+        Returns:
+            Event untuk membatalkan attempt
+        """
+        cancel = threading.Event()
+
+        def worker():
+            start_time = time.monotonic()
+            first = True
+            iterator = None
+            try:
+                iterator = provider.stream(messages, usage=usage)
+                for chunk in iterator:
+                    if first:
+                        self._record_latency(provider.name, time.monotonic() - start_time)
+                        first = False
+                    if cancel.is_set():
+                        break
+                    events.put((provider.name, "chunk", chunk))
+                events.put((provider.name, "done", None))
+            except Exception as e:
+                events.put((provider.name, "error", e))
+            finally:
+                close = getattr(iterator, "close", None)
+                if cancel.is_set() and close is not None:
+                    try:
+                        close()
+                    except Exception:
+                        pass
+
+        threading.Thread(target=worker, daemon=True).start()
+        return cancel
+
+    def stream(self, messages: List[Dict], result: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Streaming jawaban dari provider yang paling cepat mengirim token pertama
+
+        Args:
+            messages: List pesan format chat (role, content)
+            result: Dictionary yang diisi {provider, model, usage} milik pemenang (opsional)
+
+        Returns:
+            Iterator chunk teks dari provider pemenang
+
+        Raises:
+            Exception: Error terakhir jika kedua provider gagal
+        """
+        self._inc("requests")
+        result = result if result is not None else {}
+        events: queue.Queue = queue.Queue()
+        usages = {self.primary.name: {}, self.secondary.name: {}}
+        cancels = {self.primary.name: self._start(self.primary, messages, events,
+                                                  usages[self.primary.name])}
+        secondary_started = False
+        winner = None
+        last_error = None
+
+        deadline = time.monotonic() + self.hedge_deadline()
+
+        # Fase 1: tunggu token pertama dari salah satu provider
+        while winner is None:
+            timeout = None
+            if not secondary_started:
+                timeout = max(0.0, deadline - time.monotonic())
+
+            try:
+                name, kind, payload = events.get(timeout=timeout)
+            except queue.Empty:
+                # Primary melewati deadline p95: kirim hedged request
+                self._inc("hedged")
+                cancels[self.secondary.name] = self._start(self.secondary, messages, events,
+                                                           usages[self.secondary.name])
+                secondary_started = True
+                continue
+
+            if kind == "error":
+                last_error = payload
+                cancels.pop(name, None)
+                if not secondary_started:
+                    # Primary gagal sebelum token pertama: failover
+                    self._inc("failovers")
+                    cancels[self.secondary.name] = self._start(self.secondary, messages, events,
+                                                               usages[self.secondary.name])
+                    secondary_started = True
+                elif not cancels:
+                    self._inc("failures")
+                    raise last_error
+                continue
+
+            winner = name
+            first_chunk = payload if kind == "chunk" else None
+
+        # Batalkan provider yang kalah
+        for name, cancel in cancels.items():
+            if name != winner:
+                cancel.set()
+                self._inc("cancelled")
+
+        self.last_provider = winner
+        winner_provider = self.primary if winner == self.primary.name else self.secondary
+        # Usage diisi provider saat stream selesai; dictionary yang sama dibagikan
+        result.update({"provider": winner, "model": winner_provider.model,
+                       "usage": usages[winner]})
+        if winner == self.secondary.name:
+            self._inc("secondary_wins")
+
+        if first_chunk is not None:
+            yield first_chunk
+        if kind == "done":
+            return
+
+        # Fase 2: teruskan chunk dari pemenang saja
+        try:
+            while True:
+                name, kind, payload = events.get()
+                if name != winner:
+                    continue
+                if kind == "chunk":
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    raise payload
+        finally:
+            cancels[winner].set()
+
+    def generate(self, messages: List[Dict]) -> Tuple[str, Dict, str]:
+        """
+        Menghasilkan jawaban lengkap melalui jalur hedged streaming
+
+        Args:
+            messages: List pesan format chat (role, content)
+
+        Returns:
+            Tuple (teks jawaban, usage, model) dari provider pemenang
+        """
+        result = {}
+        text = "".join(self.stream(messages, result))
+        return text, result["usage"], result["model"]
+
+    def get_metrics(self) -> Dict:
+        """
+        Mendapatkan metrik hedging dan latency token pertama per provider
+
+        Returns:
+            Dictionary berisi metrik
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            latencies = {name: sorted(values) for name, values in self._latencies.items()}
+
+        metrics["hedge_deadline"] = round(self.hedge_deadline(), 3)
+        metrics["first_token_latency"] = {
+            name: {
+                "samples": len(values),
+                "p50": _quantile(values, 0.50),
+                "p95": _quantile(values, 0.95)
+            }
+            for name, values in latencies.items()
+        }
+        return metrics
+
+
+def _quantile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return round(sorted_values[index], 4)
+
+
+def benchmark_hedging(num_requests: int = 200, seed: int = 7) -> Dict:
+    """
+    Mengukur efek hedging pada tail latency dengan stand-in provider lokal
+
+    Primary memiliki latency rendah tapi 4% request mengalami lonjakan besar;
+    secondary sedikit lebih lambat namun stabil.
+
+    Args:
+        num_requests: Jumlah request simulasi
+        seed: Seed random
+
+    Returns:
+        Dictionary berisi p50/p95/p99 latency total dengan dan tanpa hedging
+    """
+    rng = random.Random(seed)
+
+    def primary_latency():
+        return rng.uniform(0.5, 1.5) if rng.random() < 0.04 else rng.uniform(0.02, 0.05)
+
+    def secondary_latency():
+        return rng.uniform(0.06, 0.09)
+
+    primary = StandInProvider("primary", primary_latency)
+    secondary = StandInProvider("secondary", secondary_latency)
+    messages = [{"role": "user", "content": "Bagaimana cara membuat rendang?"}]
+
+    def run(stream_fn) -> Dict:
+        durations = []
+        for _ in range(num_requests):
+            start_time = time.monotonic()
+            for _chunk in stream_fn(messages):
+                pass
+            durations.append(time.monotonic() - start_time)
+        durations.sort()
+        return {
+            "p50": _quantile(durations, 0.50),
+            "p95": _quantile(durations, 0.95),
+            "p99": _quantile(durations, 0.99)
+        }
+
+    baseline = run(primary.stream)
+    router = HedgedRouter(primary, secondary, initial_deadline=0.1, min_deadline=0.03)
+    hedged = run(router.stream)
+
+    return {
+        "without_hedging": baseline,
+        "with_hedging": hedged,
+        "router_metrics": router.get_metrics()
+    }
+
+
+if __name__ == "__main__":
+    # Benchmark hedging dengan stand-in provider
+    result = benchmark_hedging(num_requests=100)
+    print(f"Tanpa hedging : {result['without_hedging']}")
+    print(f"Dengan hedging: {result['with_hedging']}")
+    print(f"Metrik router : {result['router_metrics']}")
@@ -0,0 +1,252 @@
+"""
+Modul backend embedding ONNX Runtime
+Model sentence-transformers diekspor ke ONNX (opsional dikuantisasi dinamis int8) lalu
+dijalankan dengan ONNX Runtime di CPU. Saat serving hanya butuh onnxruntime, tokenizers,
+dan numpy (tanpa import PyTorch); pooling dan normalisasi mengikuti model aslinya
+sehingga embedding kompatibel dengan backend sentence-transformers.
+"""
+
+import os
+import json
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+CONFIG_FILE = "embedding_config.json"
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = False,
+                opset_version: int = 14) -> Dict:
+    """
+    Mengekspor model sentence-transformers ke ONNX (butuh torch dan sentence-transformers)
+
+    Args:
+        model_name: Nama model sentence-transformers
+        output_dir: Direktori hasil ekspor (model, tokenizer, konfigurasi pooling)
+        quantize: Buat juga model dengan kuantisasi dinamis int8 (bobot linear)
+        opset_version: Versi opset ONNX
+
+    Returns:
+        Konfigurasi embedding yang disimpan di output_dir
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["Cara membuat nasi goreng"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class _Encoder(torch.nn.Module):
+        # Mengembalikan last_hidden_state saja; pooling dikerjakan di numpy
+        def __init__(self, module):
+            super().__init__()
+            self.module = module
+
+        def forward(self, *inputs):
+            return self.module(**dict(zip(input_names, inputs)))[0]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(transformer),
+            tuple(sample[name] for name in input_names),
+            os.path.join(output_dir, MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset_version,
+            do_constant_folding=True
+        )
+    tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(os.path.join(output_dir, MODEL_FILE),
+                         os.path.join(output_dir, QUANTIZED_MODEL_FILE),
+                         weight_type=QuantType.QInt8)
+
+    # Pooling dan normalisasi disalin dari pipeline sentence-transformers
+    pooling = next((module for module in model if hasattr(module, "pooling_mode_mean_tokens")), None)
+    pooling_mode = "mean"
+    if pooling is not None and pooling.pooling_mode_cls_token:
+        pooling_mode = "cls"
+    elif pooling is not None and pooling.pooling_mode_max_tokens:
+        pooling_mode = "max"
+
+    config = {
+        "model_name": model_name,
+        "input_names": input_names,
+        "max_seq_length": model.max_seq_length,
+        "pooling": pooling_mode,
+        "normalize": any(type(module).__name__ == "Normalize" for module in model),
+        "dimension": model.get_sentence_embedding_dimension(),
+        "pad_token": tokenizer.pad_token,
+        "pad_id": tokenizer.pad_token_id,
+        "quantized": quantize
+    }
+    with open(os.path.join(output_dir, CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+class OnnxSentenceEncoder:
+    """
+    Encoder kalimat dengan ONNX Runtime
+
+    Bisa dipakai sebagai embedding function ChromaDB (dipanggil dengan list teks) dan
+    sebagai pengganti SentenceTransformer di RecipeEmbedding (method encode).
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, batch_size: int = 32,
+                 num_threads: Optional[int] = None):
+        """
+        Memuat model hasil export_onnx
+
+        Args:
+            model_dir: Direktori hasil export_onnx
+            quantized: Pakai model int8 (model_int8.onnx)
+            batch_size: Jumlah teks per forward pass
+            num_threads: Jumlah thread intra-op ONNX Runtime (default: semua core)
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime dan tokenizers belum terinstall. Install dengan: pip install onnxruntime tokenizers")
+
+        with open(os.path.join(model_dir, CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        if not os.path.exists(os.path.join(model_dir, model_file)):
+            raise FileNotFoundError(f"{model_file} tidak ditemukan di {model_dir}. Jalankan export_onnx.py terlebih dahulu.")
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(os.path.join(model_dir, model_file), options,
+                                                    providers=["CPUExecutionProvider"])
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_id"], pad_token=self.config["pad_token"])
+
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.batch_size = batch_size
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.config["input_names"]:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(["last_hidden_state"], feeds)[0]
+        if self.config["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        elif self.config["pooling"] == "max":
+            pooled = np.where(attention_mask[..., None] > 0, hidden, -1e9).max(axis=1)
+        else:
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+        if self.config["normalize"]:
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def encode(self, texts, batch_size: Optional[int] = None, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """
+        Menghasilkan embedding (antarmuka sama dengan SentenceTransformer.encode)
+
+        Args:
+            texts: Satu teks atau list teks
+            batch_size: Jumlah teks per forward pass (default self.batch_size)
+
+        Returns:
+            Array embedding (1 dimensi untuk satu teks)
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Teks dengan panjang serupa dibatch bersama agar padding minimal
+        batch_size = batch_size or self.batch_size
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            embeddings[batch] = self._encode_batch([texts[i] for i in batch])
+        return embeddings[0] if single else embeddings
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        # Antarmuka embedding function ChromaDB
+        return self.encode(list(input)).tolist()
+
+
+def compare_embeddings(reference: np.ndarray, candidate: np.ndarray) -> Dict:
+    """
+    Mengukur kompatibilitas numerik dua set embedding untuk teks yang sama
+
+    Returns:
+        Dictionary {max_abs_diff, mean_cosine, min_cosine}
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    cosine = np.einsum('ij,ij->i', reference, candidate) / np.maximum(
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1), 1e-12)
+    return {
+        "max_abs_diff": float(np.abs(reference - candidate).max()),
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min())
+    }
+
+
+def benchmark_encoder(encoder, queries: List[str], documents: List[str],
+                      batch_size: int = 32) -> Dict:
+    """
+    Latency query tunggal dan throughput batch sebuah encoder
+
+    Args:
+        encoder: Objek dengan method encode (SentenceTransformer atau OnnxSentenceEncoder)
+        queries: Query pendek (diukur satu per satu, seperti saat serving)
+        documents: Dokumen resep (diukur per batch, seperti saat ingest)
+        batch_size: Ukuran batch throughput
+
+    Returns:
+        Dictionary {latency_p50_ms, latency_p95_ms, throughput_per_sec}
+    """
+    encoder.encode(queries[:1])  # warm-up
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        encoder.encode([query])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    encoder.encode(documents, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "throughput_per_sec": round(len(documents) / max(elapsed, 1e-9), 1)
+    }
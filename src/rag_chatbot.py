@@ -3,20 +3,15 @@ Modul RAG (Retrieval-Augmented Generation)
 Menggabungkan retriever dan generator untuk menghasilkan jawaban
 """
 
-import os
-from typing import List, Dict, Optional
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from src.retriever import RecipeRetriever
+from src.records import SearchHit
+from src.intent_router import IntentRouter, IntentResult
+from src.templated_answers import render_lookup_answer
+from src.retrieval_session import RetrievalSession
+from src.llm_client import ResilientLLMClient
+from src.llm_router import GeminiProvider, OpenAIProvider, HedgedRouter
 
 
 class RAGChatbot:
@@ -29,7 +24,15 @@ class RAGChatbot:
                  model: str = "gemini-2.5-flash",
                  temperature: float = 0.7,
                  max_tokens: int = 4096,
-                 use_gemini: bool = True):
+                 use_gemini: bool = True,
+                 requests_per_minute: float = 60.0,
+                 request_timeout: Optional[float] = 60.0,
+                 max_retries: int = 3,
+                 enable_hedging: bool = False,
+                 secondary_model: Optional[str] = None,
+                 hedge_quantile: float = 0.95,
+                 enable_intent_routing: bool = False,
+                 enable_templated_answers: bool = False):
         """
         Inisialisasi RAG Chatbot
         
@@ -39,6 +42,17 @@ class RAGChatbot:
             temperature: Temperature untuk generation
             max_tokens: Maksimum token output
             use_gemini: True untuk Gemini (gratis), False untuk OpenAI
+            requests_per_minute: Kuota request per menit ke provider LLM
+            request_timeout: Batas waktu per panggilan LLM (detik)
+            max_retries: Jumlah percobaan ulang untuk error sementara (429, timeout)
+            enable_hedging: Kirim hedged request ke provider kedua jika provider
+                utama lambat, sekaligus failover jika provider utama gagal
+            secondary_model: Model untuk provider kedua (default sesuai provider)
+            hedge_quantile: Kuantil latency token pertama sebagai deadline hedge
+            enable_intent_routing: Klasifikasikan query dulu; pertanyaan umum dijawab
+                tanpa retrieval, nama resep dan bahan memakai lookup langsung
+            enable_templated_answers: Jawab pertanyaan lookup murni (bahan, langkah,
+                waktu, porsi) langsung dari field resep tanpa memanggil LLM
         """
         # Load environment variables
         load_dotenv()
@@ -48,23 +62,36 @@ class RAGChatbot:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.use_gemini = use_gemini
+        self.intent_router = (
+            IntentRouter(retriever.vector_store, retriever.ingredient_index)
+            if enable_intent_routing else None
+        )
+        self.enable_templated_answers = enable_templated_answers
         
-        # Initialize LLM client
-        if use_gemini:
-            if not GEMINI_AVAILABLE:
-                raise ValueError("Google Generative AI tidak terinstall. Jalankan: pip install google-generativeai")
-            api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY atau GOOGLE_API_KEY tidak ditemukan di environment variables")
-            genai.configure(api_key=api_key)
-            self.client = genai.GenerativeModel(model or 'gemini-2.5-flash')
-        else:
-            if not OPENAI_AVAILABLE:
-                raise ValueError("OpenAI tidak terinstall. Jalankan: pip install openai")
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise ValueError("OPENAI_API_KEY tidak ditemukan di environment variables")
-            self.client = OpenAI(api_key=api_key)
+        # Retry, rate limiting, timeout, dan circuit breaker untuk panggilan LLM
+        def make_llm_client():
+            return ResilientLLMClient(
+                requests_per_minute=requests_per_minute,
+                timeout=request_timeout,
+                max_retries=max_retries
+            )
+        
+        # Initialize LLM provider
+        primary_cls, secondary_cls = (GeminiProvider, OpenAIProvider) if use_gemini else (OpenAIProvider, GeminiProvider)
+        self.provider = primary_cls(model, temperature, max_tokens, make_llm_client())
+        self.client = self.provider.client
+        self.llm_client = self.provider.llm_client
+        
+        # Optional: hedged request + failover ke provider kedua
+        self.router = None
+        if enable_hedging:
+            default_secondary = "gpt-3.5-turbo" if use_gemini else "gemini-2.5-flash"
+            try:
+                secondary = secondary_cls(secondary_model or default_secondary, temperature,
+                                          max_tokens, make_llm_client())
+                self.router = HedgedRouter(self.provider, secondary, hedge_quantile=hedge_quantile)
+            except ValueError as e:
+                print(f"Hedging dinonaktifkan: {e}")
         
         # System prompt
         self.system_prompt = """Anda adalah asisten memasak ramah dan ahli bernama "Asisten Chef" yang membantu pengguna dengan masakan Indonesia.
@@ -98,11 +125,15 @@ Ingat: Anda bukan hanya robot pencari resep, tapi teman memasak yang membantu!""
         
         Args:
             query: Pertanyaan pengguna
-            context: Context dari dokumen yang diambil
+            context: Context dari dokumen yang diambil (None = pertanyaan umum tanpa retrieval)
             
         Returns:
             Prompt yang terstruktur
         """
+        # Pertanyaan umum tanpa retrieval: system prompt sudah cukup sebagai instruksi
+        if context is None:
+            return query
+        
         if context and "Tidak ada resep yang relevan" not in context:
             prompt = f"""Konteks Resep yang Relevan:
 {context}
@@ -159,57 +190,19 @@ Instruksi:
         messages.append({"role": "user", "content": user_prompt})
         
         try:
-            if self.use_gemini:
-                # Call Gemini API
-                # Combine messages into single prompt for Gemini
-                full_prompt = ""
-                for msg in messages:
-                    if msg["role"] == "system":
-                        full_prompt += f"{msg['content']}\n\n"
-                    elif msg["role"] == "user":
-                        full_prompt += f"{msg['content']}\n"
-                
-                generation_config = genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
-                )
-                
-                response = self.client.generate_content(
-                    full_prompt,
-                    generation_config=generation_config,
-                    stream=False  # Set False for now, streaming handled at app level
-                )
-                
-                assistant_message = response.text
-                
-                return {
-                    "success": True,
-                    "response": assistant_message,
-                    "model": self.model,
-                    "usage": {}
-                }
+            if self.router is not None:
+                # Hedged: provider yang paling cepat mengirim token pertama menang
+                assistant_message, usage, model = self.router.generate(messages)
             else:
-                # Call OpenAI API
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens
-                )
-                
-                # Extract response
-                assistant_message = response.choices[0].message.content
-                
-                return {
-                    "success": True,
-                    "response": assistant_message,
-                    "model": self.model,
-                    "usage": {
-                        "prompt_tokens": response.usage.prompt_tokens,
-                        "completion_tokens": response.usage.completion_tokens,
-                        "total_tokens": response.usage.total_tokens
-                    }
-                }
+                assistant_message, usage = self.provider.generate(messages)
+                model = self.model
+            
+            return {
+                "success": True,
+                "response": assistant_message,
+                "model": model,
+                "usage": usage
+            }
             
         except Exception as e:
             return {
@@ -222,31 +215,117 @@ Instruksi:
         """Generate streaming response for better UX"""
         user_prompt = self.create_prompt(query, context)
         
-        full_prompt = f"{self.system_prompt}\n\n{user_prompt}"
-        
-        generation_config = genai.types.GenerationConfig(
-            temperature=self.temperature,
-            max_output_tokens=self.max_tokens,
-        )
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
         
         try:
-            response = self.client.generate_content(
-                full_prompt,
-                generation_config=generation_config,
-                stream=True
-            )
-            
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
+            source = self.router if self.router is not None else self.provider
+            for chunk in source.stream(messages):
+                yield chunk
                     
         except Exception as e:
             yield f"Error: {str(e)}"
     
+    def retrieve_for_query(self, query: str, top_k: int = 3,
+                           filters: Optional[Dict] = None,
+                           category: Optional[str] = None,
+                           session: Optional[RetrievalSession] = None) -> Tuple[IntentResult, List[SearchHit]]:
+        """
+        Menentukan jalur retrieval untuk query lalu mengambil dokumennya
+        
+        Args:
+            query: Pertanyaan pengguna
+            top_k: Jumlah dokumen yang diambil
+            filters: Filter range waktu/porsi/kesulitan (semua jalur retrieval)
+            category: Kategori dari tombol kategori (rekomendasi yang dihitung di muka)
+            session: State retrieval sesi chat; pertanyaan lanjutan memakai ulang
+                dokumen giliran sebelumnya (intent "follow_up")
+            
+        Returns:
+            Tuple (intent, dokumen); intent "general" tidak mengambil dokumen
+        """
+        if session is None:
+            return self._route_and_retrieve(query, top_k, filters, category)
+        
+        if not category and session.is_follow_up(query, self.intent_router):
+            docs = session.get_documents(self.retriever.vector_store)
+            if docs:
+                session.stats["reused"] += 1
+                return IntentResult("follow_up", source="session"), docs
+        
+        route, docs = self._route_and_retrieve(query, top_k, filters, category)
+        session.remember(docs)
+        return route, docs
+    
+    def _route_and_retrieve(self, query: str, top_k: int, filters: Optional[Dict],
+                            category: Optional[str]) -> Tuple[IntentResult, List[SearchHit]]:
+        if category:
+            route = IntentResult("category")
+            return route, self.retriever.retrieve_category_recommendations(category, top_k=top_k,
+                                                                           **(filters or {}))
+        
+        route = self.intent_router.classify(query) if self.intent_router is not None else IntentResult("semantic")
+        
+        if route.intent == "general":
+            return route, []
+        if route.intent == "name_lookup":
+            # Filter waktu/porsi/kesulitan tetap berlaku untuk resep yang disebut namanya
+            where = self.retriever.build_filter(**(filters or {}))
+            docs = self.retriever.vector_store.get_by_ids(route.recipe_ids, where=where)[:top_k]
+            if docs:
+                return route, docs
+            route = IntentResult("semantic", source="fallback")
+        if route.intent == "ingredient_lookup":
+            docs = self.retriever.retrieve_by_ingredients(route.ingredients, top_k=top_k, **(filters or {}))
+            if docs:
+                return route, docs
+            route = IntentResult("semantic", source="fallback")
+        
+        if self.retriever.adaptive_top_k:
+            docs, route.retrieval_stats = self.retriever.retrieve_adaptive_with_stats(
+                query, top_k=top_k, **(filters or {}))
+            return route, docs
+        if self.retriever.rerank:
+            return route, self.retriever.retrieve_reranked(query, top_k=top_k, **(filters or {}))
+        return route, self.retriever.retrieve(query, top_k=top_k, **(filters or {}))
+    
+    def build_context(self, route: IntentResult, retrieved_docs: List[SearchHit],
+                      query: Optional[str] = None) -> Optional[str]:
+        """
+        Membuat context untuk LLM sesuai intent (None untuk pertanyaan umum);
+        dengan query, context dikompresi ke baris yang relevan jika diaktifkan
+        """
+        if route.intent == "general":
+            return None
+        return self.retriever.format_context(retrieved_docs, query=query)
+    
+    def render_templated_answer(self, query: str, route: IntentResult,
+                                retrieved_docs: List[SearchHit]) -> Optional[str]:
+        """
+        Jawaban templat tanpa LLM untuk intent lookup yang yakin
+        
+        Args:
+            query: Pertanyaan pengguna
+            route: Intent hasil retrieve_for_query
+            retrieved_docs: Dokumen hasil retrieve_for_query
+            
+        Returns:
+            Jawaban markdown, atau None jika perlu dijawab LLM
+        """
+        if not self.enable_templated_answers:
+            return None
+        return render_lookup_answer(query, route, retrieved_docs)
+    
     def chat(self, query: str, 
              top_k: int = 3,
              conversation_history: Optional[List[Dict]] = None,
-             include_sources: bool = True) -> Dict:
+             include_sources: bool = True,
+             filters: Optional[Dict] = None,
+             category: Optional[str] = None,
+             elaborate: bool = False,
+             session: Optional[RetrievalSession] = None) -> Dict:
         """
         Fungsi utama untuk chat dengan RAG
         
@@ -255,44 +334,51 @@ Instruksi:
             top_k: Jumlah dokumen yang diambil
             conversation_history: Riwayat percakapan
             include_sources: Include sumber resep dalam response
+            filters: Filter range waktu/porsi/kesulitan (lihat RecipeRetriever.build_filter)
+            category: Jika diisi, context diambil dari rekomendasi kategori yang
+                dihitung di muka (tanpa embedding query atau vector search)
+            elaborate: Paksa jawaban LLM walaupun tersedia jawaban templat
+            session: State retrieval sesi chat untuk pertanyaan lanjutan
             
         Returns:
-            Dictionary berisi respons lengkap
+            Dictionary berisi respons lengkap ("mode" = "template" jika tanpa LLM)
         """
-        # Step 1: Retrieval
-        retrieved_docs = self.retriever.retrieve(query, top_k=top_k)
+        # Step 1: Routing + retrieval
+        route, retrieved_docs = self.retrieve_for_query(query, top_k=top_k, filters=filters,
+                                                        category=category, session=session)
         
         # Get retrieval summary
         retrieval_summary = self.retriever.get_retrieval_summary(retrieved_docs)
         
-        # Step 2: Format context
-        context = self.retriever.format_context(retrieved_docs)
-        
-        # Step 3: Generation
-        generation_result = self.generate_response(query, context, conversation_history)
+        # Step 2: Lookup murni dijawab dari field resep, atau format context untuk LLM
+        templated = None if elaborate else self.render_templated_answer(query, route, retrieved_docs)
+        if templated is not None:
+            generation_result = {"success": True, "response": templated, "mode": "template"}
+        else:
+            context = self.build_context(route, retrieved_docs, query=query)
+            
+            # Step 3: Generation
+            generation_result = self.generate_response(query, context, conversation_history)
         
         # Prepare final response
         response = {
             "query": query,
             "response": generation_result["response"],
             "success": generation_result["success"],
+            "intent": route.intent,
+            "mode": generation_result.get("mode", "rag"),
             "retrieval": {
                 "total_retrieved": retrieval_summary["total_retrieved"],
                 "recipes": retrieval_summary["recipes"],
                 "categories": retrieval_summary["categories"]
             }
         }
+        if route.retrieval_stats is not None:
+            response["retrieval"]["dropped"] = route.retrieval_stats["dropped"]
         
         # Add sources if requested
         if include_sources and retrieved_docs:
-            response["sources"] = [
-                {
-                    "nama": doc["metadata"]["nama"],
-                    "kategori": doc["metadata"].get("kategori", ""),
-                    "similarity": 1 / (1 + doc["distance"]) if doc.get("distance") else None
-                }
-                for doc in retrieved_docs
-            ]
+            response["sources"] = [doc.to_source() for doc in retrieved_docs]
         
         # Add usage info if available
         if "usage" in generation_result:
@@ -304,6 +390,18 @@ Instruksi:
         
         return response
     
+    def get_llm_metrics(self) -> Dict:
+        """
+        Mendapatkan metrik panggilan LLM (retry, rate limit, timeout, circuit breaker)
+        
+        Returns:
+            Dictionary berisi metrik
+        """
+        metrics = self.llm_client.get_metrics()
+        if self.router is not None:
+            metrics["hedging"] = self.router.get_metrics()
+        return metrics
+    
     def chat_without_rag(self, query: str,
                         conversation_history: Optional[List[Dict]] = None) -> Dict:
         """
@@ -324,16 +422,11 @@ Instruksi:
         messages.append({"role": "user", "content": query})
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+            assistant_message, _usage = self.provider.generate(messages)
             
             return {
                 "success": True,
-                "response": response.choices[0].message.content,
+                "response": assistant_message,
                 "mode": "without_rag"
             }
             
@@ -0,0 +1,308 @@
+"""
+Modul record resep yang ringkas
+Representasi resep dan hasil pencarian berbasis __slots__ (tanpa __dict__ per objek),
+dengan kategori dan tingkat kesulitan yang di-intern. Tetap mendukung akses
+gaya dictionary (record['nama'], record.get('kategori')) agar kompatibel
+dengan kode yang sebelumnya memakai dict.
+"""
+
+import sys
+from typing import Callable, Dict, Optional, Tuple, Any
+
+
+def _intern(value: Optional[str]) -> str:
+    # Kategori dan tingkat kesulitan hanya punya sedikit nilai unik
+    return sys.intern(value) if value else ""
+
+
+def _export(value: Any) -> Any:
+    # Nilai field dalam bentuk JSON-friendly (tuple -> list, record -> dict)
+    if isinstance(value, _SlotRecord):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_export(item) for item in value]
+    return value
+
+
+def _freeze(value: Any) -> Any:
+    # Bentuk hashable dari hasil to_dict
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class _SlotRecord:
+    """
+    Basis record dengan akses gaya dictionary di atas __slots__
+    """
+
+    __slots__ = ()
+
+    @property
+    def _fields(self) -> Tuple[str, ...]:
+        # Field publik record (subclass dengan slot tambahan bisa menimpanya)
+        return self.__slots__
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields and getattr(self, key, None) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self._fields else None
+        return default if value is None else value
+
+    def keys(self):
+        return [key for key in self._fields if getattr(self, key, None) is not None]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, _SlotRecord):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Konsisten dengan __eq__; jangan ubah record selama dipakai sebagai key
+        return hash((type(self).__name__, _freeze(self.to_dict())))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """
+        Dictionary semua field publik (subclass boleh menghilangkan field kosong)
+        """
+        return {key: _export(getattr(self, key, None)) for key in self._fields}
+
+
+class Recipe(_SlotRecord):
+    """
+    Resep yang sudah diproses
+    """
+
+    __slots__ = ('nama', 'kategori', 'porsi', 'waktu_masak', 'tingkat_kesulitan',
+                 'bahan', 'langkah', 'tips', 'waktu_menit', 'jumlah_porsi', 'level_kesulitan')
+
+    def __init__(self, nama: str = "", kategori: str = "", porsi: str = "",
+                 waktu_masak: str = "", tingkat_kesulitan: str = "",
+                 bahan: Tuple[str, ...] = (), langkah: Tuple[str, ...] = (), tips: str = "",
+                 waktu_menit: Optional[int] = None, jumlah_porsi: Optional[int] = None,
+                 level_kesulitan: Optional[int] = None):
+        self.nama = nama
+        self.kategori = _intern(kategori)
+        self.porsi = porsi
+        self.waktu_masak = waktu_masak
+        self.tingkat_kesulitan = _intern(tingkat_kesulitan)
+        self.bahan = tuple(bahan)
+        self.langkah = tuple(langkah)
+        self.tips = tips
+        self.waktu_menit = waktu_menit
+        self.jumlah_porsi = jumlah_porsi
+        self.level_kesulitan = level_kesulitan
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Recipe":
+        """
+        Membuat Recipe dari dictionary hasil process_recipe
+        """
+        return cls(
+            nama=data.get('nama', ''),
+            kategori=data.get('kategori', ''),
+            porsi=data.get('porsi', ''),
+            waktu_masak=data.get('waktu_masak', ''),
+            tingkat_kesulitan=data.get('tingkat_kesulitan', ''),
+            bahan=data.get('bahan', ()),
+            langkah=data.get('langkah', ()),
+            tips=data.get('tips', ''),
+            waktu_menit=data.get('waktu_menit'),
+            jumlah_porsi=data.get('jumlah_porsi'),
+            level_kesulitan=data.get('level_kesulitan')
+        )
+
+
+class RecipeMetadata(_SlotRecord):
+    """
+    Metadata resep yang disimpan di vector store
+    """
+
+    __slots__ = ('nama', 'kategori', 'porsi', 'waktu_masak', 'tingkat_kesulitan', 'nama_lain',
+                 'waktu_menit', 'jumlah_porsi', 'level_kesulitan')
+
+    def __init__(self, nama: str = "", kategori: str = "", porsi: str = "",
+                 waktu_masak: str = "", tingkat_kesulitan: str = "", nama_lain: Optional[str] = None,
+                 waktu_menit: Optional[int] = None, jumlah_porsi: Optional[int] = None,
+                 level_kesulitan: Optional[int] = None):
+        self.nama = nama
+        self.kategori = _intern(kategori)
+        self.porsi = porsi
+        self.waktu_masak = waktu_masak
+        self.tingkat_kesulitan = _intern(tingkat_kesulitan)
+        self.nama_lain = nama_lain or None
+        self.waktu_menit = waktu_menit
+        self.jumlah_porsi = jumlah_porsi
+        self.level_kesulitan = level_kesulitan
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RecipeMetadata":
+        """
+        Membuat RecipeMetadata dari metadata ChromaDB (field lain diabaikan)
+        """
+        return cls(
+            nama=data.get('nama', ''),
+            kategori=data.get('kategori', ''),
+            porsi=data.get('porsi', ''),
+            waktu_masak=data.get('waktu_masak', ''),
+            tingkat_kesulitan=data.get('tingkat_kesulitan', ''),
+            nama_lain=data.get('nama_lain'),
+            waktu_menit=data.get('waktu_menit'),
+            jumlah_porsi=data.get('jumlah_porsi'),
+            level_kesulitan=data.get('level_kesulitan')
+        )
+
+    def to_dict(self) -> Dict:
+        data = {
+            'nama': self.nama,
+            'kategori': self.kategori,
+            'porsi': self.porsi,
+            'waktu_masak': self.waktu_masak,
+            'tingkat_kesulitan': self.tingkat_kesulitan
+        }
+        if self.nama_lain:
+            data['nama_lain'] = self.nama_lain
+        # ChromaDB tidak menerima None, jadi field numerik yang tidak dikenali dihilangkan
+        for field in ('waktu_menit', 'jumlah_porsi', 'level_kesulitan'):
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+
+class SearchHit(_SlotRecord):
+    """
+    Satu hasil pencarian dari vector store
+    """
+
+    __slots__ = ('id', 'document', 'metadata', 'distance', 'sections', 'similarity_score',
+                 'ingredient_match')
+
+    def __init__(self, id: str, document: str, metadata: RecipeMetadata,
+                 distance: Optional[float] = None, sections: Optional[Tuple[str, ...]] = None,
+                 similarity_score: Optional[float] = None, ingredient_match: Optional[Dict] = None):
+        self.id = id
+        self.document = document
+        self.metadata = metadata
+        self.distance = distance
+        self.sections = sections
+        self.similarity_score = similarity_score
+        self.ingredient_match = ingredient_match
+
+    @property
+    def similarity(self) -> Optional[float]:
+        """
+        Similarity 0-1 dari distance (semakin kecil distance, semakin mirip)
+        """
+        return 1 / (1 + self.distance) if self.distance else None
+
+    def to_source(self) -> Dict:
+        """
+        Ringkasan sumber resep untuk ditampilkan di UI
+        """
+        return {
+            "id": self.id,
+            "nama": self.metadata.nama,
+            "kategori": self.metadata.kategori,
+            "similarity": self.similarity
+        }
+
+    def to_dict(self) -> Dict:
+        data = {
+            "id": self.id,
+            "document": self.document,
+            "metadata": self.metadata.to_dict(),
+            "distance": self.distance
+        }
+        if self.sections is not None:
+            data["sections"] = list(self.sections)
+        if self.similarity_score is not None:
+            data["similarity_score"] = self.similarity_score
+        if self.ingredient_match is not None:
+            data["ingredient_match"] = self.ingredient_match
+        return data
+
+    def __hash__(self) -> int:
+        # Cukup id dan distance (subset dari __eq__), agar LazySearchHit tidak di-hydrate
+        return hash((type(self).__name__, self.id, self.distance))
+
+
+# Slot asli SearchHit, dipakai LazySearchHit untuk menyimpan hasil hydrate
+_DOCUMENT_SLOT = SearchHit.__dict__['document']
+_METADATA_SLOT = SearchHit.__dict__['metadata']
+
+
+class LazySearchHit(SearchHit):
+    """
+    Hasil pencarian yang hanya membawa id dan distance; dokumen dan metadata baru
+    dibaca (lewat loader, mis. DocumentStore) saat pertama diakses
+    """
+
+    __slots__ = ('_loader',)
+    _fields = SearchHit.__slots__
+
+    def __init__(self, id: str, loader: Callable[[str], Tuple[str, Dict]],
+                 distance: Optional[float] = None):
+        self.id = id
+        self.distance = distance
+        self.sections = None
+        self.similarity_score = None
+        self.ingredient_match = None
+        self._loader = loader
+
+    @property
+    def is_hydrated(self) -> bool:
+        """
+        True jika dokumen dan metadata sudah dibaca
+        """
+        return self._loader is None
+
+    def _hydrate(self):
+        document, metadata = self._loader(self.id)
+        _DOCUMENT_SLOT.__set__(self, document)
+        _METADATA_SLOT.__set__(self, RecipeMetadata.from_dict(metadata))
+        self._loader = None
+
+    @property
+    def document(self) -> str:
+        if self._loader is not None:
+            self._hydrate()
+        return _DOCUMENT_SLOT.__get__(self)
+
+    @document.setter
+    def document(self, value: str):
+        if self._loader is not None:
+            self._hydrate()
+        _DOCUMENT_SLOT.__set__(self, value)
+
+    @property
+    def metadata(self) -> RecipeMetadata:
+        if self._loader is not None:
+            self._hydrate()
+        return _METADATA_SLOT.__get__(self)
+
+    @metadata.setter
+    def metadata(self, value: RecipeMetadata):
+        if self._loader is not None:
+            self._hydrate()
+        _METADATA_SLOT.__set__(self, value)
@@ -0,0 +1,145 @@
+"""
+Modul rerank bertingkat (cascade) dengan budget waktu
+Pool kandidat dari retrieval dense dinilai ulang oleh cross-encoder CPU sebanyak yang
+muat dalam budget waktu per request; kandidat yang tidak sempat dinilai tetap
+memakai urutan tahap pertama.
+"""
+
+import time
+import importlib.util
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from src.records import SearchHit
+from src.context_compressor import normalize_line
+
+# Hanya dicek, tidak di-import: sentence_transformers memuat PyTorch, jadi CrossEncoder
+# baru di-import saat model pertama kali dipakai (RERANK=true)
+CROSS_ENCODER_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+
+class CascadeReranker:
+    """
+    Reranker cross-encoder dengan budget waktu dan cache skor per (query, resep)
+    """
+
+    def __init__(self, model_name: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
+                 time_budget_ms: float = 150.0, batch_size: int = 4,
+                 max_doc_chars: int = 600, cache_size: int = 4096):
+        """
+        Inisialisasi reranker (model dimuat saat pertama dipakai)
+
+        Args:
+            model_name: Nama model CrossEncoder (multilingual agar cocok untuk resep Indonesia)
+            time_budget_ms: Budget waktu rerank per request (milidetik)
+            batch_size: Jumlah pasangan (query, resep) per forward pass
+            max_doc_chars: Panjang maksimum teks resep yang dinilai (header dan bahan)
+            cache_size: Jumlah skor (query, resep) yang disimpan di cache LRU
+        """
+        if not CROSS_ENCODER_AVAILABLE:
+            raise ImportError("sentence-transformers dengan CrossEncoder belum terinstall")
+
+        self.model_name = model_name
+        self.time_budget_ms = time_budget_ms
+        self.batch_size = max(1, batch_size)
+        self.max_doc_chars = max_doc_chars
+        self.cache_size = cache_size
+        self._model = None
+        self._score_cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        # Estimasi waktu per pasangan (EMA), dipakai agar batch berikutnya tidak melewati budget
+        self._ms_per_pair: Optional[float] = None
+        self.stats = {"candidates": 0, "scored": 0, "cached": 0, "computed": 0,
+                      "budget_exhausted": False, "elapsed_ms": 0.0}
+
+    @property
+    def model(self):
+        """
+        Model CrossEncoder (dimuat saat pertama dipakai, di luar budget request)
+        """
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+            print(f"Memuat model reranker: {self.model_name}")
+            self._model = CrossEncoder(self.model_name, device="cpu")
+        return self._model
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[float]:
+        score = self._score_cache.get(key)
+        if score is not None:
+            self._score_cache.move_to_end(key)
+        return score
+
+    def _cache_put(self, key: Tuple[str, str], score: float):
+        self._score_cache[key] = score
+        if len(self._score_cache) > self.cache_size:
+            self._score_cache.popitem(last=False)
+
+    def _score_batch(self, query: str, batch: List[SearchHit]) -> List[float]:
+        pairs = [(query, hit.document[:self.max_doc_chars]) for hit in batch]
+        return [float(score) for score in self.model.predict(pairs, batch_size=len(pairs),
+                                                              show_progress_bar=False)]
+
+    def rerank(self, query: str, candidates: List[SearchHit],
+               time_budget_ms: Optional[float] = None) -> List[SearchHit]:
+        """
+        Mengurutkan ulang kandidat dalam budget waktu
+
+        Kandidat dinilai berurutan sesuai peringkat tahap pertama. Prefiks yang sudah
+        punya skor (dari cache atau dihitung) diurutkan menurut skor cross-encoder;
+        sisanya, jika budget habis, ditambahkan di belakang dengan urutan tahap pertama.
+
+        Args:
+            query: Query pencarian
+            candidates: Kandidat tahap pertama, terurut dari yang paling mirip
+            time_budget_ms: Override budget waktu request ini
+
+        Returns:
+            List kandidat yang sudah diurutkan ulang
+        """
+        budget = self.time_budget_ms if time_budget_ms is None else time_budget_ms
+        # Model dimuat sebelum timer dimulai agar cold start tidak menghabiskan budget
+        _ = self.model
+        start = time.perf_counter()
+        query_key = normalize_line(query)
+
+        scores: List[Optional[float]] = [self._cache_get((query_key, hit.id)) for hit in candidates]
+        cached = sum(score is not None for score in scores)
+        computed, exhausted = 0, False
+
+        i = 0
+        while i < len(candidates):
+            if scores[i] is not None:
+                i += 1
+                continue
+            # Batch berikutnya: kandidat tanpa skor mulai dari posisi i
+            batch_idx = [j for j in range(i, len(candidates)) if scores[j] is None][:self.batch_size]
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            predicted_ms = (self._ms_per_pair or 0.0) * len(batch_idx)
+            if elapsed_ms + predicted_ms > budget:
+                exhausted = True
+                break
+
+            batch_start = time.perf_counter()
+            batch_scores = self._score_batch(query, [candidates[j] for j in batch_idx])
+            batch_ms = (time.perf_counter() - batch_start) * 1000 / len(batch_idx)
+            self._ms_per_pair = batch_ms if self._ms_per_pair is None else 0.7 * self._ms_per_pair + 0.3 * batch_ms
+
+            for j, score in zip(batch_idx, batch_scores):
+                scores[j] = score
+                self._cache_put((query_key, candidates[j].id), score)
+            computed += len(batch_idx)
+
+        # Prefiks terpanjang yang seluruhnya punya skor
+        prefix = 0
+        while prefix < len(candidates) and scores[prefix] is not None:
+            prefix += 1
+        order = sorted(range(prefix), key=lambda j: scores[j], reverse=True)
+        reranked = [candidates[j] for j in order] + candidates[prefix:]
+
+        self.stats = {
+            "candidates": len(candidates),
+            "scored": prefix,
+            "cached": cached,
+            "computed": computed,
+            "budget_exhausted": exhausted,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        return reranked
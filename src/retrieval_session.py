@@ -0,0 +1,99 @@
+"""
+Modul state retrieval per sesi chat
+Mengingat resep yang dipakai di giliran sebelumnya, sehingga pertanyaan lanjutan
+("kalau untuk 6 orang bagaimana?") memakai dokumen yang sama tanpa retrieval baru.
+"""
+
+import re
+from typing import List
+from src.records import SearchHit
+from src.intent_router import COOK_WHAT_PATTERN
+
+
+# Rujukan ke resep giliran sebelumnya: anafora ("itu", "tadi", "resep ini", "bahannya")
+# dan modifikasi resep ("untuk 6 orang", "lebih pedas", "kalau tanpa santan"). Kata
+# umum seperti "ini", "kalau", "lalu", atau "tanpa" saja tidak cukup.
+FOLLOW_UP_PATTERN = re.compile(
+    r'\b(itu|tersebut|tadi|(?:resep|masakan|hidangan) ini|'
+    r'(?:bahan|cara|langkah|bumbu|porsi|masak|rasa|waktu|resep)\w*nya|'
+    r'\d+\s*(?:orang|porsi)|lebih (?:pedas|manis|gurih|sehat|cepat|lama|banyak|sedikit)|'
+    r'(?:kalau|kalo|bisa) (?:tanpa|pakai|pake|diganti|ditambah)|diganti|ganti(?:nya)?)\b',
+    re.IGNORECASE
+)
+# Permintaan topik baru walaupun tanpa nama resep
+NEW_TOPIC_PATTERN = re.compile(
+    r'\b(rekomendasi(?:kan)?|menu|ide|selain|resep lain|masakan lain|yang lain)\b',
+    re.IGNORECASE
+)
+
+
+class RetrievalSession:
+    """
+    Dokumen retrieval giliran sebelumnya dalam satu sesi chat
+    """
+
+    def __init__(self):
+        """
+        Inisialisasi session kosong
+        """
+        self.documents: List[SearchHit] = []
+        self._pending_ids: List[str] = []
+        self.stats = {"reused": 0, "fresh": 0}
+
+    def __bool__(self) -> bool:
+        return bool(self.documents or self._pending_ids)
+
+    def remember(self, documents: List[SearchHit]):
+        """
+        Menyimpan dokumen yang dipakai untuk menjawab giliran ini
+        """
+        if documents:
+            self.documents = list(documents)
+            self._pending_ids = []
+            self.stats["fresh"] += 1
+
+    def remember_ids(self, ids: List[str]):
+        """
+        Menyimpan id resep saja (mis. jawaban dari answer cache); dokumen diambil saat dipakai
+        """
+        if ids:
+            self.documents = []
+            self._pending_ids = list(ids)
+
+    def get_documents(self, vector_store) -> List[SearchHit]:
+        """
+        Dokumen giliran sebelumnya (lookup by id jika baru tersimpan sebagai id)
+        """
+        if self._pending_ids:
+            self.documents = vector_store.get_by_ids(self._pending_ids)
+            self._pending_ids = []
+        return self.documents
+
+    def reset(self):
+        """
+        Menghapus state (chat baru)
+        """
+        self.documents = []
+        self._pending_ids = []
+
+    def is_follow_up(self, query: str, intent_router=None) -> bool:
+        """
+        Deteksi murah pertanyaan lanjutan: ada dokumen sebelumnya, tidak menyebut
+        nama resep atau bahan baru, dan memakai kata rujukan atau modifikasi resep.
+        Query pendek tanpa rujukan ("Resep ikan bakar", "Kue untuk lebaran") adalah
+        topik baru dan menjalankan retrieval baru.
+
+        Args:
+            query: Pertanyaan user
+            intent_router: IntentRouter untuk mencocokkan nama resep (opsional)
+
+        Returns:
+            True jika dokumen giliran sebelumnya sebaiknya dipakai ulang
+        """
+        if not self:
+            return False
+        if NEW_TOPIC_PATTERN.search(query) or COOK_WHAT_PATTERN.search(query):
+            return False
+        if intent_router is not None and intent_router.match_recipe_names(query):
+            return False
+        return FOLLOW_UP_PATTERN.search(query) is not None
@@ -2,8 +2,17 @@
 Modul Retriever untuk mengambil informasi relevan dari vector store
 """
 
-from typing import List, Dict, Optional
-from src.vector_store import RecipeVectorStore
+import os
+from typing import List, Dict, Optional, Tuple, Union
+from src.vector_store import RecipeVectorStore, combine_filters
+from src.category_index import CategoryPartitionIndex
+from src.ingredient_index import IngredientIndex, split_ingredients
+from src.category_recommendations import CategoryRecommendations
+from src.context_compressor import ContextCompressor, LineVectorCache
+from src.adaptive_retrieval import DEFAULT_MIN_ZSCORE, distance_to_similarity, select_adaptive
+from src.reranker import CascadeReranker, CROSS_ENCODER_AVAILABLE
+from src.records import SearchHit
+from src.data_processor import parse_difficulty
 
 
 class RecipeRetriever:
@@ -11,37 +20,268 @@ class RecipeRetriever:
     Kelas untuk melakukan retrieval dokumen resep dari vector store
     """
     
-    def __init__(self, vector_store: RecipeVectorStore, top_k: int = 3):
+    def __init__(self, vector_store: RecipeVectorStore, top_k: int = 3,
+                 use_sections: bool = False, use_category_partitions: bool = False,
+                 exact_threshold: int = 500, compress_context: bool = False,
+                 context_token_budget: int = 600, factor_shared_lines: bool = True,
+                 adaptive_top_k: bool = False, candidate_pool_size: int = 10,
+                 min_zscore: float = DEFAULT_MIN_ZSCORE, rerank: bool = False, rerank_model: Optional[str] = None,
+                 rerank_budget_ms: float = 150.0):
         """
         Inisialisasi retriever
         
         Args:
             vector_store: Instance RecipeVectorStore
             top_k: Jumlah dokumen yang diambil
+            use_sections: Cari per section (header/bahan/langkah/tips) lalu
+                agregasi ke resep induk, jika section collection tersedia
+            use_category_partitions: retrieve_by_category memakai sub-index per kategori
+                (exact untuk kategori kecil, ANN untuk kategori besar)
+            exact_threshold: Batas jumlah resep kategori yang dicari secara exact
+            compress_context: format_context dengan query hanya membawa baris yang
+                paling relevan (butuh cache vektor baris dari setup_database.py)
+            context_token_budget: Budget token context terkompresi
+            factor_shared_lines: Context terkompresi menulis baris yang sama di
+                beberapa resep sekali saja di bagian bersama
+            adaptive_top_k: Jalur semantic memakai retrieve_adaptive (top_k menjadi
+                batas atas, resep yang kurang relevan dibuang)
+            candidate_pool_size: Jumlah kandidat yang dinilai retrieve_adaptive
+                dan retrieve_reranked
+            min_zscore: Threshold z-score retrieve_adaptive terhadap background pool
+                (nilai tetap, lihat adaptive_retrieval.DEFAULT_MIN_ZSCORE)
+            rerank: Pool kandidat diurutkan ulang oleh cross-encoder dalam budget
+                waktu (butuh sentence-transformers CrossEncoder)
+            rerank_model: Nama model CrossEncoder (default lihat CascadeReranker)
+            rerank_budget_ms: Budget waktu rerank per request (milidetik)
         """
         self.vector_store = vector_store
         self.top_k = top_k
+        self.use_sections = use_sections
+        self.category_index = (
+            CategoryPartitionIndex(vector_store, exact_threshold=exact_threshold)
+            if use_category_partitions else None
+        )
+        self._ingredient_index: Optional[IngredientIndex] = None
+        self._category_recommendations: Optional[CategoryRecommendations] = None
+        self.compress_context = compress_context
+        self.context_token_budget = context_token_budget
+        self.factor_shared_lines = factor_shared_lines
+        self._context_compressor: Optional[ContextCompressor] = None
+        self.adaptive_top_k = adaptive_top_k
+        self.candidate_pool_size = candidate_pool_size
+        self.min_zscore = min_zscore
+        self.rerank = rerank
+        self.rerank_model = rerank_model
+        self.rerank_budget_ms = rerank_budget_ms
+        self._reranker: Optional[CascadeReranker] = None
     
-    def retrieve(self, query: str, top_k: Optional[int] = None) -> List[Dict]:
+    @property
+    def ingredient_index(self) -> Optional[IngredientIndex]:
+        """
+        Inverted index bahan (dimuat saat pertama dipakai, None jika belum dibangun)
+        """
+        if self._ingredient_index is None:
+            path = IngredientIndex.default_path(self.vector_store)
+            if os.path.exists(path):
+                self._ingredient_index = IngredientIndex.load(path)
+        return self._ingredient_index
+    
+    @property
+    def category_recommendations(self) -> Optional[CategoryRecommendations]:
+        """
+        Daftar rekomendasi per kategori (dimuat saat pertama dipakai, None jika belum dibangun)
+        """
+        if self._category_recommendations is None:
+            path = CategoryRecommendations.default_path(self.vector_store)
+            if os.path.exists(path):
+                self._category_recommendations = CategoryRecommendations.load(path)
+        return self._category_recommendations
+    
+    @property
+    def context_compressor(self) -> Optional[ContextCompressor]:
+        """
+        Compressor context (dimuat saat pertama dipakai, None jika nonaktif atau
+        cache vektor baris belum dibangun)
+        """
+        if self.compress_context and self._context_compressor is None:
+            path = LineVectorCache.default_path(self.vector_store)
+            if os.path.exists(path):
+                self._context_compressor = ContextCompressor(
+                    self.vector_store, LineVectorCache.load(path),
+                    token_budget=self.context_token_budget,
+                    factor_shared_lines=self.factor_shared_lines
+                )
+        return self._context_compressor
+    
+    @property
+    def reranker(self) -> Optional[CascadeReranker]:
+        """
+        Reranker cross-encoder (dibuat saat pertama dipakai, None jika nonaktif atau
+        CrossEncoder tidak tersedia)
+        """
+        if self.rerank and self._reranker is None and CROSS_ENCODER_AVAILABLE:
+            kwargs = {"model_name": self.rerank_model} if self.rerank_model else {}
+            self._reranker = CascadeReranker(time_budget_ms=self.rerank_budget_ms, **kwargs)
+        return self._reranker
+    
+    @staticmethod
+    def build_filter(min_minutes: Optional[int] = None,
+                     max_minutes: Optional[int] = None,
+                     min_servings: Optional[int] = None,
+                     max_servings: Optional[int] = None,
+                     min_difficulty: Optional[Union[int, str]] = None,
+                     max_difficulty: Optional[Union[int, str]] = None) -> Optional[Dict]:
+        """
+        Membuat filter where ChromaDB untuk range waktu, porsi, dan tingkat kesulitan
+        
+        Args:
+            min_minutes: Waktu memasak minimum (menit)
+            max_minutes: Waktu memasak maksimum (menit)
+            min_servings: Jumlah porsi minimum
+            max_servings: Jumlah porsi maksimum
+            min_difficulty: Tingkat kesulitan minimum ("Mudah"/"Sedang"/"Sulit" atau 1-3)
+            max_difficulty: Tingkat kesulitan maksimum ("Mudah"/"Sedang"/"Sulit" atau 1-3)
+            
+        Returns:
+            Filter where, atau None jika tidak ada batasan
+        """
+        def level(value):
+            if value is None or isinstance(value, int):
+                return value
+            parsed = parse_difficulty(value)
+            if parsed is None:
+                raise ValueError(f"Tingkat kesulitan tidak dikenal: {value}")
+            return parsed
+        
+        conditions = []
+        for field, operator, value in (
+                ("waktu_menit", "$gte", min_minutes),
+                ("waktu_menit", "$lte", max_minutes),
+                ("jumlah_porsi", "$gte", min_servings),
+                ("jumlah_porsi", "$lte", max_servings),
+                ("level_kesulitan", "$gte", level(min_difficulty)),
+                ("level_kesulitan", "$lte", level(max_difficulty))):
+            if value is not None:
+                conditions.append({field: {operator: value}})
+        
+        return combine_filters(*conditions)
+    
+    def retrieve(self, query: str, top_k: Optional[int] = None, **filters) -> List[SearchHit]:
         """
         Mengambil dokumen relevan berdasarkan query
         
         Args:
             query: Query pencarian
             top_k: Override jumlah dokumen (opsional)
+            filters: Filter range (min_minutes, max_minutes, min_servings, max_servings,
+                min_difficulty, max_difficulty), lihat build_filter
             
         Returns:
             List dokumen relevan
         """
         k = top_k if top_k is not None else self.top_k
+        where = self.build_filter(**filters)
         
-        # Search di vector store
-        search_results = self.vector_store.search(query, top_k=k)
+        # Search di vector store (filter diterapkan di index, bukan setelah retrieval)
+        if self.use_sections and self.vector_store.has_sections():
+            search_results = self.vector_store.search_sections(query, top_k=k, where=where)
+        else:
+            search_results = self.vector_store.search(query, top_k=k, where=where)
         
         return search_results['results']
     
+    def retrieve_adaptive(self, query: str, top_k: Optional[int] = None,
+                          pool_size: Optional[int] = None, min_relative: float = 0.5,
+                          gap_fraction: float = 0.35, **filters) -> List[SearchHit]:
+        """
+        Mengambil pool kandidat lalu hanya mempertahankan resep yang jelas relevan
+        (lihat adaptive_retrieval.select_adaptive); statistik lihat
+        retrieve_adaptive_with_stats
+        
+        Args:
+            query: Query pencarian
+            top_k: Batas atas jumlah dokumen (default self.top_k)
+            pool_size: Jumlah kandidat yang dinilai (default candidate_pool_size)
+            min_relative: Minimum relevansi relatif terhadap kandidat terbaik
+            gap_fraction: Lompatan skor yang memotong daftar
+            filters: Filter range, lihat build_filter
+            
+        Returns:
+            List dokumen relevan (similarity_score terisi)
+        """
+        kept, _stats = self.retrieve_adaptive_with_stats(query, top_k=top_k, pool_size=pool_size,
+                                                         min_relative=min_relative,
+                                                         gap_fraction=gap_fraction, **filters)
+        return kept
+    
+    def retrieve_adaptive_with_stats(self, query: str, top_k: Optional[int] = None,
+                                     pool_size: Optional[int] = None, min_relative: float = 0.5,
+                                     gap_fraction: float = 0.35,
+                                     **filters) -> Tuple[List[SearchHit], Dict]:
+        """
+        Sama dengan retrieve_adaptive, statistik dikembalikan bersama dokumen
+        (bukan atribut retriever) sehingga aman dipakai beberapa thread sekaligus
+        
+        Args:
+            query: Query pencarian
+            top_k: Batas atas jumlah dokumen (default self.top_k)
+            pool_size: Jumlah kandidat yang dinilai (default candidate_pool_size)
+            min_relative: Minimum relevansi relatif terhadap kandidat terbaik
+            gap_fraction: Lompatan skor yang memotong daftar
+            filters: Filter range, lihat build_filter
+            
+        Returns:
+            Tuple (dokumen relevan, statistik candidates/kept/dropped/reason)
+        """
+        k = top_k if top_k is not None else self.top_k
+        pool = max(pool_size or self.candidate_pool_size, k)
+        candidates = self.retrieve(query, top_k=pool, **filters)
+        
+        similarities = distance_to_similarity([hit.distance for hit in candidates])
+        selection = select_adaptive(similarities, k, self.min_zscore,
+                                    min_relative=min_relative, gap_fraction=gap_fraction)
+        for hit, similarity in zip(candidates, similarities):
+            hit.similarity_score = float(similarity)
+        # Distribusi skor dense menentukan berapa resep; reranker menentukan resep yang mana
+        if self.reranker is not None:
+            candidates = self.reranker.rerank(query, candidates)
+        kept = candidates[:selection["keep"]]
+        
+        stats = {
+            "candidates": len(candidates),
+            "kept": len(kept),
+            # Dibandingkan dengan top_k tetap
+            "dropped": min(k, len(candidates)) - len(kept),
+            "reason": selection["reason"]
+        }
+        return kept, stats
+    
+    def retrieve_reranked(self, query: str, top_k: Optional[int] = None,
+                          pool_size: Optional[int] = None, **filters) -> List[SearchHit]:
+        """
+        Cascade retrieve-then-rerank: pool kandidat dense diurutkan ulang oleh
+        cross-encoder dalam budget waktu (lihat reranker.CascadeReranker), lalu top_k
+        teratas diambil; tanpa reranker sama dengan retrieve
+        
+        Args:
+            query: Query pencarian
+            top_k: Jumlah dokumen (default self.top_k)
+            pool_size: Jumlah kandidat tahap pertama (default candidate_pool_size)
+            filters: Filter range, lihat build_filter
+            
+        Returns:
+            List dokumen relevan
+        """
+        k = top_k if top_k is not None else self.top_k
+        if self.reranker is None:
+            return self.retrieve(query, top_k=k, **filters)
+        
+        pool = max(pool_size or self.candidate_pool_size, k)
+        candidates = self.retrieve(query, top_k=pool, **filters)
+        return self.reranker.rerank(query, candidates)[:k]
+    
     def retrieve_with_scores(self, query: str, top_k: Optional[int] = None, 
-                            min_score: float = 0.0) -> List[Dict]:
+                            min_score: float = 0.0, **filters) -> List[SearchHit]:
         """
         Mengambil dokumen dengan filtering berdasarkan score
         
@@ -49,29 +289,30 @@ class RecipeRetriever:
             query: Query pencarian
             top_k: Override jumlah dokumen
             min_score: Minimum similarity score (threshold)
+            filters: Filter range, lihat build_filter
             
         Returns:
             List dokumen yang memenuhi threshold
         """
-        results = self.retrieve(query, top_k)
+        results = self.retrieve(query, top_k, **filters)
         
         # Filter berdasarkan score (distance yang lebih kecil = similarity lebih tinggi)
         # Untuk Chroma, distance adalah L2 distance, jadi kita filter yang distance-nya kecil
         filtered_results = []
         for result in results:
-            if result['distance'] is not None:
+            if result.distance is not None:
                 # Convert distance to similarity score (0-1 range)
                 # Semakin kecil distance, semakin tinggi similarity
-                similarity = 1 / (1 + result['distance'])
+                similarity = 1 / (1 + result.distance)
                 
                 if similarity >= min_score:
-                    result['similarity_score'] = similarity
+                    result.similarity_score = similarity
                     filtered_results.append(result)
         
         return filtered_results
     
     def retrieve_by_category(self, query: str, category: str, 
-                            top_k: Optional[int] = None) -> List[Dict]:
+                            top_k: Optional[int] = None, **filters) -> List[SearchHit]:
         """
         Mengambil dokumen dengan filter kategori
         
@@ -79,19 +320,109 @@ class RecipeRetriever:
             query: Query pencarian
             category: Kategori resep
             top_k: Override jumlah dokumen
+            filters: Filter range, lihat build_filter
             
         Returns:
             List dokumen dari kategori tertentu
         """
         k = top_k if top_k is not None else self.top_k
+        where = self.build_filter(**filters)
         
-        search_results = self.vector_store.search_by_category(query, category, top_k=k)
+        if self.category_index is not None:
+            search_results = self.category_index.search(query, category, top_k=k, where=where)
+        else:
+            search_results = self.vector_store.search_by_category(query, category, top_k=k, where=where)
         
         return search_results['results']
     
-    def format_context(self, retrieved_docs: List[Dict], 
+    def retrieve_by_ingredients(self, ingredients: Union[str, List[str]],
+                                top_k: Optional[int] = None,
+                                max_missing: Optional[int] = None,
+                                require_all: bool = False,
+                                **filters) -> List[SearchHit]:
+        """
+        Mengambil resep berdasarkan bahan yang dimiliki user (inverted index, tanpa embedding)
+        
+        Args:
+            ingredients: List bahan atau string ("ayam, tempe dan cabai")
+            top_k: Override jumlah dokumen
+            max_missing: Maksimum bahan resep yang belum dimiliki user
+            require_all: Hanya resep yang memakai semua bahan user
+            filters: Filter range (min_minutes, max_minutes, ...), lihat build_filter
+            
+        Returns:
+            List dokumen terurut dari bahan user terpakai terbanyak lalu bahan kurang
+            tersedikit; detail ada di atribut ingredient_match
+        """
+        index = self.ingredient_index
+        if index is None:
+            print("Ingredient index belum dibangun. Jalankan setup_database.py terlebih dahulu.")
+            return []
+        
+        if isinstance(ingredients, str):
+            ingredients = split_ingredients(ingredients)
+        else:
+            ingredients = [term for item in ingredients for term in split_ingredients(item)]
+        
+        k = top_k if top_k is not None else self.top_k
+        where = self.build_filter(**filters)
+        # Dengan filter, seluruh ranking diambil dulu lalu dipotong setelah difilter
+        ranked = index.rank_by_coverage(ingredients, len(index) if where else k,
+                                        max_missing=max_missing, require_all=require_all)
+        
+        matches = {match["id"]: match for match in ranked}
+        docs = self.vector_store.get_by_ids(list(matches), where=where)[:k]
+        for doc in docs:
+            match = matches[doc.id]
+            doc.similarity_score = match["coverage"]
+            doc.ingredient_match = {"matched": match["matched"], "missing_count": match["missing_count"]}
+        return docs
+    
+    def retrieve_category_recommendations(self, category: str,
+                                          top_k: Optional[int] = None, **filters) -> List[SearchHit]:
+        """
+        Mengambil rekomendasi resep sebuah kategori dari daftar yang dihitung saat ingest
+        (tanpa embedding query; fallback ke pencarian per kategori jika daftar belum ada
+        atau tidak ada rekomendasi yang lolos filter)
+        
+        Args:
+            category: Nama kategori
+            top_k: Override jumlah dokumen
+            filters: Filter range, lihat build_filter
+            
+        Returns:
+            List resep rekomendasi dari kategori tersebut
+        """
+        k = top_k if top_k is not None else self.top_k
+        where = self.build_filter(**filters)
+        recommendations = self.category_recommendations
+        if recommendations is not None and category in recommendations:
+            # Dengan filter, seluruh daftar kategori disaring dulu lalu dipotong
+            ids = recommendations.get(category, top_k=len(recommendations.recommendations[category]) if where else k)
+            docs = self.vector_store.get_by_ids(ids, where=where)[:k]
+            if docs or not where:
+                return docs
+        
+        return self.retrieve_by_category(category, category, top_k=k, **filters)
+    
+    def retrieve_related(self, recipe_id: str, top_k: Optional[int] = None) -> List[SearchHit]:
+        """
+        Mengambil resep serupa dari graph kNN yang dihitung saat ingest (tanpa model)
+        
+        Args:
+            recipe_id: Id dokumen resep
+            top_k: Override jumlah dokumen
+            
+        Returns:
+            List resep serupa, terurut dari yang paling mirip
+        """
+        k = top_k if top_k is not None else self.top_k
+        return self.vector_store.get_related_recipes(recipe_id, top_k=k)
+    
+    def format_context(self, retrieved_docs: List[SearchHit], 
                        include_metadata: bool = True,
-                       max_context_length: int = 3000) -> str:
+                       max_context_length: int = 3000,
+                       query: Optional[str] = None) -> str:
         """
         Memformat dokumen yang diambil menjadi context string
         untuk diberikan ke LLM (dengan optimasi panjang)
@@ -100,6 +431,8 @@ class RecipeRetriever:
             retrieved_docs: List dokumen hasil retrieval
             include_metadata: Include metadata dalam context
             max_context_length: Maximum characters untuk context (default 3000)
+            query: Pertanyaan pengguna; jika compress_context aktif, hanya baris
+                yang paling relevan dengan query yang dibawa (budget token)
             
         Returns:
             String context yang terformat dan optimized
@@ -107,6 +440,9 @@ class RecipeRetriever:
         if not retrieved_docs:
             return "Tidak ada resep yang relevan ditemukan."
         
+        if query and self.context_compressor is not None:
+            return self.context_compressor.format_context(query, retrieved_docs)
+        
         context_parts = []
         context_parts.append("Berikut adalah resep-resep yang relevan:\n")
         
@@ -115,39 +451,39 @@ class RecipeRetriever:
         for i, doc in enumerate(retrieved_docs, 1):
             # Start building this recipe section
             recipe_parts = []
-            recipe_parts.append(f"\n=== Resep {i}: {doc['metadata']['nama']} ===")
+            recipe_parts.append(f"\n=== Resep {i}: {doc.metadata.nama} ===")
             
             if include_metadata:
-                metadata = doc['metadata']
-                if metadata.get('kategori'):
-                    recipe_parts.append(f"Kategori: {metadata['kategori']}")
-                if metadata.get('porsi'):
-                    recipe_parts.append(f"Porsi: {metadata['porsi']}")
-                if metadata.get('waktu_masak'):
-                    recipe_parts.append(f"Waktu Memasak: {metadata['waktu_masak']}")
-                if metadata.get('tingkat_kesulitan'):
-                    recipe_parts.append(f"Tingkat Kesulitan: {metadata['tingkat_kesulitan']}")
+                metadata = doc.metadata
+                if metadata.kategori:
+                    recipe_parts.append(f"Kategori: {metadata.kategori}")
+                if metadata.porsi:
+                    recipe_parts.append(f"Porsi: {metadata.porsi}")
+                if metadata.waktu_masak:
+                    recipe_parts.append(f"Waktu Memasak: {metadata.waktu_masak}")
+                if metadata.tingkat_kesulitan:
+                    recipe_parts.append(f"Tingkat Kesulitan: {metadata.tingkat_kesulitan}")
             
             # Truncate document if too long (keep first 800 chars)
-            doc_content = doc['document']
+            doc_content = doc.document
             if len(doc_content) > 800:
-                doc_content = doc_content[:800] + "\\n...(dipotong untuk efisiensi)"
+                doc_content = doc_content[:800] + "\n...(dipotong untuk efisiensi)"
             
-            recipe_parts.append(f"\\n{doc_content}")
+            recipe_parts.append(f"\n{doc_content}")
             
-            recipe_text = "\\n".join(recipe_parts)
+            recipe_text = "\n".join(recipe_parts)
             
             # Check if adding this recipe exceeds limit
             if total_length + len(recipe_text) > max_context_length:
-                context_parts.append(f"\\n(Resep lainnya tidak ditampilkan untuk efisiensi)")
+                context_parts.append(f"\n(Resep lainnya tidak ditampilkan untuk efisiensi)")
                 break
             
             context_parts.append(recipe_text)
             total_length += len(recipe_text)
         
-        return "\\n".join(context_parts)
+        return "\n".join(context_parts)
     
-    def get_retrieval_summary(self, retrieved_docs: List[Dict]) -> Dict:
+    def get_retrieval_summary(self, retrieved_docs: List[SearchHit]) -> Dict:
         """
         Membuat summary dari hasil retrieval
         
@@ -164,9 +500,9 @@ class RecipeRetriever:
                 "categories": []
             }
         
-        recipes = [doc['metadata']['nama'] for doc in retrieved_docs]
-        categories = list(set([doc['metadata'].get('kategori', '') 
-                              for doc in retrieved_docs if doc['metadata'].get('kategori')]))
+        recipes = [doc.metadata.nama for doc in retrieved_docs]
+        categories = list(set([doc.metadata.kategori
+                              for doc in retrieved_docs if doc.metadata.kategori]))
         
         return {
             "total_retrieved": len(retrieved_docs),
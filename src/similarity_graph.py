@@ -0,0 +1,178 @@
+"""
+Modul graph k-nearest-neighbour antar resep
+Tetangga terdekat setiap resep dihitung saat ingest dan disimpan ke disk, sehingga
+rekomendasi "resep serupa" cukup berupa lookup O(k) tanpa embedding query.
+"""
+
+import os
+import json
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+
+def _squared_l2(queries: np.ndarray, base: np.ndarray, base_norms: np.ndarray) -> np.ndarray:
+    # Squared L2 (metrik default collection ChromaDB)
+    query_norms = np.einsum('ij,ij->i', queries, queries)
+    distances = query_norms[:, None] - 2 * queries @ base.T + base_norms[None, :]
+    return np.maximum(distances, 0.0)
+
+
+class SimilarRecipeGraph:
+    """
+    Graph kNN resep: {id resep: [(id tetangga, distance), ...]} terurut dari yang terdekat
+    """
+
+    def __init__(self, k: int = 5, block_size: int = 1024):
+        """
+        Inisialisasi graph
+
+        Args:
+            k: Jumlah tetangga per resep
+            block_size: Jumlah baris per blok perhitungan jarak (membatasi memori)
+        """
+        self.k = k
+        self.block_size = block_size
+        self.neighbors: Dict[str, List[Tuple[str, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.neighbors)
+
+    def __contains__(self, recipe_id: str) -> bool:
+        return recipe_id in self.neighbors
+
+    def _compute(self, query_rows: np.ndarray, ids: List[str],
+                 embeddings: np.ndarray) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Menghitung kNN penuh untuk baris tertentu terhadap semua resep
+        """
+        results = {}
+        if len(ids) < 2:
+            return {ids[row]: [] for row in query_rows}
+
+        base_norms = np.einsum('ij,ij->i', embeddings, embeddings)
+        k = min(self.k, len(ids) - 1)
+
+        for start in range(0, len(query_rows), self.block_size):
+            rows = query_rows[start:start + self.block_size]
+            distances = _squared_l2(embeddings[rows], embeddings, base_norms)
+            distances[np.arange(len(rows)), rows] = np.inf
+
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            for i, row in enumerate(rows):
+                candidates = nearest[i][np.argsort(distances[i, nearest[i]])]
+                results[ids[row]] = [(ids[col], float(distances[i, col])) for col in candidates]
+        return results
+
+    def build(self, ids: List[str], embeddings: np.ndarray):
+        """
+        Membangun ulang graph untuk semua resep
+
+        Args:
+            ids: Id resep
+            embeddings: Matriks embedding (urutan sama dengan ids)
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.neighbors = self._compute(np.arange(len(ids)), list(ids), embeddings)
+
+    def update(self, ids: List[str], embeddings: np.ndarray) -> Dict:
+        """
+        Memperbarui graph secara inkremental terhadap isi collection saat ini
+
+        Resep baru dihitung penuh; resep lama hanya membandingkan diri dengan resep
+        baru; resep yang tetangganya terhapus dihitung ulang. Resep yang isinya
+        berubah tanpa ganti id tidak terdeteksi (gunakan build).
+
+        Args:
+            ids: Semua id resep di collection
+            embeddings: Matriks embedding (urutan sama dengan ids)
+
+        Returns:
+            Dictionary statistik {added, removed, recomputed}
+        """
+        ids = list(ids)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        positions = {recipe_id: row for row, recipe_id in enumerate(ids)}
+
+        removed = [recipe_id for recipe_id in self.neighbors if recipe_id not in positions]
+        for recipe_id in removed:
+            del self.neighbors[recipe_id]
+        removed_set = set(removed)
+
+        new_rows = [row for row, recipe_id in enumerate(ids) if recipe_id not in self.neighbors]
+        dirty_rows = [
+            positions[recipe_id] for recipe_id, neighbors in self.neighbors.items()
+            if any(neighbor_id in removed_set for neighbor_id, _ in neighbors)
+            or len(neighbors) < min(self.k, len(ids) - 1)
+        ]
+        recompute_rows = np.array(sorted(set(new_rows) | set(dirty_rows)), dtype=np.int64)
+        self.neighbors.update(self._compute(recompute_rows, ids, embeddings))
+
+        # Resep lama yang tidak dihitung ulang: cek apakah resep baru lebih dekat
+        recomputed = set(recompute_rows.tolist())
+        existing_rows = np.array([row for row in range(len(ids)) if row not in recomputed], dtype=np.int64)
+        if new_rows and len(existing_rows):
+            new_matrix = embeddings[new_rows]
+            new_norms = np.einsum('ij,ij->i', new_matrix, new_matrix)
+            for start in range(0, len(existing_rows), self.block_size):
+                rows = existing_rows[start:start + self.block_size]
+                distances = _squared_l2(embeddings[rows], new_matrix, new_norms)
+                for i, row in enumerate(rows):
+                    current = self.neighbors[ids[row]]
+                    worst = current[-1][1] if len(current) >= self.k else np.inf
+                    closer = np.flatnonzero(distances[i] < worst)
+                    if closer.size:
+                        current = current + [(ids[new_rows[j]], float(distances[i, j])) for j in closer]
+                        self.neighbors[ids[row]] = sorted(current, key=lambda item: item[1])[:self.k]
+
+        return {"added": len(new_rows), "removed": len(removed), "recomputed": len(dirty_rows)}
+
+    def related(self, recipe_id: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Tetangga terdekat sebuah resep (lookup O(k), tanpa model)
+
+        Args:
+            recipe_id: Id resep
+            k: Jumlah tetangga (maksimum k graph)
+
+        Returns:
+            List (id resep, distance) terurut dari yang paling mirip
+        """
+        neighbors = self.neighbors.get(recipe_id, [])
+        return neighbors if k is None else neighbors[:k]
+
+    def save(self, path: str):
+        """
+        Menyimpan graph ke file JSON (atomik)
+
+        Args:
+            path: Path file graph
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"k": self.k, "neighbors": self.neighbors}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarRecipeGraph":
+        """
+        Memuat graph dari file JSON
+
+        Args:
+            path: Path file graph
+
+        Returns:
+            Instance SimilarRecipeGraph
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        graph = cls(k=data["k"])
+        graph.neighbors = {
+            recipe_id: [(neighbor_id, distance) for neighbor_id, distance in neighbors]
+            for recipe_id, neighbors in data["neighbors"].items()
+        }
+        return graph
@@ -0,0 +1,109 @@
+"""
+Modul jawaban templat tanpa LLM
+Pertanyaan lookup murni ("apa bahan-bahan soto ayam?", "berapa lama masak rendang?")
+dijawab langsung dari field resep yang terstruktur dalam hitungan milidetik.
+"""
+
+import re
+from typing import List, Optional
+from src.records import SearchHit
+from src.data_processor import parse_recipe_document
+
+
+# Field resep yang ditanyakan (urutan = prioritas jika beberapa cocok)
+FIELD_PATTERNS = [
+    ("waktu", re.compile(r'\b(berapa lama|lama masak|waktu (?:masak|memasak)|berapa menit|berapa jam)\b', re.IGNORECASE)),
+    ("porsi", re.compile(r'\b(berapa porsi|untuk berapa orang|porsinya|jumlah porsi)\b', re.IGNORECASE)),
+    ("kesulitan", re.compile(r'\b(susah|sulit|gampang|mudah|tingkat kesulitan)\b', re.IGNORECASE)),
+    ("bahan", re.compile(r'\b(bahan(?:-bahan)?(?:nya)?|butuh apa saja|perlu apa saja|pakai apa(?: saja)?)\b', re.IGNORECASE)),
+    ("langkah", re.compile(r'\b(cara (?:membuat|bikin|buat|masak|memasak)|langkah(?:-langkah)?(?:nya)?|resep)\b', re.IGNORECASE)),
+    ("tips", re.compile(r'\b(tips?|rahasia|trik)\b', re.IGNORECASE)),
+]
+
+
+def detect_fields(query: str) -> List[str]:
+    """
+    Mendeteksi field resep yang ditanyakan
+
+    Args:
+        query: Pertanyaan user
+
+    Returns:
+        List field ("waktu", "porsi", "kesulitan", "bahan", "langkah", "tips")
+    """
+    return [field for field, pattern in FIELD_PATTERNS if pattern.search(query)]
+
+
+def _render_recipe_fields(doc: SearchHit, fields: List[str]) -> str:
+    metadata = doc.metadata
+    parsed = parse_recipe_document(doc.document)
+    parts = []
+
+    for field in fields:
+        if field == "waktu" and metadata.waktu_masak:
+            parts.append(f"Waktu memasak **{metadata.nama}** sekitar **{metadata.waktu_masak}** ⏱️")
+        elif field == "porsi" and metadata.porsi:
+            parts.append(f"Resep **{metadata.nama}** ini untuk **{metadata.porsi}** 🍽️")
+        elif field == "kesulitan" and metadata.tingkat_kesulitan:
+            parts.append(f"Tingkat kesulitan **{metadata.nama}**: **{metadata.tingkat_kesulitan}**")
+        elif field == "bahan" and parsed["bahan"]:
+            lines = "\n".join(f"- {item}" for item in parsed["bahan"])
+            parts.append(f"Bahan-bahan untuk **{metadata.nama}**"
+                         f"{f' ({metadata.porsi})' if metadata.porsi else ''}:\n\n{lines}")
+        elif field == "langkah" and parsed["langkah"]:
+            lines = "\n".join(parsed["langkah"])
+            parts.append(f"Cara membuat **{metadata.nama}**:\n\n{lines}")
+        elif field == "tips" and parsed["tips"]:
+            parts.append(f"Tips untuk **{metadata.nama}**: {parsed['tips']} 💡")
+
+    return "\n\n".join(parts)
+
+
+def render_lookup_answer(query: str, route, docs: List[SearchHit],
+                         min_confidence: float = 0.75) -> Optional[str]:
+    """
+    Membuat jawaban templat untuk intent lookup yang yakin
+
+    Args:
+        query: Pertanyaan user
+        route: IntentResult dari IntentRouter
+        docs: Dokumen hasil retrieve_for_query
+        min_confidence: Minimum confidence lookup nama resep jika beberapa resep cocok
+            (nama yang disebut sebagian tapi hanya cocok ke satu resep selalu dianggap yakin)
+
+    Returns:
+        Jawaban markdown, atau None jika pertanyaan perlu dijawab LLM
+    """
+    if not docs:
+        return None
+
+    # Lanjutan ("bahannya apa saja?") merujuk resep utama giliran sebelumnya
+    if route.intent in ("name_lookup", "follow_up"):
+        fields = detect_fields(query)
+        # "rendang" hanya cocok ke Rendang Ayam: coverage nama 0.63 tapi tidak ambigu
+        unambiguous = route.intent == "name_lookup" and len(route.recipe_ids) == 1
+        if not fields or (route.confidence < min_confidence and not unambiguous):
+            return None
+        body = _render_recipe_fields(docs[0], fields)
+        if not body:
+            return None
+        if route.intent == "name_lookup" and len(docs) > 1:
+            others = ", ".join(doc.metadata.nama for doc in docs[1:])
+            body += f"\n\nResep lain dengan nama serupa: {others}"
+        return f"{body}\n\nMau saya jelaskan lebih detail atau kasih tips tambahan? 😊"
+
+    if route.intent == "ingredient_lookup":
+        lines = []
+        for i, doc in enumerate(docs, 1):
+            match = doc.ingredient_match or {}
+            missing = match.get("missing_count", 0)
+            note = "semua bahan utama sudah ada" if missing == 0 else f"kurang {missing} bahan lagi"
+            if match.get("matched"):
+                note = f"pakai {', '.join(match['matched'])}; {note}"
+            details = ", ".join(filter(None, [doc.metadata.waktu_masak, doc.metadata.tingkat_kesulitan]))
+            lines.append(f"{i}. **{doc.metadata.nama}** ({note}{'; ' + details if details else ''})")
+        ingredients = ", ".join(route.ingredients)
+        return (f"Dengan bahan **{ingredients}**, kamu bisa masak:\n\n" + "\n".join(lines) +
+                "\n\nMau lihat bahan atau cara membuat salah satunya? 😊")
+
+    return None
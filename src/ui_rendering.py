@@ -0,0 +1,131 @@
+"""
+Modul helper rendering untuk Streamlit
+Streaming jawaban dengan update yang di-throttle dan tampilan riwayat chat berjendela
+"""
+
+import time
+from typing import List, Dict, Tuple
+
+
+class StreamRenderer:
+    """
+    Renderer streaming yang menggabungkan chunk dan hanya me-render bagian yang berubah
+
+    Paragraf yang sudah selesai ditulis ke elemen markdown sendiri dan tidak
+    di-render ulang; hanya paragraf terakhir yang masih tumbuh yang di-update,
+    dan update itu sendiri dibatasi per interval waktu atau jumlah karakter.
+    """
+
+    CURSOR = "▌"
+
+    def __init__(self, container, min_interval: float = 0.08, min_chars: int = 80):
+        """
+        Inisialisasi renderer
+
+        Args:
+            container: Container Streamlit (mis. hasil st.container())
+            min_interval: Jeda minimum (detik) antar update tampilan
+            min_chars: Jumlah karakter baru yang memaksa update sebelum interval habis
+        """
+        self.container = container
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+
+        self._parts: List[str] = []
+        self._tail = ""
+        self._pending_chars = 0
+        self._last_flush = 0.0
+        self._placeholder = None
+        self.render_count = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def _current_placeholder(self):
+        if self._placeholder is None:
+            self._placeholder = self.container.empty()
+        return self._placeholder
+
+    def _commit_finished_paragraphs(self):
+        """
+        Memindahkan paragraf yang sudah lengkap ke elemen tersendiri
+        """
+        while True:
+            split_at = self._tail.find("\n\n")
+            if split_at < 0:
+                return
+
+            paragraph = self._tail[:split_at]
+            # Jangan memecah di dalam blok kode yang belum ditutup
+            if paragraph.count("```") % 2 == 1:
+                closing = self._tail.find("```", paragraph.rfind("```") + 3)
+                if closing < 0:
+                    return
+                split_at = self._tail.find("\n\n", closing)
+                if split_at < 0:
+                    return
+                paragraph = self._tail[:split_at]
+
+            self._current_placeholder().markdown(paragraph)
+            self.render_count += 1
+            self._placeholder = None
+            self._tail = self._tail[split_at + 2:]
+
+    def write(self, chunk: str):
+        """
+        Menambahkan chunk baru; tampilan di-update jika cadence terpenuhi
+
+        Args:
+            chunk: Potongan teks dari LLM
+        """
+        if not chunk:
+            return
+
+        self._parts.append(chunk)
+        self._tail += chunk
+        self._pending_chars += len(chunk)
+
+        now = time.monotonic()
+        if now - self._last_flush >= self.min_interval or self._pending_chars >= self.min_chars:
+            self._flush(now, cursor=True)
+
+    def _flush(self, now: float, cursor: bool):
+        self._commit_finished_paragraphs()
+        if self._tail or cursor:
+            self._current_placeholder().markdown(self._tail + (self.CURSOR if cursor else ""))
+            self.render_count += 1
+        elif self._placeholder is not None:
+            # Render akhir tanpa sisa teks: hapus placeholder yang masih berisi cursor
+            self._placeholder.empty()
+            self._placeholder = None
+        self._pending_chars = 0
+        self._last_flush = now
+
+    def close(self) -> str:
+        """
+        Render akhir tanpa cursor
+
+        Returns:
+            Teks jawaban lengkap
+        """
+        self._flush(time.monotonic(), cursor=False)
+        return self.text
+
+
+def window_messages(messages: List[Dict], visible_count: int) -> Tuple[int, List[Dict]]:
+    """
+    Mengambil jendela pesan terakhir dari riwayat chat
+
+    Args:
+        messages: Seluruh riwayat chat
+        visible_count: Jumlah pesan terakhir yang ditampilkan
+
+    Returns:
+        Tuple (jumlah pesan tersembunyi, list pesan yang ditampilkan)
+    """
+    if visible_count <= 0 or len(messages) <= visible_count:
+        return 0, messages
+
+    hidden = len(messages) - visible_count
+    return hidden, messages[hidden:]
@@ -0,0 +1,305 @@
+"""
+Modul kompresi vektor embedding resep
+Reduksi dimensi (PCA atau truncation gaya Matryoshka) yang di-fit pada corpus, lalu
+kuantisasi skalar float16/int8 untuk index tahap pertama di memori. Kandidat teratas
+dinilai ulang dengan vektor full precision sehingga distance tetap sama dengan ChromaDB.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+
+
+REDUCTION_METHODS = ("none", "pca", "truncate")
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+# Setting default benchmark: (metode reduksi, dimensi, kuantisasi)
+DEFAULT_SETTINGS = [
+    ("none", None, "float16"),
+    ("none", None, "int8"),
+    ("pca", 384, "float16"),
+    ("pca", 256, "int8"),
+    ("pca", 128, "int8"),
+    ("truncate", 256, "int8"),
+]
+
+
+def fit_projection(embeddings: np.ndarray, method: str = "pca",
+                   dims: Optional[int] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Fit reduksi dimensi pada embedding corpus
+
+    Args:
+        embeddings: Matriks embedding corpus (n x d)
+        method: "none", "pca" (komponen utama, terpusat), atau "truncate"
+            (ambil dims dimensi pertama, untuk model yang dilatih gaya Matryoshka)
+        dims: Jumlah dimensi hasil (default: tanpa reduksi)
+
+    Returns:
+        Tuple (mean, komponen d x dims); komponen None berarti truncation/tanpa reduksi
+    """
+    if method not in REDUCTION_METHODS:
+        raise ValueError(f"Metode reduksi tidak dikenal: {method}")
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    dimension = embeddings.shape[1]
+    dims = min(dims or dimension, dimension)
+
+    if method != "pca" or len(embeddings) == 0:
+        return np.zeros(dimension, dtype=np.float32), None
+
+    mean = embeddings.mean(axis=0)
+    # Komponen utama dari SVD data terpusat; jumlah komponen dibatasi rank data
+    _, _, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+    return mean.astype(np.float32), vt[:dims].T.astype(np.float32)
+
+
+class CompressedVectorIndex:
+    """
+    Index brute-force di memori atas vektor tereduksi dan terkuantisasi
+
+    Distance tahap pertama adalah squared L2 di ruang tereduksi (pendekatan dari
+    squared L2 ChromaDB); urutan akhir ditentukan rescoring full precision.
+    """
+
+    def __init__(self, ids: List[str], method: str, dims: int, quantization: str,
+                 mean: np.ndarray, components: Optional[np.ndarray], codes: np.ndarray,
+                 scales: Optional[np.ndarray] = None):
+        self.ids = list(ids)
+        self.method = method
+        self.dims = dims
+        self.quantization = quantization
+        self.mean = mean
+        self.components = components
+        self.codes = codes
+        self.scales = scales
+        # Norm kuadrat vektor hasil dekuantisasi, dihitung sekali
+        self.squared_norms = np.concatenate([
+            np.einsum('ij,ij->i', block, block) for block in self._dequantized_blocks()
+        ]) if len(self.ids) else np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: List[str], embeddings: np.ndarray, method: str = "pca",
+              dims: Optional[int] = 256, quantization: str = "int8") -> "CompressedVectorIndex":
+        """
+        Fit reduksi dimensi dan kuantisasi pada embedding corpus
+
+        Args:
+            ids: Id dokumen (urutan sama dengan embeddings)
+            embeddings: Embedding full precision (n x d)
+            method: Metode reduksi ("none", "pca", "truncate")
+            dims: Jumlah dimensi hasil reduksi
+            quantization: "float32", "float16", atau "int8" (skala simetris per dimensi)
+
+        Returns:
+            Instance CompressedVectorIndex
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Kuantisasi tidak dikenal: {quantization}")
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if method == "none":
+            dims = embeddings.shape[1]
+        mean, components = fit_projection(embeddings, method, dims)
+        dims = components.shape[1] if components is not None else min(dims or embeddings.shape[1],
+                                                                       embeddings.shape[1])
+        reduced = cls._project(embeddings, mean, components, dims)
+
+        scales = None
+        if quantization == "int8":
+            scales = np.maximum(np.abs(reduced).max(axis=0, initial=0.0), 1e-12).astype(np.float32) / 127.0
+            codes = np.clip(np.rint(reduced / scales), -127, 127).astype(np.int8)
+        else:
+            codes = reduced.astype(quantization)
+        return cls(ids, method, dims, quantization, mean, components, codes, scales)
+
+    @staticmethod
+    def _project(vectors: np.ndarray, mean: np.ndarray, components: Optional[np.ndarray],
+                 dims: int) -> np.ndarray:
+        if components is not None:
+            return (vectors - mean) @ components
+        return vectors[:, :dims]
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Memproyeksikan vektor full precision ke ruang tereduksi (float32)
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return self._project(vectors, self.mean, self.components, self.dims)
+
+    def _dequantized_blocks(self, block_size: int = 4096):
+        # Dekuantisasi per blok agar memori sementara tetap kecil
+        for start in range(0, len(self.ids), block_size):
+            block = self.codes[start:start + block_size].astype(np.float32)
+            if self.scales is not None:
+                block *= self.scales
+            yield block
+
+    def search(self, query_embedding: np.ndarray, top_k: int,
+               allowed_ids: Optional[Set[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Mencari kandidat terdekat di ruang terkompresi
+
+        Args:
+            query_embedding: Embedding query full precision
+            top_k: Jumlah kandidat
+            allowed_ids: Hanya id ini yang boleh menjadi kandidat (hasil filter where)
+
+        Returns:
+            Tuple (id kandidat, distance perkiraan), terurut dari yang terdekat
+        """
+        if not self.ids or top_k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+
+        query = self.transform(query_embedding)[0]
+        dots = np.concatenate([block @ query for block in self._dequantized_blocks()])
+        distances = self.squared_norms - 2 * dots + float(query @ query)
+
+        k = min(top_k, len(self.ids))
+        if allowed_ids is not None:
+            mask = np.fromiter((doc_id in allowed_ids for doc_id in self.ids), dtype=bool, count=len(self.ids))
+            distances = np.where(mask, distances, np.inf)
+            k = min(k, int(mask.sum()))
+            if k == 0:
+                return [], np.zeros(0, dtype=np.float32)
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [self.ids[i] for i in top], np.maximum(distances[top], 0.0)
+
+    def memory_bytes(self) -> int:
+        """
+        Ukuran array index di memori (kode vektor, skala, norm, dan proyeksi)
+        """
+        arrays = [self.codes, self.squared_norms, self.mean]
+        arrays += [array for array in (self.scales, self.components) if array is not None]
+        return int(sum(array.nbytes for array in arrays))
+
+    def save(self, path: str):
+        """
+        Menyimpan index ke file .npz (atomik)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        arrays = {"ids": np.array(self.ids, dtype=str), "codes": self.codes, "mean": self.mean,
+                  "config": np.array([self.method, str(self.dims), self.quantization])}
+        if self.components is not None:
+            arrays["components"] = self.components
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CompressedVectorIndex":
+        """
+        Memuat index dari file .npz
+        """
+        data = np.load(path)
+        method, dims, quantization = (str(value) for value in data["config"])
+        return cls(
+            ids=[str(doc_id) for doc_id in data["ids"]],
+            method=method,
+            dims=int(dims),
+            quantization=quantization,
+            mean=data["mean"],
+            components=data["components"] if "components" in data else None,
+            codes=data["codes"],
+            scales=data["scales"] if "scales" in data else None
+        )
+
+    @staticmethod
+    def default_path(vector_store) -> str:
+        """
+        Lokasi default file index terkompresi di samping database vector store
+        """
+        return os.path.join(vector_store.persist_directory,
+                            f"{vector_store.collection_name}_compressed_vectors.npz")
+
+
+def benchmark_compression(vector_store, queries: List[str],
+                          settings: Optional[List[Tuple[str, Optional[int], str]]] = None,
+                          top_k: int = 5, rescore_candidates: int = 20) -> List[Dict]:
+    """
+    Membandingkan memori, latency, dan recall setiap setting kompresi
+
+    Ground truth adalah top_k exact (squared L2 full precision, brute force). Recall
+    dihitung untuk kandidat tahap pertama saja dan setelah rescoring full precision.
+
+    Index terkompresi adalah salinan tambahan: index HNSW ChromaDB tetap memuat vektor
+    float32 resep (dan chunk section). memory_ratio hanya membandingkan ukuran index
+    dengan matriks float32 resep; resident_bytes adalah total memori vektor yang
+    dimuat (ChromaDB + index terkompresi).
+
+    Args:
+        vector_store: Instance RecipeVectorStore yang sudah berisi resep
+        queries: Query contoh
+        settings: List (metode, dimensi, kuantisasi); default DEFAULT_SETTINGS
+        top_k: Jumlah hasil yang dibandingkan
+        rescore_candidates: Jumlah kandidat tahap pertama yang dinilai ulang
+
+    Returns:
+        List dictionary laporan per setting (baris pertama baseline float32 penuh)
+    """
+    rows = vector_store.collection.get(include=["embeddings"])
+    ids = list(rows['ids'])
+    full = np.asarray(rows['embeddings'], dtype=np.float32)
+    # Vektor float32 yang tetap dimuat index HNSW ChromaDB (resep + chunk section)
+    chroma_bytes = int(full.nbytes) + vector_store.section_collection.count() * full.shape[1] * 4
+    query_embeddings = np.asarray(vector_store.embedding_function(queries), dtype=np.float32)
+    k = min(top_k, len(ids))
+
+    truth, baseline_ms = [], []
+    for query in query_embeddings:
+        start = time.perf_counter()
+        difference = full - query
+        distances = np.einsum('ij,ij->i', difference, difference)
+        truth.append(set(ids[i] for i in np.argsort(distances)[:k]))
+        baseline_ms.append((time.perf_counter() - start) * 1000)
+
+    reports = [{
+        "setting": f"none/{full.shape[1]}/float32 (exact)",
+        "memory_bytes": int(full.nbytes),
+        "memory_ratio": 1.0,
+        "chroma_bytes": chroma_bytes,
+        "resident_bytes": chroma_bytes,
+        "latency_ms": round(float(np.median(baseline_ms)), 3),
+        "latency_rescored_ms": None,
+        "recall": 1.0,
+        "recall_rescored": 1.0
+    }]
+
+    for method, dims, quantization in settings or DEFAULT_SETTINGS:
+        index = CompressedVectorIndex.build(ids, full, method=method, dims=dims, quantization=quantization)
+        first_ms, total_ms, recall, recall_rescored = [], [], [], []
+        for query, expected in zip(query_embeddings, truth):
+            start = time.perf_counter()
+            candidates, _ = index.search(query, max(k, rescore_candidates))
+            first = time.perf_counter()
+            ranked = vector_store.rescore(query, candidates, k)
+            first_ms.append((first - start) * 1000)
+            total_ms.append((time.perf_counter() - start) * 1000)
+            recall.append(len(expected & set(candidates[:k])) / max(len(expected), 1))
+            recall_rescored.append(len(expected & {doc_id for doc_id, _ in ranked}) / max(len(expected), 1))
+
+        memory = index.memory_bytes()
+        reports.append({
+            "setting": f"{method}/{index.dims}/{quantization}",
+            "memory_bytes": memory,
+            "memory_ratio": round(memory / max(full.nbytes, 1), 3),
+            "chroma_bytes": chroma_bytes,
+            "resident_bytes": chroma_bytes + memory,
+            "latency_ms": round(float(np.median(first_ms)), 3),
+            "latency_rescored_ms": round(float(np.median(total_ms)), 3),
+            "recall": round(float(np.mean(recall)), 3),
+            "recall_rescored": round(float(np.mean(recall_rescored)), 3)
+        })
+    return reports
@@ -5,11 +5,51 @@ Menggunakan ChromaDB sebagai basis data vektor
 
 import os
 import json
-from typing import List, Dict, Optional
+import hashlib
+from typing import List, Dict, Optional, Tuple
 import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 import numpy as np
+from src.records import RecipeMetadata, SearchHit, LazySearchHit
+from src.doc_store import DocumentStore
+from src.vector_compression import CompressedVectorIndex
+from src.onnx_embedding import OnnxSentenceEncoder
+from src.category_index import CategoryPartitionIndex
+from src.similarity_graph import SimilarRecipeGraph
+
+
+# Urutan section saat resep disusun ulang dari chunk
+RECIPE_SECTION_ORDER = {"header": 0, "bahan": 1, "langkah": 2, "tips": 3}
+
+# Metadata numerik hasil parsing saat ingest (lihat data_processor.parse_numeric_fields)
+NUMERIC_METADATA_FIELDS = ("waktu_menit", "jumlah_porsi", "level_kesulitan")
+
+
+def combine_filters(*filters: Optional[Dict]) -> Optional[Dict]:
+    """
+    Menggabungkan beberapa filter where ChromaDB dengan $and
+    
+    Args:
+        filters: Filter where (None diabaikan)
+        
+    Returns:
+        Filter gabungan, atau None jika tidak ada filter
+    """
+    conditions = []
+    for where in filters:
+        if not where:
+            continue
+        if "$and" in where:
+            conditions.extend(where["$and"])
+        elif len(where) > 1:
+            conditions.extend({key: value} for key, value in where.items())
+        else:
+            conditions.append(where)
+    
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
 
 
 class RecipeVectorStore:
@@ -20,7 +60,10 @@ class RecipeVectorStore:
     def __init__(self, 
                  persist_directory: str = "./chroma_db",
                  collection_name: str = "indonesian_recipes",
-                 embedding_model: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"):
+                 embedding_model: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+                 lazy_documents: bool = True, compressed_search: bool = False,
+                 rescore_candidates: int = 20, embedding_backend: str = "torch",
+                 onnx_model_dir: str = "./models/onnx", onnx_quantized: bool = False):
         """
         Inisialisasi vector store
         
@@ -28,6 +71,15 @@ class RecipeVectorStore:
             persist_directory: Direktori untuk menyimpan database
             collection_name: Nama collection
             embedding_model: Model untuk embedding
+            lazy_documents: Pencarian hanya meminta id dan distance ke ChromaDB; dokumen
+                dibaca dari document store lokal saat dipakai (jika sudah dibangun)
+            compressed_search: search tanpa filter memakai index terkompresi di memori
+                (reduksi dimensi + kuantisasi) lalu rescoring full precision
+            rescore_candidates: Jumlah kandidat index terkompresi yang dinilai ulang
+            embedding_backend: "torch" (sentence-transformers) atau "onnx" (ONNX Runtime,
+                model hasil export_onnx.py)
+            onnx_model_dir: Direktori model ONNX
+            onnx_quantized: Pakai model ONNX dengan kuantisasi dinamis int8
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
@@ -39,9 +91,12 @@ class RecipeVectorStore:
         )
         
         # Setup embedding function
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=embedding_model
-        )
+        if embedding_backend == "onnx":
+            self.embedding_function = OnnxSentenceEncoder(onnx_model_dir, quantized=onnx_quantized)
+        else:
+            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=embedding_model
+            )
         
         # Buat atau ambil collection
         self.collection = self.client.get_or_create_collection(
@@ -50,36 +105,232 @@ class RecipeVectorStore:
             metadata={"description": "Indonesian cooking recipes"}
         )
         
+        # Collection chunk per section resep (header, bahan, langkah, tips)
+        self.section_collection_name = f"{collection_name}_sections"
+        self.section_collection = self.client.get_or_create_collection(
+            name=self.section_collection_name,
+            embedding_function=self.embedding_function,
+            metadata={"description": "Indonesian cooking recipe sections"}
+        )
+        
+        # Graph resep serupa (dimuat dari disk saat pertama dipakai)
+        self.similarity_graph_path = os.path.join(persist_directory, f"{collection_name}_similar.json")
+        self._similarity_graph: Optional[SimilarRecipeGraph] = None
+        
+        # Document store lokal untuk hydrate hasil pencarian (dimuat saat pertama dipakai)
+        self.lazy_documents = lazy_documents
+        self._document_store: Optional[DocumentStore] = None
+        
+        # Index tahap pertama terkompresi (dimuat saat pertama dipakai)
+        self.compressed_search = compressed_search
+        self.rescore_candidates = rescore_candidates
+        self._compressed_index: Optional[CompressedVectorIndex] = None
+        
         print(f"Vector store initialized: {collection_name}")
         print(f"Total documents: {self.collection.count()}")
     
-    def add_recipes(self, recipes: List[Dict], recipe_texts: List[str]):
+    @staticmethod
+    def _build_metadata(recipe: Dict) -> Dict:
+        """
+        Membuat metadata resep yang disimpan di collection
+        """
+        metadata = {
+            "nama": recipe.get("nama", ""),
+            "kategori": recipe.get("kategori", ""),
+            "porsi": recipe.get("porsi", ""),
+            "waktu_masak": recipe.get("waktu_masak", ""),
+            "tingkat_kesulitan": recipe.get("tingkat_kesulitan", "")
+        }
+        # Field numerik untuk filter range ($lte/$gte); ChromaDB tidak menerima None
+        for field in NUMERIC_METADATA_FIELDS:
+            value = recipe.get(field)
+            if value is not None:
+                metadata[field] = int(value)
+        return metadata
+    
+    @property
+    def document_store(self) -> Optional[DocumentStore]:
+        """
+        Document store lokal (None jika lazy_documents nonaktif atau belum dibangun)
+        """
+        if self.lazy_documents and self._document_store is None:
+            path = DocumentStore.default_path(self)
+            if os.path.exists(path):
+                self._document_store = DocumentStore(path)
+        return self._document_store
+    
+    def build_document_store(self) -> int:
+        """
+        Membangun ulang document store dari isi collection (jalankan setelah ingest)
+        
+        Returns:
+            Jumlah dokumen di document store
+        """
+        self._close_document_store()
+        return DocumentStore.build(self)
+    
+    def _close_document_store(self):
+        if self._document_store is not None:
+            self._document_store.close()
+            self._document_store = None
+    
+    @property
+    def compressed_index(self) -> Optional[CompressedVectorIndex]:
+        """
+        Index vektor terkompresi (None jika compressed_search nonaktif atau belum dibangun)
+        """
+        if self.compressed_search and self._compressed_index is None:
+            path = CompressedVectorIndex.default_path(self)
+            if os.path.exists(path):
+                self._compressed_index = CompressedVectorIndex.load(path)
+        return self._compressed_index
+    
+    def build_compressed_index(self, method: str = "pca", dims: Optional[int] = 256,
+                               quantization: str = "int8") -> CompressedVectorIndex:
+        """
+        Fit reduksi dimensi dan kuantisasi pada embedding collection, lalu simpan
+        
+        Args:
+            method: "none", "pca", atau "truncate"
+            dims: Jumlah dimensi hasil reduksi
+            quantization: "float32", "float16", atau "int8"
+            
+        Returns:
+            Index terkompresi yang sudah disimpan
+        """
+        rows = self.collection.get(include=["embeddings"])
+        embeddings = rows.get('embeddings')
+        if embeddings is None or len(embeddings) == 0:
+            embeddings = np.zeros((0, 1), dtype=np.float32)
+        index = CompressedVectorIndex.build(rows['ids'], np.asarray(embeddings, dtype=np.float32),
+                                            method=method, dims=dims, quantization=quantization)
+        index.save(CompressedVectorIndex.default_path(self))
+        self._compressed_index = None
+        return index
+    
+    def _invalidate_local_stores(self):
+        # Isi collection berubah: document store dan index terkompresi lama tidak dipakai
+        # lagi sampai dibangun ulang
+        self._close_document_store()
+        self._compressed_index = None
+        for path in (DocumentStore.default_path(self), CompressedVectorIndex.default_path(self)):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def search_compressed(self, query: str, top_k: int = 3,
+                          rescore_candidates: Optional[int] = None,
+                          index: Optional[CompressedVectorIndex] = None,
+                          where: Optional[Dict] = None) -> List[SearchHit]:
+        """
+        Pencarian dua tahap: kandidat dari index terkompresi, lalu rescoring dengan
+        embedding full precision dari ChromaDB (distance sama dengan search biasa)
+        
+        Args:
+            query: Pertanyaan atau query pencarian
+            top_k: Jumlah hasil teratas
+            rescore_candidates: Jumlah kandidat yang dinilai ulang (default rescore_candidates)
+            index: Index terkompresi (default compressed_index)
+            where: Filter metadata (opsional); id yang lolos dibaca dari ChromaDB
+                tanpa dokumen, kandidat di luar id tersebut dilewati
+            
+        Returns:
+            List SearchHit terurut dari yang terdekat
+        """
+        index = index if index is not None else self.compressed_index
+        allowed_ids = set(self.collection.get(where=where, include=[])['ids']) if where else None
+        query_embedding = np.asarray(self.embedding_function([query])[0], dtype=np.float32)
+        candidate_ids, _ = index.search(query_embedding, max(top_k, rescore_candidates or self.rescore_candidates),
+                                        allowed_ids=allowed_ids)
+        
+        ranked = dict(self.rescore(query_embedding, candidate_ids, top_k))
+        hits = self.get_by_ids(list(ranked))
+        for hit in hits:
+            hit.distance = ranked[hit.id]
+        return hits
+    
+    def rescore(self, query_embedding: np.ndarray, candidate_ids: List[str],
+                top_k: int) -> List[Tuple[str, float]]:
+        """
+        Menilai ulang kandidat dengan embedding full precision (squared L2, sama dengan ChromaDB)
+        
+        Args:
+            query_embedding: Embedding query full precision
+            candidate_ids: Id kandidat tahap pertama
+            top_k: Jumlah hasil
+            
+        Returns:
+            List (id, distance) terurut dari yang terdekat
+        """
+        if not candidate_ids:
+            return []
+        rows = self.collection.get(ids=candidate_ids, include=["embeddings"])
+        if len(rows['ids']) == 0:
+            return []
+        
+        difference = np.asarray(rows['embeddings'], dtype=np.float32) - query_embedding
+        distances = np.einsum('ij,ij->i', difference, difference)
+        return [(rows['ids'][i], float(distances[i])) for i in np.argsort(distances)[:top_k]]
+    
+    def _load_document(self, doc_id: str):
+        """
+        Loader LazySearchHit: document store, fallback ke ChromaDB
+        """
+        store = self.document_store
+        row = store.get(doc_id) if store is not None else None
+        if row is not None:
+            return row
+        rows = self.collection.get(ids=[doc_id], include=["documents", "metadatas"])
+        if not rows['ids']:
+            return "", {}
+        return rows['documents'][0], rows['metadatas'][0]
+    
+    def _query_hits(self, collection, query_kwargs: Dict) -> List[SearchHit]:
+        """
+        Query ChromaDB; dengan document store hanya id dan distance yang diminta
+        """
+        if self.document_store is None:
+            return self._to_hits(collection.query(**query_kwargs))
+        
+        results = collection.query(include=["distances"], **query_kwargs)
+        if not results or not results['ids'] or len(results['ids'][0]) == 0:
+            return []
+        return [
+            LazySearchHit(doc_id, self._load_document, distance=distance)
+            for doc_id, distance in zip(results['ids'][0], results['distances'][0])
+        ]
+    
+    @staticmethod
+    def recipe_id(index: int) -> str:
+        """
+        Membuat ID dokumen untuk resep ke-index
+        """
+        return f"recipe_{index}"
+    
+    def add_recipes(self, recipes: List[Dict], recipe_texts: List[str], start_index: int = 0,
+                    ids: Optional[List[str]] = None):
         """
         Menambahkan resep ke vector store
         
         Args:
             recipes: List dictionary resep (metadata)
             recipe_texts: List teks resep yang sudah diformat
+            start_index: Index awal untuk ID (untuk penambahan per batch)
+            ids: ID dokumen eksplisit (opsional, menggantikan start_index)
         """
         if len(recipes) != len(recipe_texts):
             raise ValueError("Jumlah recipes dan recipe_texts harus sama")
         
         # Generate IDs
-        ids = [f"recipe_{i}" for i in range(len(recipes))]
+        if ids is None:
+            ids = [self.recipe_id(i) for i in range(start_index, start_index + len(recipes))]
+        elif len(ids) != len(recipes):
+            raise ValueError("Jumlah ids dan recipes harus sama")
         
         # Prepare metadata
-        metadatas = []
-        for recipe in recipes:
-            metadata = {
-                "nama": recipe.get("nama", ""),
-                "kategori": recipe.get("kategori", ""),
-                "porsi": recipe.get("porsi", ""),
-                "waktu_masak": recipe.get("waktu_masak", ""),
-                "tingkat_kesulitan": recipe.get("tingkat_kesulitan", "")
-            }
-            metadatas.append(metadata)
+        metadatas = [self._build_metadata(recipe) for recipe in recipes]
         
         # Add to collection
+        self._invalidate_local_stores()
         self.collection.add(
             documents=recipe_texts,
             metadatas=metadatas,
@@ -88,21 +339,313 @@ class RecipeVectorStore:
         
         print(f"Added {len(recipes)} recipes to vector store")
     
-    def search(self, query: str, top_k: int = 3) -> Dict:
+    def add_recipe_sections(self, recipes: List[Dict], recipe_ids: List[str],
+                            sections_per_recipe: List[List[Dict]]):
+        """
+        Menambahkan chunk section resep ke section collection
+        
+        Args:
+            recipes: List dictionary resep (metadata)
+            recipe_ids: ID dokumen resep induk
+            sections_per_recipe: Hasil split_recipe_into_sections untuk setiap resep
+        """
+        ids, documents, metadatas = [], [], []
+        for recipe, recipe_id, sections in zip(recipes, recipe_ids, sections_per_recipe):
+            base_metadata = self._build_metadata(recipe)
+            for section in sections:
+                ids.append(f"{recipe_id}::{section['section']}::{section['chunk_index']}")
+                documents.append(section["text"])
+                metadatas.append({
+                    **base_metadata,
+                    "parent_id": recipe_id,
+                    "section": section["section"],
+                    "chunk_index": section["chunk_index"]
+                })
+        
+        if ids:
+            self.section_collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        
+        print(f"Added {len(ids)} section chunks to vector store")
+    
+    def has_sections(self) -> bool:
+        """
+        Mengecek apakah section collection sudah terisi
+        """
+        return self.section_collection.count() > 0
+    
+    def search_sections(self, query: str, top_k: int = 3, fetch_multiplier: int = 4,
+                        section_margin: float = 0.15, where: Optional[Dict] = None) -> Dict:
+        """
+        Mencari chunk section lalu mengagregasi hasilnya ke resep induk
+        
+        Setiap resep hanya membawa section yang cocok dengan query (mis. hanya
+        bahan untuk pertanyaan tentang bahan), sehingga context lebih pendek.
+        Dengan lazy_documents, query chunk hanya meminta metadata dan distance;
+        teks dibaca sekali (section_collection.get) untuk chunk yang terpilih saja.
+        
+        Args:
+            query: Pertanyaan atau query pencarian
+            top_k: Jumlah resep induk teratas
+            fetch_multiplier: Jumlah chunk yang diambil per resep yang diminta
+            section_margin: Section ikut dibawa jika jaraknya paling banyak
+                (1 + section_margin) kali jarak chunk terbaik resep tersebut
+            where: Filter metadata (opsional)
+            
+        Returns:
+            Dictionary berisi hasil pencarian (format sama dengan search)
+        """
+        total_chunks = self.section_collection.count()
+        n_results = min(top_k * fetch_multiplier, total_chunks)
+        formatted_results = {"query": query, "results": []}
+        if n_results == 0:
+            return formatted_results
+        
+        # Dengan lazy_documents hanya metadata dan distance yang diminta; teks chunk
+        # dibaca setelah ranking, hanya untuk section yang dipakai
+        include = ["metadatas", "distances"] if self.lazy_documents else ["documents", "metadatas", "distances"]
+        
+        # Satu resep bisa mengisi banyak chunk teratas: perbesar n_results sampai
+        # top_k resep induk terkumpul atau seluruh chunk sudah diambil
+        while True:
+            query_kwargs = {"query_texts": [query], "n_results": n_results, "include": include}
+            if where:
+                query_kwargs["where"] = where
+            results = self.section_collection.query(**query_kwargs)
+            
+            # Agregasi ke resep induk: skor induk = jarak chunk terbaik
+            parents: Dict[str, Dict] = {}
+            texts: Dict[str, str] = {}
+            documents = results.get('documents')
+            for i, (chunk_id, metadata, distance) in enumerate(zip(
+                    results['ids'][0], results['metadatas'][0], results['distances'][0])):
+                parent_id = metadata["parent_id"]
+                parent = parents.get(parent_id)
+                if parent is None:
+                    parent = parents[parent_id] = {
+                        "id": parent_id,
+                        "metadata": RecipeMetadata.from_dict(metadata),
+                        "distance": distance,
+                        "sections": {}
+                    }
+                parent["distance"] = min(parent["distance"], distance)
+                parent["sections"][(metadata["section"], metadata["chunk_index"])] = (distance, chunk_id)
+                if documents:
+                    texts[chunk_id] = documents[0][i]
+            
+            if (len(parents) >= top_k or n_results >= total_chunks
+                    or len(results['ids'][0]) < n_results):
+                break
+            n_results = min(n_results * 2, total_chunks)
+        
+        ranked = sorted(parents.values(), key=lambda parent: parent["distance"])[:top_k]
+        selected = []
+        for parent in ranked:
+            max_distance = parent["distance"] * (1 + section_margin)
+            ordered_keys = sorted(
+                (key for key, (distance, _chunk_id) in parent["sections"].items() if distance <= max_distance),
+                key=lambda key: (RECIPE_SECTION_ORDER.get(key[0], len(RECIPE_SECTION_ORDER)), key[1])
+            )
+            # Header sudah tercakup metadata di format_context
+            body = [key for key in ordered_keys if key[0] != "header"]
+            sections = tuple(key[0] for key in ordered_keys)
+            if not body:
+                # Hanya header yang cocok: pakai chunk non-header terbaik, atau dokumen lengkap
+                others = [key for key in parent["sections"] if key[0] != "header"]
+                if others:
+                    best = min(others, key=lambda key: parent["sections"][key][0])
+                    body, sections = [best], (best[0],)
+                else:
+                    sections = None
+            selected.append((parent, [parent["sections"][key][1] for key in body], sections))
+        
+        missing = [chunk_id for _parent, chunk_ids, _sections in selected
+                   for chunk_id in chunk_ids if chunk_id not in texts]
+        if missing:
+            rows = self.section_collection.get(ids=missing, include=["documents"])
+            texts.update(zip(rows['ids'], rows['documents']))
+        
+        for parent, chunk_ids, sections in selected:
+            if chunk_ids:
+                # Baris pertama chunk adalah judul "Nama Masakan: ..." (sudah ada di metadata)
+                document = "\n\n".join(texts.get(chunk_id, "").split("\n", 1)[-1] for chunk_id in chunk_ids)
+            else:
+                document = self._load_document(parent["id"])[0]
+            formatted_results["results"].append(SearchHit(
+                id=parent["id"],
+                document=document,
+                metadata=parent["metadata"],
+                distance=parent["distance"],
+                sections=sections
+            ))
+        
+        return formatted_results
+    
+    def add_aliases(self, recipe_id: str, names: List[str]):
+        """
+        Menambahkan nama lain (dari resep duplikat yang digabung) ke metadata resep
+        
+        Nama lain ditulis ke metadata resep dan semua chunk section-nya, dan chunk header
+        diberi baris "Nama Lain: ..." (di-embed ulang) sehingga pencarian section default
+        juga menemukan nama duplikat. Teks dan embedding dokumen resep penuh di collection
+        utama tidak diubah: dengan USE_SECTION_CHUNKS=false nama lain hanya dikenali lewat
+        pencocokan nama di IntentRouter.
+        
+        Args:
+            recipe_id: ID dokumen resep kanonik
+            names: List nama resep duplikat
+        """
+        existing = self.collection.get(ids=[recipe_id], include=["metadatas"])
+        if not existing['ids']:
+            return
+        
+        metadata = dict(existing['metadatas'][0])
+        aliases = [a for a in metadata.get("nama_lain", "").split("; ") if a]
+        for name in names:
+            if name and name != metadata.get("nama") and name not in aliases:
+                aliases.append(name)
+        metadata["nama_lain"] = "; ".join(aliases)
+        
+        self._invalidate_local_stores()
+        self.collection.update(ids=[recipe_id], metadatas=[metadata])
+        
+        chunks = self.section_collection.get(where={"parent_id": recipe_id},
+                                             include=["documents", "metadatas"])
+        if not chunks['ids']:
+            return
+        chunk_metadatas = [{**chunk_metadata, "nama_lain": metadata["nama_lain"]}
+                           for chunk_metadata in chunks['metadatas']]
+        self.section_collection.update(ids=chunks['ids'], metadatas=chunk_metadatas)
+        
+        header_ids, header_documents = [], []
+        for chunk_id, document, chunk_metadata in zip(chunks['ids'], chunks['documents'], chunk_metadatas):
+            if chunk_metadata.get("section") == "header":
+                header_ids.append(chunk_id)
+                header_documents.append(self._with_alias_line(document, metadata["nama_lain"]))
+        if header_ids:
+            self.section_collection.update(ids=header_ids, documents=header_documents)
+    
+    @staticmethod
+    def _with_alias_line(document: str, aliases: str) -> str:
+        # Baris "Nama Lain" tepat setelah judul chunk; baris lama diganti
+        lines = [line for line in document.split("\n") if not line.startswith("Nama Lain:")]
+        return "\n".join(lines[:1] + [f"Nama Lain: {aliases}"] + lines[1:])
+    
+    @staticmethod
+    def _to_hits(results: Dict) -> List[SearchHit]:
+        """
+        Mengubah hasil query ChromaDB menjadi list SearchHit
+        """
+        if not results or not results['documents'] or len(results['documents'][0]) == 0:
+            return []
+        
+        distances = results['distances'][0] if results.get('distances') else None
+        return [
+            SearchHit(
+                id=doc_id,
+                document=document,
+                metadata=RecipeMetadata.from_dict(metadata),
+                distance=distances[i] if distances else None
+            )
+            for i, (doc_id, document, metadata) in enumerate(zip(
+                results['ids'][0], results['documents'][0], results['metadatas'][0]))
+        ]
+    
+    def get_by_ids(self, ids: List[str], where: Optional[Dict] = None) -> List[SearchHit]:
+        """
+        Mengambil resep berdasarkan id dokumen (urutan mengikuti ids)
+        
+        Args:
+            ids: List id dokumen
+            where: Filter metadata (opsional); id yang tidak lolos filter dilewati
+            
+        Returns:
+            List SearchHit tanpa distance (id yang tidak ada dilewati)
+        """
+        if ids and where:
+            allowed = set(self.collection.get(ids=ids, where=where, include=[])['ids'])
+            ids = [doc_id for doc_id in ids if doc_id in allowed]
+        if not ids:
+            return []
+        
+        store = self.document_store
+        if store is not None and all(doc_id in store for doc_id in ids):
+            return [LazySearchHit(doc_id, self._load_document) for doc_id in ids]
+        
+        rows = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        by_id = {
+            doc_id: SearchHit(id=doc_id, document=document, metadata=RecipeMetadata.from_dict(metadata))
+            for doc_id, document, metadata in zip(rows['ids'], rows['documents'], rows['metadatas'])
+        }
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+    
+    def update_similarity_graph(self, k: int = 5, rebuild: bool = False) -> Dict:
+        """
+        Memperbarui graph kNN resep serupa dari embedding di collection
+        (inkremental: hanya resep baru/terhapus yang dihitung ulang)
+        
+        Args:
+            k: Jumlah resep serupa per resep
+            rebuild: Hitung ulang seluruh graph
+            
+        Returns:
+            Dictionary statistik update
+        """
+        graph = None
+        if not rebuild and os.path.exists(self.similarity_graph_path):
+            graph = SimilarRecipeGraph.load(self.similarity_graph_path)
+            if graph.k != k:
+                graph = None
+        if graph is None:
+            graph = SimilarRecipeGraph(k=k)
+        
+        rows = self.collection.get(include=["embeddings"])
+        embeddings = rows.get('embeddings')
+        if embeddings is None or len(embeddings) == 0:
+            embeddings = np.zeros((0, 1), dtype=np.float32)
+        stats = graph.update(rows['ids'], np.asarray(embeddings, dtype=np.float32))
+        
+        graph.save(self.similarity_graph_path)
+        self._similarity_graph = graph
+        return stats
+    
+    def get_related_recipes(self, recipe_id: str, top_k: int = 5) -> List[SearchHit]:
+        """
+        Mengambil resep serupa dari graph kNN (tanpa embedding query)
+        
+        Args:
+            recipe_id: Id dokumen resep
+            top_k: Jumlah resep serupa
+            
+        Returns:
+            List SearchHit terurut dari yang paling mirip (kosong jika graph belum dibangun)
+        """
+        if self._similarity_graph is None:
+            if not os.path.exists(self.similarity_graph_path):
+                return []
+            self._similarity_graph = SimilarRecipeGraph.load(self.similarity_graph_path)
+        
+        neighbors = self._similarity_graph.related(recipe_id, top_k)
+        distances = dict(neighbors)
+        hits = self.get_by_ids([neighbor_id for neighbor_id, _ in neighbors])
+        for hit in hits:
+            hit.distance = distances[hit.id]
+        return hits
+    
+    def search(self, query: str, top_k: int = 3, where: Optional[Dict] = None) -> Dict:
         """
         Mencari resep berdasarkan query
         
         Args:
             query: Pertanyaan atau query pencarian
             top_k: Jumlah hasil teratas
+            where: Filter metadata (opsional, diterapkan di index sebelum ranking)
             
         Returns:
             Dictionary berisi hasil pencarian
         """
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k
-        )
+        query_kwargs = {"query_texts": [query], "n_results": top_k}
+        if where:
+            query_kwargs["where"] = where
         
         # Format results
         formatted_results = {
@@ -110,19 +653,17 @@ class RecipeVectorStore:
             "results": []
         }
         
-        if results and results['documents'] and len(results['documents'][0]) > 0:
-            for i in range(len(results['documents'][0])):
-                result_item = {
-                    "id": results['ids'][0][i],
-                    "document": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "distance": results['distances'][0][i] if 'distances' in results else None
-                }
-                formatted_results["results"].append(result_item)
+        if self.compressed_index is not None:
+            formatted_results["results"] = self.search_compressed(query, top_k, where=where)
+            return formatted_results
+        
+        # Dokumen dan metadata dibaca saat hasil dipakai (lihat document_store)
+        formatted_results["results"] = self._query_hits(self.collection, query_kwargs)
         
         return formatted_results
     
-    def search_by_category(self, query: str, category: str, top_k: int = 3) -> Dict:
+    def search_by_category(self, query: str, category: str, top_k: int = 3,
+                           where: Optional[Dict] = None) -> Dict:
         """
         Mencari resep berdasarkan query dan filter kategori
         
@@ -130,15 +671,16 @@ class RecipeVectorStore:
             query: Pertanyaan atau query pencarian
             category: Kategori resep
             top_k: Jumlah hasil teratas
+            where: Filter metadata tambahan (opsional)
             
         Returns:
             Dictionary berisi hasil pencarian
         """
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            where={"kategori": category}
-        )
+        query_kwargs = {
+            "query_texts": [query],
+            "n_results": top_k,
+            "where": combine_filters({"kategori": category}, where)
+        }
         
         # Format results (sama seperti search)
         formatted_results = {
@@ -147,15 +689,11 @@ class RecipeVectorStore:
             "results": []
         }
         
-        if results and results['documents'] and len(results['documents'][0]) > 0:
-            for i in range(len(results['documents'][0])):
-                result_item = {
-                    "id": results['ids'][0][i],
-                    "document": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "distance": results['distances'][0][i] if 'distances' in results else None
-                }
-                formatted_results["results"].append(result_item)
+        if self.compressed_index is not None:
+            formatted_results["results"] = self.search_compressed(query, top_k, where=query_kwargs["where"])
+            return formatted_results
+        
+        formatted_results["results"] = self._query_hits(self.collection, query_kwargs)
         
         return formatted_results
     
@@ -182,17 +720,42 @@ class RecipeVectorStore:
         """
         Menghapus semua dokumen dari collection
         """
-        # Delete collection
+        # Delete collection (termasuk partisi per kategori)
         self.client.delete_collection(name=self.collection_name)
+        self.client.delete_collection(name=self.section_collection_name)
+        CategoryPartitionIndex(self).drop_partitions()
+        self._invalidate_local_stores()
+        if os.path.exists(self.similarity_graph_path):
+            os.remove(self.similarity_graph_path)
+        self._similarity_graph = None
         
         # Recreate collection
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
             embedding_function=self.embedding_function
         )
+        self.section_collection = self.client.get_or_create_collection(
+            name=self.section_collection_name,
+            embedding_function=self.embedding_function
+        )
         
         print("All documents deleted from vector store")
     
+    def get_fingerprint(self) -> str:
+        """
+        Mendapatkan fingerprint isi collection (berubah jika resep ditambah/dihapus)
+        
+        Returns:
+            String hash dari id dan metadata dokumen
+        """
+        all_docs = self.collection.get(include=["metadatas"])
+        rows = sorted(
+            f"{doc_id}|{json.dumps(metadata, sort_keys=True, ensure_ascii=False)}"
+            for doc_id, metadata in zip(all_docs['ids'], all_docs['metadatas'])
+        ) if all_docs else []
+        digest = hashlib.sha1("\n".join(rows).encode('utf-8')).hexdigest()
+        return f"{len(rows)}-{digest[:16]}"
+    
     def get_stats(self) -> Dict:
         """
         Mendapatkan statistik vector store
@@ -246,9 +809,9 @@ if __name__ == "__main__":
     
     print(f"\nHasil pencarian untuk: '{query}'")
     for result in results['results']:
-        print(f"\n- {result['metadata']['nama']}")
-        print(f"  Kategori: {result['metadata']['kategori']}")
-        print(f"  Distance: {result['distance']:.4f}")
+        print(f"\n- {result.metadata.nama}")
+        print(f"  Kategori: {result.metadata.kategori}")
+        print(f"  Distance: {result.distance:.4f}")
     
     # Stats
     stats = vector_store.get_stats()
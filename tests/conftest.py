@@ -0,0 +1,57 @@
+"""
+Fixture bersama untuk test
+"""
+
+import os
+import sys
+import json
+import pytest
+
+# Root repo di path agar paket src bisa di-import (sama seperti script di root)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_PATH = os.path.join(ROOT, "data", "resep_indonesia.json")
+
+
+@pytest.fixture(scope="session")
+def raw_recipes():
+    """
+    Resep mentah dari dataset repo
+    """
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def processed_recipes(raw_recipes):
+    """
+    Resep dataset yang sudah diproses (Recipe hasil process_recipe)
+    """
+    from src.data_processor import RecipePreprocessor
+    preprocessor = RecipePreprocessor()
+    return [preprocessor.process_recipe(recipe) for recipe in raw_recipes]
+
+
+class _NameCollection:
+    def __init__(self, raw_recipes):
+        self.raw_recipes = raw_recipes
+
+    def get(self, include=None):
+        return {"ids": [f"recipe_{i}" for i in range(len(self.raw_recipes))],
+                "metadatas": [{"nama": recipe["nama"]} for recipe in self.raw_recipes]}
+
+
+class _NameOnlyStore:
+    # Vector store palsu yang hanya menyediakan nama resep (tanpa embedding model)
+    def __init__(self, raw_recipes):
+        self.collection = _NameCollection(raw_recipes)
+
+
+@pytest.fixture
+def name_router(raw_recipes):
+    """
+    IntentRouter dengan nama resep dataset (id "recipe_<index>"); aturan saja, tanpa model linear
+    """
+    from src.intent_router import IntentRouter
+    return IntentRouter(_NameOnlyStore(raw_recipes))
@@ -0,0 +1,32 @@
+"""
+Test select_adaptive dengan threshold z-score tetap
+"""
+
+from src.adaptive_retrieval import select_adaptive
+
+# Background (median separuh bawah) 0.43, standar deviasi sekitar 0.014
+SIMILARITIES = [0.90, 0.85, 0.50, 0.46, 0.45, 0.45, 0.44, 0.43, 0.42, 0.41]
+
+
+def test_default_zscore_cuts_candidates_close_to_background():
+    selection = select_adaptive(SIMILARITIES, max_k=5, min_relative=0.0, gap_fraction=1.0)
+
+    assert selection == {"keep": 4, "reason": "threshold"}
+
+
+def test_zero_zscore_disables_the_threshold():
+    selection = select_adaptive(SIMILARITIES, max_k=5, min_zscore=0.0, min_relative=0.0, gap_fraction=1.0)
+
+    assert selection == {"keep": 5, "reason": "max_k"}
+
+
+def test_best_candidate_is_always_kept():
+    assert select_adaptive(SIMILARITIES, max_k=5)["keep"] == 2
+    assert select_adaptive([0.5] * 6, max_k=3) == {"keep": 1, "reason": "flat"}
+
+
+def test_small_pool_skips_zscore_and_keeps_close_candidates():
+    # Pool lebih kecil dari 2 * max_k: tidak ada background untuk z-score
+    assert select_adaptive([0.6, 0.59, 0.58], max_k=3) == {"keep": 3, "reason": "max_k"}
+    assert select_adaptive([0.6, 0.59, 0.2], max_k=3) == {"keep": 2, "reason": "relative"}
+    assert select_adaptive([0.6, 0.59, 0.58], max_k=1) == {"keep": 1, "reason": "max_k"}
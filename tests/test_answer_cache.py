@@ -0,0 +1,52 @@
+"""
+Test AnswerCache: hanya prompt tetap yang di-cache dan penulisan file aman untuk thread
+"""
+
+import json
+import threading
+from src.answer_cache import AnswerCache, get_fixed_prompts
+
+
+FINGERPRINT = "fp"
+
+
+def response_for(query):
+    return {"success": True, "response": f"jawaban: {query}", "sources": []}
+
+
+def test_only_fixed_prompts_are_cached(tmp_path):
+    prompts = get_fixed_prompts(["Sup", "Kue"])
+    cache = AnswerCache(str(tmp_path / "cache.json"), allowed_prompts=prompts)
+
+    assert cache.put(prompts[0], 3, FINGERPRINT, response_for(prompts[0]))
+    assert not cache.put("Bagaimana cara membuat Sate Ayam Madura?", 3, FINGERPRINT,
+                         response_for("sate"))
+
+    assert cache.get(prompts[0], 3, FINGERPRINT)[0] is not None
+    assert cache.get("Bagaimana cara membuat Sate Ayam Madura?", 3, FINGERPRINT) == (None, False)
+    saved = json.loads((tmp_path / "cache.json").read_text(encoding="utf-8"))
+    assert [entry["query"] for entry in saved.values()] == [prompts[0]]
+
+
+def test_old_free_form_entries_are_dropped_on_load(tmp_path):
+    path = str(tmp_path / "cache.json")
+    AnswerCache(path).put("Bagaimana cara membuat Sate Ayam Madura?", 3, FINGERPRINT, response_for("sate"))
+
+    cache = AnswerCache(path, allowed_prompts=get_fixed_prompts([]))
+    assert cache.get("Bagaimana cara membuat Sate Ayam Madura?", 3, FINGERPRINT) == (None, False)
+
+
+def test_concurrent_saves_leave_valid_file(tmp_path):
+    prompts = [f"prompt {i}" for i in range(40)]
+    cache = AnswerCache(str(tmp_path / "cache.json"), allowed_prompts=prompts)
+
+    threads = [threading.Thread(target=cache.put, args=(prompt, 3, FINGERPRINT, response_for(prompt)))
+               for prompt in prompts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    saved = json.loads((tmp_path / "cache.json").read_text(encoding="utf-8"))
+    assert len(saved) == len(prompts)
+    assert [path.name for path in tmp_path.iterdir()] == ["cache.json"]
@@ -0,0 +1,80 @@
+"""
+Test BatchRunner: input JSONL dan penanganan baris rusak
+"""
+
+import json
+from src.batch_runner import BatchRunner
+
+
+class EchoChatbot:
+    def __init__(self):
+        self.queries = []
+
+    def chat(self, query, top_k=3, include_sources=True):
+        self.queries.append(query)
+        return {"success": True, "response": f"jawaban: {query}", "retrieval": {}}
+
+
+def write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_malformed_line_is_recorded_as_failed_item(tmp_path):
+    input_path = tmp_path / "input.jsonl"
+    output_path = tmp_path / "output.jsonl"
+    write_lines(input_path, [
+        json.dumps({"id": "a", "query": "Cara membuat rendang?"}),
+        '{"id": "b", "query": ',
+        json.dumps({"id": "c", "query": "Resep soto ayam"}),
+    ])
+
+    chatbot = EchoChatbot()
+    runner = BatchRunner(chatbot, concurrency=2)
+    stats = runner.run(str(input_path), str(output_path), resume=False)
+
+    assert stats["succeeded"] == 2
+    assert stats["failed"] == 1
+    assert sorted(chatbot.queries) == ["Cara membuat rendang?", "Resep soto ayam"]
+
+    results = {r["id"]: r for r in map(json.loads, output_path.read_text(encoding="utf-8").splitlines())}
+    assert results["line:2"]["success"] is False
+    assert results["line:2"]["line"] == 2
+    assert "baris 2" in results["line:2"]["error"]
+
+
+def test_non_object_line_is_failed_item(tmp_path):
+    input_path = tmp_path / "input.jsonl"
+    write_lines(input_path, ['["bukan", "objek"]', json.dumps({"query": "Resep sate"})])
+
+    items = list(BatchRunner.read_queries(str(input_path)))
+    assert items[0]["error"]
+    assert items[1] == {"id": "line:2", "query": "Resep sate"}
+
+
+def test_line_ids_do_not_collide_with_real_ids(tmp_path):
+    input_path = tmp_path / "input.jsonl"
+    output_path = tmp_path / "output.jsonl"
+    write_lines(input_path, [json.dumps({"id": "2", "query": "Resep rendang"}),
+                             json.dumps({"query": "Resep sate"})])
+    output_path.write_text(json.dumps({"id": "2", "success": True}) + "\n", encoding="utf-8")
+
+    chatbot = EchoChatbot()
+    BatchRunner(chatbot).run(str(input_path), str(output_path))
+
+    assert chatbot.queries == ["Resep sate"]
+
+
+def test_resume_drops_truncated_last_line(tmp_path):
+    input_path = tmp_path / "input.jsonl"
+    output_path = tmp_path / "output.jsonl"
+    write_lines(input_path, [json.dumps({"id": "a", "query": "Resep rendang"}),
+                             json.dumps({"id": "b", "query": "Resep sate"})])
+    output_path.write_text(json.dumps({"id": "a", "success": True}) + '\n{"id": "b", "succ',
+                           encoding="utf-8")
+
+    chatbot = EchoChatbot()
+    BatchRunner(chatbot).run(str(input_path), str(output_path))
+
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert chatbot.queries == ["Resep sate"]
+    assert [record["id"] for record in records] == ["a", "b"]
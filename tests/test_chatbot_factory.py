@@ -0,0 +1,44 @@
+"""
+Test builder konfigurasi .env yang dipakai app.py, run_batch.py, dan warm_cache.py
+"""
+
+from src.chatbot_factory import build_retriever_from_env, env_flag
+
+
+def test_env_flag_reads_true_false_with_default(monkeypatch):
+    monkeypatch.setenv("RERANK", "True")
+    monkeypatch.delenv("ADAPTIVE_TOP_K", raising=False)
+
+    assert env_flag("RERANK", False) is True
+    assert env_flag("ADAPTIVE_TOP_K", True) is True
+    assert env_flag("ADAPTIVE_TOP_K", False) is False
+
+
+def test_retriever_settings_come_from_env(monkeypatch):
+    monkeypatch.setenv("TOP_K_RETRIEVAL", "4")
+    monkeypatch.setenv("USE_CATEGORY_PARTITIONS", "false")
+    monkeypatch.setenv("CANDIDATE_POOL_SIZE", "25")
+    monkeypatch.setenv("ADAPTIVE_MIN_ZSCORE", "1.5")
+    monkeypatch.setenv("RERANK", "false")
+
+    retriever = build_retriever_from_env(vector_store=None)
+
+    assert retriever.top_k == 4
+    assert retriever.category_index is None
+    assert retriever.candidate_pool_size == 25
+    assert retriever.min_zscore == 1.5
+    assert retriever.reranker is None
+    assert build_retriever_from_env(vector_store=None, top_k=2).top_k == 2
+
+
+def test_compressed_search_disables_section_chunks_and_partitions(monkeypatch, capsys):
+    monkeypatch.setenv("COMPRESSED_SEARCH", "true")
+    monkeypatch.setenv("USE_SECTION_CHUNKS", "true")
+    monkeypatch.setenv("USE_CATEGORY_PARTITIONS", "true")
+    monkeypatch.setenv("RERANK", "false")
+
+    retriever = build_retriever_from_env(vector_store=None)
+
+    assert retriever.use_sections is False
+    assert retriever.category_index is None
+    assert "USE_SECTION_CHUNKS" in capsys.readouterr().out
@@ -0,0 +1,38 @@
+"""
+Test ContextCompressor: hanya baris bahan/tips yang digabung ke bagian bersama
+"""
+
+from src.context_compressor import ContextCompressor, LineVectorCache, SHARED_TITLE
+from src.records import RecipeMetadata, SearchHit
+
+
+class ConstantEmbeddingStore:
+    @staticmethod
+    def embedding_function(texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+def recipe(name, bahan, langkah):
+    document = "\n".join([f"Nama Masakan: {name}", "", "Bahan-bahan:"] + [f"- {item}" for item in bahan]
+                         + ["", "Cara Membuat:"] + langkah)
+    return SearchHit(id=name, document=document, metadata=RecipeMetadata(nama=name))
+
+
+def test_shared_steps_stay_numbered_in_each_recipe():
+    docs = [
+        recipe("Ayam Goreng", ["1 ekor ayam", "Garam dan gula secukupnya"],
+               ["1. Potong ayam", "2. Lumuri bumbu", "3. Tumis bumbu hingga harum", "4. Goreng ayam"]),
+        recipe("Tahu Bacem", ["10 potong tahu", "Garam dan gula secukupnya"],
+               ["1. Rebus tahu", "2. Haluskan bumbu", "3. Tumis bumbu hingga harum", "4. Goreng tahu"]),
+    ]
+    compressor = ContextCompressor(ConstantEmbeddingStore(), LineVectorCache(), token_budget=10000)
+
+    context = compressor.format_context("cara membuat", docs)
+    shared, ayam, tahu = context.split("\n\n")[1:4]
+
+    assert shared.startswith(SHARED_TITLE)
+    assert "- Garam dan gula secukupnya" in shared
+    assert "Tumis bumbu" not in shared
+    assert "Cara Membuat:\n1. Potong ayam\n2. Lumuri bumbu\n3. Tumis bumbu hingga harum\n4. Goreng ayam" in ayam
+    assert "Cara Membuat:\n1. Rebus tahu\n2. Haluskan bumbu\n3. Tumis bumbu hingga harum\n4. Goreng tahu" in tahu
+    assert "Garam dan gula" not in ayam + tahu
@@ -0,0 +1,62 @@
+"""
+Test NearDuplicateDetector: kandidat LSH, konfirmasi nama, dan hasil filter_batch
+"""
+
+import copy
+from src.dedup import NearDuplicateDetector
+
+
+def recipe_copy(recipe, name=None, extra_step=None):
+    duplicate = copy.deepcopy(recipe)
+    if name is not None:
+        duplicate["nama"] = name
+    if extra_step is not None:
+        duplicate["langkah"] = duplicate["langkah"] + [extra_step]
+    return duplicate
+
+
+def test_dataset_has_no_near_duplicates(processed_recipes):
+    recipes = [recipe.to_dict() for recipe in processed_recipes]
+    detector = NearDuplicateDetector()
+
+    kept, keys, duplicates = detector.filter_batch(recipes, [f"recipe_{i}" for i in range(len(recipes))])
+
+    assert len(kept) == len(recipes)
+    assert keys == [f"recipe_{i}" for i in range(len(recipes))]
+    assert duplicates == {}
+
+
+def test_renamed_copy_is_a_duplicate_of_the_first_recipe(processed_recipes):
+    original = processed_recipes[3].to_dict()
+    detector = NearDuplicateDetector()
+    detector.add("recipe_3", original)
+
+    # Nama mirip (Jaccard >= 0.6) dan isi hampir sama -> kandidat LSH yang lolos
+    near_copy = recipe_copy(original, name="Gado-Gado Jakarta Asli", extra_step="Sajikan selagi hangat.")
+    assert detector.find_duplicate(near_copy) == "recipe_3"
+    # Isi sama tapi nama masakan lain -> bukan duplikat (dataset sangat ter-template)
+    assert detector.find_duplicate(recipe_copy(original, name="Ketoprak Bandung")) is None
+
+
+def test_lsh_only_compares_recipes_sharing_a_band(processed_recipes):
+    detector = NearDuplicateDetector()
+    original = processed_recipes[3].to_dict()
+    signature = detector.signature(original)
+
+    # Signature yang tidak berbagi satu band pun tidak pernah menjadi kandidat
+    detector.add("recipe_3", original, signature=signature + 1)
+    assert detector.find_duplicate(original, signature=signature) is None
+
+
+def test_filter_batch_skips_duplicates_and_reports_names_for_merge(processed_recipes):
+    first, second = processed_recipes[3].to_dict(), processed_recipes[10].to_dict()
+    batch = [first, recipe_copy(first, name="Gado-Gado Jakarta Asli"), second]
+    detector = NearDuplicateDetector()
+
+    kept, keys, duplicates = detector.filter_batch(batch, ["recipe_0", "recipe_1", "recipe_2"])
+
+    # Id dipakai berurutan hanya untuk resep yang diterima
+    assert [recipe["nama"] for recipe in kept] == [first["nama"], second["nama"]]
+    assert keys == ["recipe_0", "recipe_1"]
+    assert duplicates == {"recipe_0": ["Gado-Gado Jakarta Asli"]}
+    assert detector.stats == {"checked": 3, "duplicates": 1}
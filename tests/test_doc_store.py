@@ -0,0 +1,72 @@
+"""
+Test DocumentStore: build dari collection per halaman lalu dibaca lewat mmap
+"""
+
+import pytest
+from src.doc_store import DocumentStore
+
+
+class PagedCollection:
+    """Collection palsu dengan get(limit, offset); setiap halaman dicatat"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pages = []
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None, limit=None, offset=0):
+        self.pages.append((offset, limit))
+        page = self.rows[offset:offset + limit]
+        return {"ids": [row[0] for row in page], "documents": [row[1] for row in page],
+                "metadatas": [row[2] for row in page]}
+
+
+class FakeVectorStore:
+    def __init__(self, directory, rows):
+        self.persist_directory = directory
+        self.collection_name = "indonesian_recipes"
+        self.collection = PagedCollection(rows)
+
+
+def test_build_and_read_roundtrip(tmp_path, processed_recipes):
+    names = [recipe.to_dict()["nama"] for recipe in processed_recipes]
+    rows = [(f"recipe_{i}", f"Nama Masakan: {name}\nBahan: cabai, terasi", {"nama": name, "waktu_menit": i})
+            for i, name in enumerate(names)]
+    vector_store = FakeVectorStore(str(tmp_path / "db"), rows)
+
+    assert DocumentStore.build(vector_store, page_size=3) == len(rows)
+    assert len(vector_store.collection.pages) == (len(rows) + 2) // 3
+
+    store = DocumentStore(DocumentStore.default_path(vector_store))
+    try:
+        assert len(store) == len(rows)
+        for doc_id, document, metadata in rows:
+            assert doc_id in store
+            assert store.get(doc_id) == (document, metadata)
+        assert store.get("recipe_missing") is None
+        assert store.stats["reads"] == len(rows)
+    finally:
+        store.close()
+
+
+def test_non_ascii_text_and_empty_store(tmp_path):
+    path = str(tmp_path / "docs.bin")
+    DocumentStore.write(path, [("soto", "Soto Ayam — kuah kuning 🍜", {"kategori": "Sup"})])
+    store = DocumentStore(path)
+    assert store.get("soto") == ("Soto Ayam — kuah kuning 🍜", {"kategori": "Sup"})
+    store.close()
+
+    assert DocumentStore.write(path, []) == 0
+    store = DocumentStore(path)
+    assert len(store) == 0
+    store.close()
+
+
+def test_invalid_file_is_rejected(tmp_path):
+    path = tmp_path / "docs.bin"
+    path.write_bytes(b"bukan document store sama sekali")
+
+    with pytest.raises(ValueError):
+        DocumentStore(str(path))
@@ -0,0 +1,33 @@
+"""
+Test normalisasi bahan dan IngredientIndex pada dataset repo
+"""
+
+import pytest
+from src.ingredient_index import IngredientIndex, normalize_ingredient_line
+
+
+@pytest.fixture(scope="module")
+def ingredient_index(processed_recipes):
+    index = IngredientIndex()
+    for i, recipe in enumerate(processed_recipes):
+        index.add(f"recipe_{i}", recipe)
+    return index
+
+
+def test_placeholder_line_is_not_an_ingredient():
+    assert normalize_ingredient_line("Bahan utama untuk Soto Ayam Kuning") == []
+    assert normalize_ingredient_line("Bumbu dasar: bawang merah, bawang putih, cabai") == [
+        "bawang merah", "bawang putih", "cabai"]
+
+
+def test_dish_names_do_not_match_as_ingredients(ingredient_index):
+    assert "ayam" not in ingredient_index.vocabulary
+    assert not ingredient_index.match_terms("ayam")
+    assert ingredient_index.rank_by_coverage(["ayam", "tempe"]) == []
+
+
+def test_real_ingredients_still_rank(ingredient_index):
+    results = ingredient_index.rank_by_coverage(["bawang merah", "cabai"], top_k=3)
+
+    assert len(results) == 3
+    assert all(set(result["matched"]) == {"bawang merah", "cabai"} for result in results)
@@ -0,0 +1,168 @@
+"""
+Test ResilientLLMClient: retry/backoff, transisi circuit breaker, dan timeout
+"""
+
+import time
+import threading
+import pytest
+from src.llm_client import (ResilientLLMClient, CircuitBreaker, FakeLLMProvider, ProviderError,
+                            LLMTimeoutError, CircuitOpenError, is_retryable_error)
+
+
+def make_client(**kwargs):
+    options = dict(requests_per_minute=0, timeout=None, max_retries=3,
+                   base_delay=0.001, max_delay=0.002)
+    options.update(kwargs)
+    return ResilientLLMClient(**options)
+
+
+class FlakyProvider:
+    """Gagal dengan error tertentu sebanyak `failures` kali, lalu sukses"""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.call_count = 0
+
+    def generate(self):
+        self.call_count += 1
+        if self.call_count <= self.failures:
+            raise self.error
+        return "ok"
+
+
+class RateLimitError(Exception):
+    """Nama kelas sama dengan exception SDK openai"""
+
+
+def test_retryable_errors_are_decided_by_type_and_status():
+    assert is_retryable_error(ProviderError("Resource exhausted", status_code=429))
+    assert is_retryable_error(ProviderError("Service unavailable", status_code=503))
+    assert is_retryable_error(LLMTimeoutError("lambat"))
+    assert is_retryable_error(ConnectionResetError("reset"))
+    assert is_retryable_error(RateLimitError("kuota"))
+    # Isi pesan tidak menentukan apa pun
+    assert not is_retryable_error(ValueError("Harga 500 gram gula, connection string salah"))
+    assert not is_retryable_error(ProviderError("timeout parameter tidak valid", status_code=400))
+
+
+def test_retries_transient_errors_with_backoff():
+    provider = FlakyProvider(failures=2, error=ProviderError("429 Resource exhausted", 429))
+    client = make_client()
+
+    assert client.call(provider.generate) == "ok"
+
+    metrics = client.get_metrics()
+    assert provider.call_count == 3
+    assert metrics["retries"] == 2
+    assert metrics["backoff_seconds"] > 0
+    assert metrics["circuit_breaker"]["state"] == CircuitBreaker.CLOSED
+
+
+def test_gives_up_after_max_retries():
+    provider = FakeLLMProvider(latency=0.0, failure_rate=1.0, seed=1)
+    client = make_client(max_retries=2, failure_threshold=10)
+
+    with pytest.raises(ProviderError):
+        client.call(lambda: provider.generate("resep rendang"))
+
+    assert provider.call_count == 3
+    assert client.get_metrics()["failures"] == 1
+
+
+def test_non_retryable_error_is_not_retried():
+    provider = FlakyProvider(failures=1, error=ProviderError("prompt tidak valid", 400))
+    client = make_client()
+
+    with pytest.raises(ProviderError):
+        client.call(provider.generate)
+
+    assert provider.call_count == 1
+    assert client.get_metrics()["non_retryable_errors"] == 1
+
+
+def test_breaker_opens_then_half_open_probe_closes_it():
+    client = make_client(max_retries=0, failure_threshold=2, reset_timeout=0.05)
+    failing = FakeLLMProvider(latency=0.0, failure_rate=1.0)
+
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            client.call(lambda: failing.generate("x"))
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        client.call(lambda: "tidak dipanggil")
+
+    time.sleep(0.06)
+    assert client.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.call(lambda: "ok") == "ok"
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_half_open_probe_reopens_breaker():
+    client = make_client(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+    failing = FakeLLMProvider(latency=0.0, failure_rate=1.0)
+
+    with pytest.raises(ProviderError):
+        client.call(lambda: failing.generate("x"))
+    time.sleep(0.06)
+    with pytest.raises(ProviderError):
+        client.call(lambda: failing.generate("x"))
+
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+    assert client.circuit_breaker.open_count == 2
+
+
+def test_non_retryable_error_leaves_half_open_breaker_unchanged():
+    client = make_client(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+    failing = FakeLLMProvider(latency=0.0, failure_rate=1.0)
+    bad_request = FlakyProvider(failures=1, error=ProviderError("prompt tidak valid", 400))
+
+    with pytest.raises(ProviderError):
+        client.call(lambda: failing.generate("x"))
+    time.sleep(0.06)
+
+    with pytest.raises(ProviderError):
+        client.call(bad_request.generate)
+
+    # Tidak ditutup oleh error 400, tapi slot probe dilepas untuk percobaan berikutnya
+    assert client.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.call(lambda: "ok") == "ok"
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_timeout_raises_and_counts_abandoned_call():
+    release = threading.Event()
+    client = make_client(timeout=0.05, max_retries=0, max_workers=2)
+
+    with pytest.raises(LLMTimeoutError):
+        client.call(lambda: release.wait(5))
+    assert client.get_metrics()["timeouts"] == 1
+    assert client.get_metrics()["abandoned_in_flight"] == 1
+
+    # Slot yang tersisa tetap melayani panggilan baru
+    assert client.call(lambda: "ok") == "ok"
+
+    release.set()
+    deadline = time.monotonic() + 1.0
+    while client.get_metrics()["abandoned_in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get_metrics()["abandoned_in_flight"] == 0
+
+
+def test_stuck_calls_do_not_queue_new_calls_forever():
+    release = threading.Event()
+    client = make_client(timeout=0.05, max_retries=0, max_workers=1, failure_threshold=10)
+
+    with pytest.raises(LLMTimeoutError):
+        client.call(lambda: release.wait(5))
+
+    # Satu-satunya slot dipegang panggilan macet: panggilan baru gagal cepat dengan timeout
+    start = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        client.call(lambda: "ok")
+    assert time.monotonic() - start < 1.0
+
+    release.set()
+    time.sleep(0.05)
+    assert client.call(lambda: "ok") == "ok"
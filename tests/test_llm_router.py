@@ -0,0 +1,64 @@
+"""
+Test HedgedRouter: model dan usage mengikuti provider pemenang
+"""
+
+import time
+from src.llm_router import HedgedRouter
+
+
+class UsageProvider:
+    def __init__(self, name, model, delay, tokens):
+        self.name = name
+        self.model = model
+        self.delay = delay
+        self.tokens = tokens
+
+    def stream(self, messages, usage=None):
+        time.sleep(self.delay)
+        yield f"[{self.name}]"
+        if usage is not None:
+            usage.update({"prompt_tokens": 10, "completion_tokens": self.tokens,
+                          "total_tokens": 10 + self.tokens})
+
+
+class FailingProvider(UsageProvider):
+    def stream(self, messages, usage=None):
+        raise ConnectionError("provider mati")
+        yield
+
+
+MESSAGES = [{"role": "user", "content": "Bagaimana cara membuat rendang?"}]
+
+
+def test_generate_returns_primary_model_and_usage():
+    router = HedgedRouter(UsageProvider("openai", "gpt-4o-mini", 0.0, 7),
+                          UsageProvider("gemini", "gemini-2.5-flash", 0.0, 3),
+                          initial_deadline=1.0)
+
+    text, usage, model = router.generate(MESSAGES)
+
+    assert text == "[openai]"
+    assert model == "gpt-4o-mini"
+    assert usage["completion_tokens"] == 7
+
+
+def test_hedged_secondary_win_reports_secondary_model_and_usage():
+    router = HedgedRouter(UsageProvider("openai", "gpt-4o-mini", 0.5, 7),
+                          UsageProvider("gemini", "gemini-2.5-flash", 0.0, 3),
+                          initial_deadline=0.01)
+
+    text, usage, model = router.generate(MESSAGES)
+
+    assert text == "[gemini]"
+    assert model == "gemini-2.5-flash"
+    assert usage["completion_tokens"] == 3
+
+
+def test_failover_reports_secondary_model():
+    router = HedgedRouter(FailingProvider("openai", "gpt-4o-mini", 0.0, 7),
+                          UsageProvider("gemini", "gemini-2.5-flash", 0.0, 3))
+
+    _text, _usage, model = router.generate(MESSAGES)
+
+    assert model == "gemini-2.5-flash"
+    assert router.get_metrics()["failovers"] == 1
@@ -0,0 +1,107 @@
+"""
+Test pooling dan normalisasi OnnxSentenceEncoder dengan session dan tokenizer palsu
+(tanpa onnxruntime dan model)
+"""
+
+import numpy as np
+import pytest
+from src.onnx_embedding import OnnxSentenceEncoder, compare_embeddings
+
+PAD_ID = 0
+
+
+class FakeEncoding:
+    def __init__(self, ids, attention_mask):
+        self.ids = ids
+        self.attention_mask = attention_mask
+
+
+class FakeTokenizer:
+    """Satu token per kata (id = panjang kata), padding ke kalimat terpanjang batch"""
+
+    def encode_batch(self, texts):
+        tokens = [[len(word) for word in text.split()] for text in texts]
+        length = max(len(ids) for ids in tokens)
+        return [FakeEncoding(ids + [PAD_ID] * (length - len(ids)), [1] * len(ids) + [0] * (length - len(ids)))
+                for ids in tokens]
+
+
+class FakeSession:
+    """last_hidden_state token = [id, -id, posisi]; token padding bernilai besar"""
+
+    def __init__(self):
+        self.feeds = []
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        ids = feeds["input_ids"].astype(np.float32)
+        positions = np.broadcast_to(np.arange(ids.shape[1], dtype=np.float32), ids.shape)
+        hidden = np.stack([ids, -ids, positions], axis=-1)
+        hidden[feeds["attention_mask"] == 0] = 1000.0
+        return [hidden]
+
+
+def make_encoder(pooling="mean", normalize=False, input_names=("input_ids", "attention_mask"), batch_size=32):
+    encoder = OnnxSentenceEncoder.__new__(OnnxSentenceEncoder)
+    encoder.config = {"pooling": pooling, "normalize": normalize, "dimension": 3,
+                      "input_names": list(input_names)}
+    encoder.session = FakeSession()
+    encoder.tokenizer = FakeTokenizer()
+    encoder.batch_size = batch_size
+    return encoder
+
+
+@pytest.mark.parametrize("pooling,expected", [
+    # Token "ab cdef" = id [2, 4]; padding di kalimat pendek tidak ikut dihitung
+    ("mean", [[3.0, -3.0, 0.5], [1.0, -1.0, 0.0]]),
+    ("cls", [[2.0, -2.0, 0.0], [1.0, -1.0, 0.0]]),
+    ("max", [[4.0, -2.0, 1.0], [1.0, -1.0, 0.0]]),
+])
+def test_pooling_ignores_padding(pooling, expected):
+    encoder = make_encoder(pooling)
+
+    embeddings = encoder._encode_batch(["ab cdef", "a"])
+
+    assert embeddings.dtype == np.float32
+    np.testing.assert_allclose(embeddings, expected)
+
+
+def test_normalize_gives_unit_vectors():
+    encoder = make_encoder("mean", normalize=True)
+
+    embeddings = encoder._encode_batch(["ab cdef", "a"])
+
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_allclose(embeddings[1], np.array([1.0, -1.0, 0.0]) / np.sqrt(2), rtol=1e-6)
+
+
+def test_encode_restores_input_order_across_length_sorted_batches():
+    encoder = make_encoder("cls", batch_size=2)
+    texts = ["a", "abc de fgh ijkl", "ab", "abcdef g"]
+
+    embeddings = encoder.encode(texts)
+
+    # Token pertama setiap teks = panjang kata pertama
+    np.testing.assert_allclose(embeddings[:, 0], [1.0, 3.0, 2.0, 6.0])
+    assert len(encoder.session.feeds) == 2
+    assert encoder.encode("ab").shape == (3,)
+    assert encoder.encode([]).shape == (0, 3)
+    assert encoder(["ab"]) == [[2.0, -2.0, 0.0]]
+
+
+def test_token_type_ids_fed_when_model_expects_them():
+    encoder = make_encoder(input_names=("input_ids", "attention_mask", "token_type_ids"))
+
+    encoder._encode_batch(["ab cdef"])
+
+    feeds = encoder.session.feeds[0]
+    assert set(feeds) == {"input_ids", "attention_mask", "token_type_ids"}
+    assert not feeds["token_type_ids"].any()
+
+
+def test_compare_embeddings_reports_cosine_and_difference():
+    reference = np.array([[1.0, 0.0], [0.0, 1.0]])
+
+    report = compare_embeddings(reference, np.array([[1.0, 0.0], [0.0, 0.5]]))
+
+    assert report == pytest.approx({"max_abs_diff": 0.5, "mean_cosine": 1.0, "min_cosine": 1.0})
@@ -0,0 +1,45 @@
+"""
+Test record berbasis __slots__: to_dict generik, kesetaraan, dan hash
+"""
+
+from src.records import Recipe, RecipeMetadata, SearchHit, LazySearchHit
+
+
+def test_recipe_to_dict_covers_all_fields(processed_recipes):
+    recipe = processed_recipes[0]
+    data = recipe.to_dict()
+
+    assert isinstance(recipe, Recipe)
+    assert list(data) == list(Recipe.__slots__)
+    assert isinstance(data["bahan"], list)
+    assert Recipe.from_dict(data) == recipe
+
+
+def test_batch_and_single_processing_return_equal_recipes(raw_recipes, processed_recipes):
+    from src.data_processor import RecipePreprocessor
+    batch = RecipePreprocessor().process_recipes_batch(raw_recipes)
+
+    assert batch == processed_recipes
+
+
+def test_records_are_hashable_and_consistent_with_eq(processed_recipes):
+    first, second = processed_recipes[0], Recipe.from_dict(processed_recipes[0].to_dict())
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second, processed_recipes[1]}) == 2
+
+    metadata = RecipeMetadata(nama="Rendang", kategori="Lauk", waktu_menit=120)
+    assert {metadata: 1}[RecipeMetadata.from_dict(metadata.to_dict())] == 1
+
+
+def test_lazy_hit_hash_does_not_hydrate():
+    calls = []
+
+    def loader(doc_id):
+        calls.append(doc_id)
+        return "dokumen", {"nama": "Rendang"}
+
+    hit = LazySearchHit("recipe_1", loader, distance=0.3)
+    hash(hit)
+    assert calls == []
+    assert hash(SearchHit("recipe_1", "dokumen", RecipeMetadata(nama="Rendang"), distance=0.3)) != 0
@@ -0,0 +1,55 @@
+"""
+Test CascadeReranker: CrossEncoder (dan PyTorch) baru di-import saat model dipakai
+"""
+
+import sys
+import types
+import importlib
+from importlib.machinery import ModuleSpec
+import src.reranker
+from src.retriever import RecipeRetriever
+
+
+class FakeCrossEncoder:
+    def __init__(self, model_name, device=None):
+        self.model_name = model_name
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        return [float(len(document)) for _query, document in pairs]
+
+
+class RecordingModule(types.ModuleType):
+    """Modul sentence_transformers palsu yang mencatat atribut yang diakses"""
+
+    def __init__(self):
+        super().__init__("sentence_transformers")
+        self.__spec__ = ModuleSpec("sentence_transformers", None)
+        self.accessed = []
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        self.accessed.append(name)
+        return FakeCrossEncoder
+
+
+def test_cross_encoder_is_imported_on_first_model_use(monkeypatch):
+    fake = RecordingModule()
+    monkeypatch.setitem(sys.modules, "sentence_transformers", fake)
+    try:
+        reranker_module = importlib.reload(src.reranker)
+        reranker = reranker_module.CascadeReranker(model_name="fake-model")
+        assert reranker_module.CROSS_ENCODER_AVAILABLE
+        assert fake.accessed == []
+
+        assert reranker.model.model_name == "fake-model"
+        assert fake.accessed == ["CrossEncoder"]
+    finally:
+        monkeypatch.undo()
+        importlib.reload(src.reranker)
+
+
+def test_reranker_is_not_created_when_disabled():
+    retriever = RecipeRetriever(vector_store=None, rerank=False)
+
+    assert retriever.reranker is None
@@ -0,0 +1,43 @@
+"""
+Test deteksi pertanyaan lanjutan RetrievalSession dengan nama resep dataset repo
+"""
+
+import pytest
+from src.retrieval_session import RetrievalSession
+
+
+@pytest.fixture
+def session():
+    session = RetrievalSession()
+    session.remember_ids(["recipe_35"])
+    return session
+
+
+@pytest.mark.parametrize("query", [
+    "Resep ayam yang pedas",
+    "Masakan berkuah untuk cuaca dingin",
+    "Resep ikan bakar",
+    "Kue untuk lebaran",
+    "Sarapan cepat dan sehat",
+    "Kalau ini enak?",
+    "Lalu bagaimana?",
+    "Sayur tanpa santan",
+])
+def test_new_topic_runs_fresh_retrieval(session, name_router, query):
+    assert not session.is_follow_up(query, name_router)
+
+
+@pytest.mark.parametrize("query", [
+    "kalau untuk 6 orang bagaimana?",
+    "Bahannya apa saja?",
+    "Bisa dibuat lebih pedas?",
+    "Kalau tanpa santan bisa?",
+    "Berapa lama masak resep ini?",
+    "Yang tadi pakai santan?",
+])
+def test_anaphora_and_modifiers_reuse_documents(session, name_router, query):
+    assert session.is_follow_up(query, name_router)
+
+
+def test_empty_session_is_never_follow_up(name_router):
+    assert not RetrievalSession().is_follow_up("Bahannya apa saja?", name_router)
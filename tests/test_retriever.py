@@ -0,0 +1,58 @@
+"""
+Test RecipeRetriever: filter sidebar juga berlaku untuk rekomendasi kategori
+"""
+
+from src.retriever import RecipeRetriever
+from src.category_recommendations import CategoryRecommendations
+from src.records import RecipeMetadata, SearchHit
+
+
+class MinutesStore:
+    """Vector store palsu; filter where hanya {"waktu_menit": {"$lte": n}}"""
+
+    def __init__(self, minutes):
+        self.minutes = minutes
+
+    def get_by_ids(self, ids, where=None):
+        limit = where["waktu_menit"]["$lte"] if where else None
+        return [SearchHit(id=doc_id, document=doc_id, metadata=RecipeMetadata(nama=doc_id))
+                for doc_id in ids if limit is None or self.minutes[doc_id] <= limit]
+
+
+def make_retriever():
+    retriever = RecipeRetriever(MinutesStore({"rendang": 240, "gulai": 90, "sate": 45, "soto": 60}))
+    retriever._category_recommendations = CategoryRecommendations({"Lauk": ["rendang", "gulai", "sate", "soto"]})
+    return retriever
+
+
+def test_category_recommendations_respect_filters():
+    retriever = make_retriever()
+
+    assert [hit.id for hit in retriever.retrieve_category_recommendations("Lauk", top_k=2)] == ["rendang", "gulai"]
+    filtered = retriever.retrieve_category_recommendations("Lauk", top_k=2, max_minutes=60)
+    assert [hit.id for hit in filtered] == ["sate", "soto"]
+
+
+class DistanceStore:
+    """Vector store palsu untuk search(); distance per query"""
+
+    def __init__(self, distances_by_query):
+        self.distances_by_query = distances_by_query
+
+    def search(self, query, top_k=5, where=None):
+        distances = self.distances_by_query[query][:top_k]
+        return {"results": [SearchHit(id=f"{query}_{i}", document="", metadata=RecipeMetadata(nama=f"{query}_{i}"),
+                                      distance=distance) for i, distance in enumerate(distances)]}
+
+
+def test_adaptive_stats_are_returned_per_request():
+    retriever = RecipeRetriever(DistanceStore({"rendang": [0.1] + [1.2] * 9, "soto": [0.1, 0.12, 0.15] + [1.2] * 7}),
+                                use_sections=False, use_category_partitions=False)
+
+    # Dua request berurutan (seperti dua thread run_batch) tidak saling menimpa statistik
+    rendang, rendang_stats = retriever.retrieve_adaptive_with_stats("rendang", top_k=3)
+    soto, soto_stats = retriever.retrieve_adaptive_with_stats("soto", top_k=3)
+
+    assert (len(rendang), rendang_stats["dropped"]) == (1, 2)
+    assert (len(soto), soto_stats["dropped"]) == (3, 0)
+    assert not hasattr(retriever, "adaptive_stats")
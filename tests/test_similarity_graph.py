@@ -0,0 +1,68 @@
+"""
+Test SimilarRecipeGraph: update inkremental sama dengan build penuh
+"""
+
+import numpy as np
+import pytest
+from src.similarity_graph import SimilarRecipeGraph
+
+
+def neighbor_ids(graph):
+    return {recipe_id: [neighbor for neighbor, _distance in neighbors]
+            for recipe_id, neighbors in graph.neighbors.items()}
+
+
+def assert_same_as_rebuild(graph, ids, embeddings):
+    rebuilt = SimilarRecipeGraph(k=graph.k)
+    rebuilt.build(ids, embeddings)
+    assert neighbor_ids(graph) == neighbor_ids(rebuilt)
+    for recipe_id, neighbors in rebuilt.neighbors.items():
+        assert [distance for _id, distance in graph.neighbors[recipe_id]] == pytest.approx(
+            [distance for _id, distance in neighbors], rel=1e-4, abs=1e-5)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_update_matches_full_rebuild(seed):
+    rng = np.random.RandomState(seed)
+    embeddings = rng.normal(size=(60, 8)).astype(np.float32)
+    ids = [f"recipe_{i}" for i in range(60)]
+    graph = SimilarRecipeGraph(k=4, block_size=7)
+
+    # Batch awal, lalu resep baru ditambahkan
+    graph.build(ids[:30], embeddings[:30])
+    stats = graph.update(ids[:45], embeddings[:45])
+    assert stats["added"] == 15
+    assert_same_as_rebuild(graph, ids[:45], embeddings[:45])
+
+    # Sebagian resep dihapus sekaligus resep baru masuk
+    keep = [row for row in range(60) if row % 7 != 3]
+    stats = graph.update([ids[row] for row in keep], embeddings[keep])
+    assert stats["removed"] == len([row for row in range(45) if row % 7 == 3])
+    assert_same_as_rebuild(graph, [ids[row] for row in keep], embeddings[keep])
+
+
+def test_small_collection_grows_to_k_neighbors():
+    embeddings = np.eye(6, dtype=np.float32)
+    ids = [f"recipe_{i}" for i in range(6)]
+    graph = SimilarRecipeGraph(k=3)
+
+    graph.build(ids[:2], embeddings[:2])
+    assert len(graph.related("recipe_0")) == 1
+    graph.update(ids, embeddings)
+
+    assert all(len(graph.related(recipe_id)) == 3 for recipe_id in ids)
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    rng = np.random.RandomState(0)
+    ids = [f"recipe_{i}" for i in range(10)]
+    graph = SimilarRecipeGraph(k=3)
+    graph.build(ids, rng.normal(size=(10, 4)))
+    path = str(tmp_path / "graph.json")
+
+    graph.save(path)
+    loaded = SimilarRecipeGraph.load(path)
+
+    assert loaded.k == 3
+    assert loaded.neighbors == graph.neighbors
+    assert loaded.related("recipe_0", k=2) == graph.neighbors["recipe_0"][:2]
@@ -0,0 +1,40 @@
+"""
+Test jawaban templat untuk lookup nama resep dengan router dan dokumen dari dataset repo
+"""
+
+import pytest
+from src.records import RecipeMetadata, SearchHit
+from src.templated_answers import render_lookup_answer
+from src.vector_store import RecipeVectorStore
+from src.data_processor import RecipePreprocessor
+
+
+@pytest.fixture(scope="module")
+def hits(processed_recipes):
+    preprocessor = RecipePreprocessor()
+    return {
+        f"recipe_{i}": SearchHit(id=f"recipe_{i}", document=preprocessor.format_recipe_for_embedding(recipe),
+                                 metadata=RecipeMetadata.from_dict(RecipeVectorStore._build_metadata(recipe)))
+        for i, recipe in enumerate(processed_recipes)
+    }
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("apa bahan-bahan soto ayam?", "Bahan-bahan untuk **Soto Ayam Kuning**"),
+    ("berapa lama masak rendang?", "Waktu memasak **Rendang Ayam**"),
+])
+def test_unambiguous_partial_name_gets_template(name_router, hits, query, expected):
+    route = name_router.classify(query)
+    assert route.intent == "name_lookup" and route.confidence < 0.75
+
+    answer = render_lookup_answer(query, route, [hits[recipe_id] for recipe_id in route.recipe_ids])
+
+    assert answer is not None and answer.startswith(expected)
+
+
+def test_ambiguous_partial_name_goes_to_llm(name_router, hits):
+    route = name_router.classify("resep nasi goreng")
+    assert len(route.recipe_ids) > 1 and route.confidence < 0.75
+
+    assert render_lookup_answer("resep nasi goreng", route,
+                                [hits[recipe_id] for recipe_id in route.recipe_ids]) is None
@@ -0,0 +1,52 @@
+"""
+Test StreamRenderer dengan container palsu (tanpa Streamlit)
+"""
+
+from src.ui_rendering import StreamRenderer
+
+
+class FakePlaceholder:
+    def __init__(self, elements):
+        self.elements = elements
+        self.index = len(elements)
+        elements.append(None)
+
+    def markdown(self, text):
+        self.elements[self.index] = text
+
+    def empty(self):
+        self.elements[self.index] = None
+
+
+class FakeContainer:
+    def __init__(self):
+        self.elements = []
+
+    def empty(self):
+        return FakePlaceholder(self.elements)
+
+    @property
+    def visible(self):
+        return [text for text in self.elements if text is not None]
+
+
+def test_close_removes_cursor_after_finished_paragraph():
+    container = FakeContainer()
+    renderer = StreamRenderer(container, min_interval=0.0)
+
+    renderer.write("Halo semua.\n\n")
+    assert container.visible == ["Halo semua.", StreamRenderer.CURSOR]
+
+    assert renderer.close() == "Halo semua.\n\n"
+    assert container.visible == ["Halo semua."]
+
+
+def test_close_renders_tail_without_cursor():
+    container = FakeContainer()
+    renderer = StreamRenderer(container, min_interval=0.0)
+
+    renderer.write("Paragraf satu.\n\nParagraf ")
+    renderer.write("dua.")
+    renderer.close()
+
+    assert container.visible == ["Paragraf satu.", "Paragraf dua."]
@@ -0,0 +1,76 @@
+"""
+Test CompressedVectorIndex: build, simpan/muat, dan pencarian tahap pertama
+"""
+
+import numpy as np
+import pytest
+from src.vector_compression import CompressedVectorIndex
+
+
+def corpus(n=200, dimension=32, seed=0):
+    rng = np.random.RandomState(seed)
+    # Sebagian besar variansi di beberapa dimensi pertama (seperti embedding nyata)
+    embeddings = rng.normal(size=(n, dimension)) * np.linspace(3.0, 0.1, dimension)
+    return [f"recipe_{i}" for i in range(n)], embeddings.astype(np.float32)
+
+
+def exact_top(embeddings, query, k):
+    return list(np.argsort(((embeddings - query) ** 2).sum(axis=1))[:k])
+
+
+@pytest.mark.parametrize("method,dims,quantization", [
+    ("none", None, "float32"),
+    ("none", None, "float16"),
+    ("pca", 16, "int8"),
+    ("truncate", 16, "int8"),
+])
+def test_first_stage_recall(method, dims, quantization):
+    ids, embeddings = corpus()
+    index = CompressedVectorIndex.build(ids, embeddings, method=method, dims=dims, quantization=quantization)
+
+    recalls = []
+    for query in embeddings[:20] + 0.05:
+        expected = {ids[i] for i in exact_top(embeddings, query, 5)}
+        candidates, distances = index.search(query, 20)
+        assert len(candidates) == 20
+        assert list(distances) == sorted(distances)
+        recalls.append(len(expected & set(candidates)) / 5)
+
+    assert np.mean(recalls) >= 0.9
+    if method == "none" and quantization == "float32":
+        assert index.search(embeddings[3], 1)[0] == ["recipe_3"]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    ids, embeddings = corpus(n=50)
+    index = CompressedVectorIndex.build(ids, embeddings, method="pca", dims=8, quantization="int8")
+    path = str(tmp_path / "vectors.npz")
+
+    index.save(path)
+    loaded = CompressedVectorIndex.load(path)
+
+    assert (loaded.ids, loaded.method, loaded.dims, loaded.quantization) == (ids, "pca", 8, "int8")
+    assert loaded.codes.dtype == np.int8
+    assert loaded.memory_bytes() == index.memory_bytes() < embeddings.nbytes
+    query = embeddings[7]
+    assert loaded.search(query, 5)[0] == index.search(query, 5)[0]
+
+
+def test_allowed_ids_restrict_candidates():
+    ids, embeddings = corpus(n=30)
+    index = CompressedVectorIndex.build(ids, embeddings, method="none", quantization="float32")
+
+    allowed = {"recipe_4", "recipe_9", "recipe_20"}
+    candidates, _ = index.search(embeddings[4], 10, allowed_ids=allowed)
+
+    assert candidates[0] == "recipe_4"
+    assert set(candidates) == allowed
+    assert index.search(embeddings[4], 10, allowed_ids=set())[0] == []
+
+
+def test_empty_index_and_unknown_quantization():
+    index = CompressedVectorIndex.build([], np.zeros((0, 4), dtype=np.float32), method="none", quantization="int8")
+    assert index.search(np.ones(4, dtype=np.float32), 3)[0] == []
+
+    with pytest.raises(ValueError):
+        CompressedVectorIndex.build(["a"], np.ones((1, 4)), quantization="int4")
@@ -0,0 +1,179 @@
+"""
+Test RecipeVectorStore.search_sections dengan collection palsu (tanpa embedding model)
+"""
+
+from src.vector_store import RecipeVectorStore
+
+
+class FakeSectionCollection:
+    """Mengembalikan chunk terurut distance; n_results setiap query dan id get dicatat"""
+
+    def __init__(self, chunks):
+        self.chunks = sorted(chunks, key=lambda chunk: chunk[3])
+        self.requested = []
+        self.fetched = []
+
+    def count(self):
+        return len(self.chunks)
+
+    def query(self, query_texts, n_results, where=None, include=("documents", "metadatas", "distances")):
+        self.requested.append(n_results)
+        top = self.chunks[:n_results]
+        results = {
+            "ids": [[chunk[0] for chunk in top]],
+            "metadatas": [[chunk[2] for chunk in top]],
+            "distances": [[chunk[3] for chunk in top]]
+        }
+        if "documents" in include:
+            results["documents"] = [[chunk[1] for chunk in top]]
+        return results
+
+    def get(self, ids, include=None):
+        self.fetched.extend(ids)
+        by_id = {chunk[0]: chunk[1] for chunk in self.chunks}
+        found = [chunk_id for chunk_id in ids if chunk_id in by_id]
+        return {"ids": found, "documents": [by_id[chunk_id] for chunk_id in found]}
+
+
+class FakeCollection:
+    """Filter where hanya mendukung {"field": {"$lte"/"$gte": nilai}}"""
+
+    def __init__(self, documents, metadatas=None):
+        self.documents = documents
+        self.metadatas = metadatas or {}
+
+    def _passes(self, doc_id, where):
+        metadata = self.metadatas.get(doc_id, {})
+        for field, condition in where.items():
+            for operator, value in condition.items():
+                if operator == "$lte" and not metadata.get(field, value + 1) <= value:
+                    return False
+                if operator == "$gte" and not metadata.get(field, value - 1) >= value:
+                    return False
+        return True
+
+    def get(self, ids, include=None, where=None):
+        found = [doc_id for doc_id in ids if doc_id in self.documents
+                 and (where is None or self._passes(doc_id, where))]
+        return {"ids": found, "documents": [self.documents[doc_id] for doc_id in found],
+                "metadatas": [self.metadatas.get(doc_id, {}) for doc_id in found]}
+
+
+def chunk(parent_id, section, index, distance, text):
+    metadata = {"parent_id": parent_id, "section": section, "chunk_index": index,
+                "nama": parent_id, "kategori": "Lauk"}
+    return (f"{parent_id}_{section}_{index}", f"Nama Masakan: {parent_id}\n{text}", metadata, distance)
+
+
+def make_store(chunks, documents=None, metadatas=None, lazy_documents=False):
+    store = RecipeVectorStore.__new__(RecipeVectorStore)
+    store.lazy_documents = lazy_documents
+    store._document_store = None
+    store.section_collection = FakeSectionCollection(chunks)
+    store.collection = FakeCollection(documents or {}, metadatas)
+    return store
+
+
+def test_header_only_match_falls_back_to_best_body_chunk():
+    store = make_store([
+        chunk("rendang", "header", 0, 0.10, "Kategori: Lauk"),
+        chunk("rendang", "bahan", 0, 0.50, "Bahan: daging sapi, santan"),
+        chunk("rendang", "langkah", 0, 0.60, "Cara Membuat: masak hingga kering"),
+    ])
+
+    hit = store.search_sections("rendang", top_k=1)["results"][0]
+
+    assert hit.document == "Bahan: daging sapi, santan"
+    assert hit.sections == ("bahan",)
+
+
+def test_header_only_fetch_falls_back_to_full_document():
+    store = make_store([chunk("rendang", "header", 0, 0.10, "Kategori: Lauk")],
+                       documents={"rendang": "Nama Masakan: rendang\nBahan: daging sapi"})
+
+    hit = store.search_sections("rendang", top_k=1)["results"][0]
+
+    assert hit.document == "Nama Masakan: rendang\nBahan: daging sapi"
+    assert hit.sections is None
+
+
+def test_keeps_fetching_until_top_k_parents():
+    # Resep pertama mengisi 12 chunk teratas; dua resep lain ada di belakang
+    chunks = [chunk("soto", "langkah", i, 0.10 + i * 0.001, f"Langkah {i}") for i in range(12)]
+    chunks += [chunk("rawon", "bahan", 0, 0.40, "Bahan rawon"), chunk("sate", "bahan", 0, 0.45, "Bahan sate")]
+    store = make_store(chunks)
+
+    results = store.search_sections("kuah", top_k=3, fetch_multiplier=2)["results"]
+
+    assert [hit.id for hit in results] == ["soto", "rawon", "sate"]
+    assert store.section_collection.requested == [6, 12, 14]
+
+
+def test_lazy_sections_fetch_text_only_for_selected_chunks():
+    chunks = [
+        chunk("rendang", "header", 0, 0.10, "Kategori: Lauk"),
+        chunk("rendang", "bahan", 0, 0.11, "Bahan: daging sapi, santan"),
+        chunk("rendang", "langkah", 0, 0.60, "Cara Membuat: masak hingga kering"),
+        chunk("soto", "bahan", 0, 0.70, "Bahan: ayam, kunyit"),
+    ]
+    store = make_store(chunks, lazy_documents=True)
+
+    hit = store.search_sections("rendang", top_k=1)["results"][0]
+
+    assert hit.document == "Bahan: daging sapi, santan"
+    assert hit.sections == ("header", "bahan")
+    # Header tidak dibawa; chunk di luar margin dan resep lain tidak pernah dibaca
+    assert store.section_collection.fetched == ["rendang_bahan_0"]
+
+
+def test_get_by_ids_applies_metadata_filter_and_keeps_order():
+    store = make_store([], documents={"rendang": "Rendang", "sate": "Sate", "soto": "Soto"},
+                       metadatas={"rendang": {"waktu_menit": 240}, "sate": {"waktu_menit": 45},
+                                  "soto": {"waktu_menit": 60}})
+
+    hits = store.get_by_ids(["soto", "rendang", "sate"], where={"waktu_menit": {"$lte": 60}})
+
+    assert [hit.id for hit in hits] == ["soto", "sate"]
+    assert store.get_by_ids(["rendang"], where={"waktu_menit": {"$lte": 60}}) == []
+
+
+class RecordingCollection:
+    """Collection palsu untuk get/update berdasarkan id atau where parent_id"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get(self, ids=None, where=None, include=None):
+        found = [row_id for row_id in self.rows
+                 if (ids is None or row_id in ids)
+                 and (where is None or self.rows[row_id][1].get("parent_id") == where["parent_id"])]
+        return {"ids": found, "documents": [self.rows[row_id][0] for row_id in found],
+                "metadatas": [self.rows[row_id][1] for row_id in found]}
+
+    def update(self, ids, documents=None, metadatas=None):
+        for i, row_id in enumerate(ids):
+            document, metadata = self.rows[row_id]
+            self.rows[row_id] = (documents[i] if documents else document, metadatas[i] if metadatas else metadata)
+
+
+def test_aliases_reach_section_metadata_and_header_text():
+    store = RecipeVectorStore.__new__(RecipeVectorStore)
+    store._invalidate_local_stores = lambda: None
+    store.collection = RecordingCollection({"rendang": ("Nama Masakan: Rendang", {"nama": "Rendang"})})
+    store.section_collection = RecordingCollection({
+        "rendang::header::0": ("Nama Masakan: Rendang\nKategori: Lauk",
+                               {"parent_id": "rendang", "section": "header", "nama": "Rendang"}),
+        "rendang::bahan::0": ("Nama Masakan: Rendang\nBahan-bahan:\n- daging",
+                              {"parent_id": "rendang", "section": "bahan", "nama": "Rendang"}),
+        "sate::header::0": ("Nama Masakan: Sate", {"parent_id": "sate", "section": "header", "nama": "Sate"}),
+    })
+
+    store.add_aliases("rendang", ["Rendang Padang"])
+    store.add_aliases("rendang", ["Randang"])
+
+    rows = store.section_collection.rows
+    assert store.collection.rows["rendang"][1]["nama_lain"] == "Rendang Padang; Randang"
+    assert rows["rendang::bahan::0"][1]["nama_lain"] == "Rendang Padang; Randang"
+    assert rows["rendang::header::0"][0] == "Nama Masakan: Rendang\nNama Lain: Rendang Padang; Randang\nKategori: Lauk"
+    assert rows["rendang::bahan::0"][0] == "Nama Masakan: Rendang\nBahan-bahan:\n- daging"
+    assert "nama_lain" not in rows["sate::header::0"][1]
@@ -0,0 +1,56 @@
+"""
+Script warm-up answer cache untuk prompt tetap di UI
+Jalankan saat deploy atau setelah collection berubah (setup_database.py)
+"""
+
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.chatbot_factory import build_chatbot_from_env, build_answer_cache_from_env
+from src.answer_cache import get_fixed_prompts
+
+
+def main():
+    # .env dimuat sebelum parser agar default argumen memakai nilainya
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Warm-up answer cache untuk prompt tetap di UI")
+    parser.add_argument("--top-k", type=int, nargs="+",
+                        default=[int(os.getenv("TOP_K_RETRIEVAL", "3"))],
+                        help="Nilai top-k yang di-cache (default: TOP_K_RETRIEVAL)")
+    parser.add_argument("--force", action="store_true", help="Hitung ulang walaupun cache masih segar")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("WARM-UP ANSWER CACHE")
+    print("=" * 60)
+
+    if not os.path.exists("./chroma_db"):
+        print("Error: Vector store belum disetup. Jalankan setup_database.py terlebih dahulu!")
+        sys.exit(1)
+
+    chatbot, vector_store = build_chatbot_from_env(top_k=args.top_k[0])
+    cache = build_answer_cache_from_env(vector_store)
+    prompts = get_fixed_prompts(vector_store.get_all_categories())
+    fingerprint = vector_store.get_fingerprint()
+
+    print(f"\nFingerprint collection: {fingerprint}")
+    print(f"Jumlah prompt tetap: {len(prompts)}")
+
+    for top_k in args.top_k:
+        print(f"\nWarm-up top_k={top_k}...")
+        stats = cache.warm_up(chatbot, prompts, top_k, fingerprint, force=args.force)
+        print(f"   ✓ Dihitung: {stats['warmed']}, masih segar: {stats['fresh']}, gagal: {stats['failed']}")
+
+    print("\n" + "=" * 60)
+    print("WARM-UP SELESAI")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()